@@ -0,0 +1,125 @@
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework.response import Response
+
+
+class AsyncReadMixin:
+    '''
+        Serves the list and retrieve actions of a ModelViewSet as coroutines.
+
+        With settings.ASYNC_READ_VIEWS (off unless set, turn it on where
+        MyProject.asgi serves the project) as_view() returns an async view, so under ASGI a read runs on the
+        event loop and only its queries leave it (aget / aiterator). The
+        other actions keep their sync code and run through sync_to_async,
+        the way Django runs every sync view under ASGI. Without it, as
+        under WSGI where an async view would only add an async_to_sync
+        hop, the views stay sync.
+
+        Reads call 'alist' / 'aretrieve', the async twins of list and
+        retrieve. Views overriding those two must override these as well.
+    '''
+    async_actions = ('list', 'retrieve')
+    # set by as_view() on the instances serving the async reads
+    run_async = False
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_READ_VIEWS or not set(actions.values()) & set(cls.async_actions):
+            return sync_view
+        async_view = super().as_view(actions, run_async=True, **initkwargs)
+
+        async def view(request, *args, **kwargs):
+            if cls._is_async_read(actions, request):
+                # sets the viewset up and awaits what adispatch() returned
+                return await async_view(request, *args, **kwargs)
+            return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+        # cls, actions, csrf_exempt ... of the DRF view
+        update_wrapper(view, sync_view)
+        del view.__wrapped__
+        return view
+
+    @classmethod
+    def _is_async_read(cls, actions, request):
+        method = request.method.lower()
+        if method == 'head' and 'head' not in actions:
+            method = 'get'
+        return actions.get(method) in cls.async_actions
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.run_async and self._is_async_read(self.action_map, request):
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        ''' APIView.dispatch for the async actions '''
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            handler = getattr(self, f'a{self.action}')
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        '''
+            initial() without blocking the loop: the session user is loaded
+            with auser() first, so authentication has nothing left to read.
+            Credentials in an Authorization header are checked by the
+            authentication classes themselves, in a thread.
+        '''
+        if 'HTTP_AUTHORIZATION' in request.META or not hasattr(request._request, 'auser'):
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            return
+        request._request.user = await request._request.auser()
+        self.initial(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        rows = [row async for row in queryset.aiterator()]
+        return Response(self.get_serializer(rows, many=True).data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+    async def aget_object(self):
+        ''' get_object() reading the row with aget() '''
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filters = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+        # the errors and messages of DRF's get_object_or_404
+        try:
+            instance = await queryset.aget(**filters)
+        except queryset.model.DoesNotExist:
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+
+        self.check_object_permissions(self.request, instance)
+        return instance
@@ -0,0 +1,77 @@
+'''
+    SQLite tuning, the read replica and its router. Imported by the settings,
+    so nothing here may need configured settings at import time.
+
+    The pragmas are run on every new connection through Django's
+    'init_command'. With a 'replica' database configured,
+    MyProject.replica.ReplicaReadMixin reads the list / retrieve requests of
+    a viewset from it; everything else, and every write, stays on 'default'.
+'''
+from django.conf import settings
+
+REPLICA = 'replica'
+
+
+def sqlite_options(journal_mode='WAL', synchronous='NORMAL', mmap_size=0, cache_size=-2000,
+                   busy_timeout=5, transaction_mode=None):
+    '''
+        OPTIONS of a SQLite database. 'busy_timeout' is in seconds, a
+        negative 'cache_size' is in KiB (the SQLite convention) and
+        'transaction_mode' IMMEDIATE takes the write lock when a transaction
+        starts, so concurrent writers wait for each other instead of failing
+        with "database is locked" when a read upgrades to a write.
+    '''
+    pragmas = [
+        f'PRAGMA journal_mode={journal_mode}',
+        f'PRAGMA synchronous={synchronous}',
+        f'PRAGMA mmap_size={int(mmap_size)}',
+        f'PRAGMA cache_size={int(cache_size)}',
+    ]
+
+    options = {'init_command': ';'.join(pragmas), 'timeout': busy_timeout}
+    if transaction_mode:
+        options['transaction_mode'] = transaction_mode
+    return options
+
+
+def replica_settings(default, name):
+    '''
+        'default' pointed at the replica file 'name', read only. Under tests
+        it mirrors the test database instead of getting one of its own.
+    '''
+    options = {**default.get('OPTIONS', {})}
+    options['init_command'] = ';'.join(
+        command for command in (options.get('init_command', ''), 'PRAGMA query_only=1') if command
+    )
+    options.pop('transaction_mode', None)
+    return {**default, 'NAME': name, 'OPTIONS': options, 'TEST': {'MIRROR': 'default'}}
+
+
+def read_database():
+    ''' alias to read from outside transactions: the replica when there is one '''
+    return REPLICA if REPLICA in settings.DATABASES else 'default'
+
+
+class ReplicaRouter:
+    '''
+        Writes and migrations always go to 'default', the replica is a copy
+        of it kept up to date outside Django. Rows read from the replica
+        load their relations from it too. Nothing is read from the replica
+        unless a queryset asks for it with using(), see ReplicaReadMixin.
+    '''
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return {obj1._state.db, obj2._state.db} <= {'default', REPLICA}
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
@@ -0,0 +1,202 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from decimal import Decimal
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    '''
+        Cursor pagination over a composite, unique ordering such as
+        ('-creation_date', '-id').
+
+        A cursor holds the ordering values of the first or last row of a page,
+        and the next page is read with a "rows after this key" filter backed
+        by an index on the ordering columns. A page costs the same however
+        deep the client has paged, and rows inserted meanwhile never shift
+        or repeat rows across pages.
+
+        Like DRF's CursorPagination, an OrderingFilter among the view's
+        filter_backends picks the ordering instead, made unique with a
+        trailing 'id'.
+    '''
+    ordering = None
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self.page_queryset(queryset, request, view)
+        return self.paginate_rows(list(queryset), position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        '''
+            paginate_queryset for async views. A page is small and LIMITed,
+            so it is fetched in one go (one sync_to_async hop) rather than
+            through aiterator(), which needs a second hop to see the end.
+        '''
+        queryset, position, reverse = self.page_queryset(queryset, request, view)
+        rows = [row async for row in queryset]
+        return self.paginate_rows(rows, position, reverse)
+
+    def page_queryset(self, queryset, request, view=None):
+        ''' (queryset of the page plus one row, cursor position, reverse) '''
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.current_ordering = self.get_ordering(request, queryset, view)
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = list(self.current_ordering)
+        if reverse:
+            ordering = [_invert(field) for field in ordering]
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(_after(ordering, position))
+        return queryset[:self.page_size + 1], position, reverse
+
+    def paginate_rows(self, rows, position, reverse):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_position = self.previous_position = None
+        if rows:
+            if has_more or reverse:
+                self.next_position = self._key(rows[-1])
+            if position is not None and (has_more or not reverse):
+                self.previous_position = self._key(rows[0])
+        return rows
+
+    def get_ordering(self, request, queryset, view):
+        for backend in getattr(view, 'filter_backends', ()):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    return _unique(ordering)
+        return tuple(self.ordering)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': reverse, 'o': self.current_ordering},
+                             separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        '''
+            return (position, reverse), position is None on the first page.
+            The values of a position are converted by the model fields of
+            the ordering, so a tampered cursor is a 404 and not a 500.
+        '''
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position, reverse = payload['p'], bool(payload['r'])
+            ordering = tuple(payload.get('o', self.ordering))
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        # a cursor is only valid for the ordering it was made with
+        if (ordering != tuple(self.current_ordering) or not isinstance(position, list)
+                or len(position) != len(self.current_ordering)):
+            raise NotFound(self.invalid_cursor_message)
+
+        try:
+            position = [_field(model, field).to_python(value)
+                        for field, value in zip(self.current_ordering, position)]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        # the ordering columns are not null, neither is a key made from them
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _key(self, row):
+        key = []
+        for field in self.current_ordering:
+            name = field.lstrip('-')
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = str(value)
+            key.append(value)
+        return key
+
+
+def _unique(ordering):
+    ''' append 'id' (in the direction of the last field) unless already there '''
+    ordering = tuple(ordering)
+    if any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+        return ordering
+    return ordering + ('-id' if ordering[-1].startswith('-') else 'id',)
+
+
+def _field(model, field):
+    name = field.lstrip('-')
+    return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+
+
+def _invert(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+def _after(ordering, position):
+    '''
+        Q matching the rows strictly after 'position' in 'ordering', e.g. for
+        ('-creation_date', '-id'):
+        creation_date <= d AND (creation_date < d OR (creation_date = d AND id < i))
+
+        The redundant bound on the first column lets the database seek into
+        the index instead of scanning it from the start.
+    '''
+    conditions = []
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        equal = {ordering[j].lstrip('-'): position[j] for j in range(i)}
+        conditions.append(Q(**equal, **{f'{name}__{lookup}': position[i]}))
+
+    first = ordering[0]
+    lookup = 'lte' if first.startswith('-') else 'gte'
+    bound = Q(**{f"{first.lstrip('-')}__{lookup}": position[0]})
+    return bound & reduce(lambda a, b: a | b, conditions)
@@ -0,0 +1,21 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from MyProject.db import read_database
+
+
+class ReplicaReadMixin:
+    '''
+        Reads the 'replica_actions' of a viewset from the replica database
+        when one is configured (DATABASE_REPLICA_NAME). Writes, and reads of
+        the other actions (lookups that must see a row right after it was
+        created), use 'default'.
+    '''
+    replica_actions = ('list', 'retrieve')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = getattr(self, 'request', None)
+        if (request is not None and self.action in self.replica_actions
+                and request.method in SAFE_METHODS):
+            return queryset.using(read_database())
+        return queryset
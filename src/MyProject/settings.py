@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 from pathlib import Path
 from decouple import config
 
+from MyProject.db import REPLICA, replica_settings, sqlite_options
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -46,15 +48,18 @@ INSTALLED_APPS = [
     'apps.MyApp',
     'apps.FactoryApp',
     'apps.SeleniumApp',
-    'apps.Payment'
+    'apps.Payment',
+    'apps.Metrics',
 ]
 
 MIDDLEWARE = [
+    'apps.Metrics.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.Metrics.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -83,13 +88,35 @@ WSGI_APPLICATION = 'MyProject.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# WAL lets readers run next to the writer, synchronous=NORMAL only syncs at
+# checkpoints (a power cut may lose the last commits, never corrupt the file)
+# and connections are kept CONN_MAX_AGE seconds instead of one per request.
+# Set DATABASE_REPLICA_NAME to read list / retrieve requests of transactions
+# and products from a copy of the database (MyProject.db).
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': config('DATABASE_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        'CONN_MAX_AGE': config('DATABASE_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DATABASE_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'OPTIONS': sqlite_options(
+            journal_mode=config('SQLITE_JOURNAL_MODE', default='WAL'),
+            synchronous=config('SQLITE_SYNCHRONOUS', default='NORMAL'),
+            mmap_size=config('SQLITE_MMAP_SIZE', default=256 * 2 ** 20, cast=int),
+            cache_size=config('SQLITE_CACHE_SIZE', default=-64 * 2 ** 10, cast=int),
+            busy_timeout=config('SQLITE_BUSY_TIMEOUT', default=5, cast=float),
+            transaction_mode=config('SQLITE_TRANSACTION_MODE', default='IMMEDIATE'),
+        ),
     }
 }
 
+DATABASE_REPLICA_NAME = config('DATABASE_REPLICA_NAME', default=None)
+if DATABASE_REPLICA_NAME:
+    DATABASES[REPLICA] = replica_settings(DATABASES['default'], DATABASE_REPLICA_NAME)
+
+DATABASE_ROUTERS = ['MyProject.db.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -129,6 +156,70 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Payment intent ids
+# Keep a stock of ids in memory so inserts do not call the provider per row.
+# The pool is refilled in the background once it drops to the low-water mark.
+
+PAYMENT_INTENT_POOL_ENABLED = config('PAYMENT_INTENT_POOL_ENABLED', default=False, cast=bool)
+PAYMENT_INTENT_POOL_SIZE = config('PAYMENT_INTENT_POOL_SIZE', default=1000, cast=int)
+PAYMENT_INTENT_POOL_LOW_WATER = config('PAYMENT_INTENT_POOL_LOW_WATER', default=200, cast=int)
+
+# Deferred payment intent filling
+# When enabled post_save only queues the transaction id and worker threads
+# fill 'payment_intent_id' in batches off the request path.
+
+PAYMENT_FILL_DEFERRED = config('PAYMENT_FILL_DEFERRED', default=False, cast=bool)
+PAYMENT_FILL_WORKERS = config('PAYMENT_FILL_WORKERS', default=2, cast=int)
+PAYMENT_FILL_BATCH_SIZE = config('PAYMENT_FILL_BATCH_SIZE', default=100, cast=int)
+PAYMENT_FILL_QUEUE_SIZE = config('PAYMENT_FILL_QUEUE_SIZE', default=10000, cast=int)
+PAYMENT_FILL_MAX_RETRIES = config('PAYMENT_FILL_MAX_RETRIES', default=3, cast=int)
+# seconds between sweeps that re-queue rows left unfilled (failures, restarts)
+PAYMENT_FILL_SWEEP_INTERVAL = config('PAYMENT_FILL_SWEEP_INTERVAL', default=60, cast=int)
+
+# Currency cache
+# Process local code -> Currency cache. Set CURRENCY_CACHE_VERSION_KEY to
+# share invalidations between processes through the Django cache.
+
+CURRENCY_CACHE_TTL = config('CURRENCY_CACHE_TTL', default=300, cast=int)
+CURRENCY_CACHE_MAXSIZE = config('CURRENCY_CACHE_MAXSIZE', default=256, cast=int)
+CURRENCY_CACHE_VERSION_KEY = config('CURRENCY_CACHE_VERSION_KEY', default=None)
+
+# seconds a transaction looked up by payment intent id or uid stays cached
+TRANSACTION_LOOKUP_CACHE_TTL = config('TRANSACTION_LOOKUP_CACHE_TTL', default=30, cast=int)
+
+# product / category reads: Cache-Control max-age sent to clients (0 makes
+# them revalidate with If-None-Match every time) and seconds a serialized
+# page stays in the server side cache
+CATALOGUE_CACHE_MAX_AGE = config('CATALOGUE_CACHE_MAX_AGE', default=0, cast=int)
+CATALOGUE_RESPONSE_CACHE_TTL = config('CATALOGUE_RESPONSE_CACHE_TTL', default=300, cast=int)
+
+# list / retrieve of transactions, currencies, products and categories as
+# async views (MyProject.asyncviews). Off unless set, whatever the server: turn
+# it on for deployments served by MyProject.asgi, under WSGI the views would
+# only pay for an async_to_sync hop
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=False, cast=bool)
+
+# Request metrics
+# DB queries and time, serializer time and latency of a sampled share of the
+# requests, sent back as a Server-Timing header and to METRICS_SINK:
+# apps.Metrics.sinks.HistogramSink serves them at /metrics, LogSink logs a
+# line per request
+
+METRICS_SAMPLE_RATE = config('METRICS_SAMPLE_RATE', default=0.1, cast=float)
+METRICS_SINK = config('METRICS_SINK', default='apps.Metrics.sinks.HistogramSink')
+METRICS_SERVER_TIMING = config('METRICS_SERVER_TIMING', default=True, cast=bool)
+
+# On-demand profiling
+# With PROFILING_ENABLED a staff user's request with ?_profile=1 or an
+# 'X-Profile: 1' header runs under cProfile, its stats are stored gzipped in
+# PROFILING_DIR and listed in the admin. Each user gets PROFILING_RATE
+# profiles per PROFILING_RATE_WINDOW seconds.
+
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILING_RATE = config('PROFILING_RATE', default=5, cast=int)
+PROFILING_RATE_WINDOW = config('PROFILING_RATE_WINDOW', default=60, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
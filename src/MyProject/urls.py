@@ -19,5 +19,6 @@ from django.urls import path, include
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('apps.FactoryApp.urls')),
-    path('api/', include('apps.Payment.urls'))
+    path('api/', include('apps.Payment.urls')),
+    path('metrics', include('apps.Metrics.urls')),
 ]
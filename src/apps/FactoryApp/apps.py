@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FactoryappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.FactoryApp'
+
+    def ready(self):
+        import apps.FactoryApp.signals
@@ -0,0 +1,119 @@
+'''
+	Bulk upsert of products keyed on slug, for catalogue syncs.
+
+	slug is an indexed but not unique column, so instead of an INSERT ...
+	ON CONFLICT the stored slugs are looked up per batch and the rows are
+	split between bulk_create and one UPDATE statement run with
+	executemany (bulk_update builds a CASE per row and column, which costs
+	more in Python than the write itself). A slug already held by several
+	products is reported instead of guessing which one to replace. Neither
+	sends model signals: updated_at is set here and the CategoryStats rows
+	of every touched category are rebuilt afterwards.
+'''
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import PrimaryKeyRelatedField
+
+from .models import Category, Product
+from .stats import rebuild
+
+# columns replaced on an existing product
+UPDATE_FIELDS = [
+	'title', 'category_id', 'description', 'regular_price', 'discount_price',
+	'is_active', 'updated_at',
+]
+
+
+def validate(items, serializer):
+	'''
+		Validate 'items' in one pass with a single 'serializer' instance,
+		then check their categories with one query. Returns index -> row of
+		the valid items and index -> errors of the others.
+	'''
+	rows, errors, first = {}, {}, {}
+	for index, item in enumerate(items):
+		try:
+			row = serializer.run_validation(item)
+		except ValidationError as error:
+			errors[index] = error.detail
+			continue
+		if row['slug'] in first:
+			errors[index] = {'slug': [f'repeats item {first[row["slug"]]} of this request']}
+			continue
+		first[row['slug']] = index
+		row['category_id'] = row.pop('category')
+		rows[index] = row
+
+	categories = {row['category_id'] for row in rows.values()}
+	known = set(Category.objects.filter(id__in=categories).values_list('id', flat=True))
+	message = PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+	for index, row in list(rows.items()):
+		if row['category_id'] not in known:
+			errors[index] = {'category': [message.format(pk_value=row['category_id'])]}
+			del rows[index]
+	return rows, errors
+
+
+def stored_products(slugs, batch_size):
+	''' slug -> [(id, category_id), ...] of the products holding these slugs '''
+	slugs, stored = list(slugs), {}
+	for start in range(0, len(slugs), batch_size):
+		batch = Product.objects.filter(slug__in=slugs[start:start + batch_size])
+		for slug, pk, category_id in batch.values_list('slug', 'id', 'category_id'):
+			stored.setdefault(slug, []).append((pk, category_id))
+	return stored
+
+
+def update_products(products, batch_size):
+	''' write UPDATE_FIELDS of 'products' back, 'batch_size' rows per executemany '''
+	quote = connection.ops.quote_name
+	fields = [Product._meta.get_field(name) for name in UPDATE_FIELDS]
+	sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+		quote(Product._meta.db_table),
+		', '.join(f'{quote(field.column)} = %s' for field in fields),
+		quote(Product._meta.pk.column),
+	)
+	with connection.cursor() as cursor:
+		for start in range(0, len(products), batch_size):
+			cursor.executemany(sql, [
+				[field.get_db_prep_save(getattr(product, field.attname), connection)
+					for field in fields] + [product.pk]
+				for product in products[start:start + batch_size]
+			])
+
+
+def upsert(rows, batch_size=500):
+	'''
+		Write validated rows (index -> row, see validate) in batches of
+		'batch_size'. Returns index -> result, whose 'status' is 'created',
+		'updated' or 'invalid' for a slug held by several products.
+	'''
+	results, created, updated = {}, {}, {}
+	now = timezone.now()
+
+	with transaction.atomic():
+		stored = stored_products((row['slug'] for row in rows.values()), batch_size)
+		touched = set()
+		for index, row in rows.items():
+			matches = stored.get(row['slug'], [])
+			touched.add(row['category_id'])
+			if not matches:
+				created[index] = Product(**row)
+			elif len(matches) == 1:
+				pk, category_id = matches[0]
+				touched.add(category_id)
+				updated[index] = Product(id=pk, updated_at=now, **row)
+			else:
+				results[index] = {'status': 'invalid', 'errors': {
+					'slug': [f'held by {len(matches)} products, update them one by one'],
+				}}
+
+		Product.objects.bulk_create(created.values(), batch_size=batch_size)
+		update_products(list(updated.values()), batch_size)
+		rebuild(touched)
+
+	for status, products in (('created', created), ('updated', updated)):
+		for index, product in products.items():
+			results[index] = {'status': status, 'id': product.id}
+	return results
@@ -0,0 +1,113 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+	patch_vary_headers)
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+	'''
+		Conditional GET for list and retrieve of a ModelViewSet.
+
+		The ETag hashes the url, the renderer and the 'etag_fields' of the
+		rows on the page (plus its next / previous links), so it is known
+		right after the page query. A matching If-None-Match gets a 304
+		without serializing anything, and serialized pages are cached under
+		their ETag so a write simply makes a new key. Detail responses also
+		send Last-Modified from 'last_modified_field'; lists do not, as a
+		deleted row would not move it.
+
+		'alist' / 'aretrieve' do the same for AsyncReadMixin.
+	'''
+	etag_fields = ('id',)
+	last_modified_field = None
+
+	def list(self, request, *args, **kwargs):
+		queryset = self.filter_queryset(self.get_queryset())
+		page = self.paginate_queryset(queryset)
+		rows = list(queryset) if page is None else page
+		return self.conditional_response(request, *self._list_parts(rows, page))
+
+	async def alist(self, request, *args, **kwargs):
+		queryset = self.filter_queryset(self.get_queryset())
+		page = await self.apaginate_queryset(queryset)
+		rows = [row async for row in queryset.aiterator()] if page is None else page
+		return await self.aconditional_response(request, *self._list_parts(rows, page))
+
+	def retrieve(self, request, *args, **kwargs):
+		return self.conditional_response(request, *self._detail_parts(self.get_object()))
+
+	async def aretrieve(self, request, *args, **kwargs):
+		instance = await self.aget_object()
+		return await self.aconditional_response(request, *self._detail_parts(instance))
+
+	def _list_parts(self, rows, page):
+		''' (rows, render, last_modified, extra) of a list response '''
+		links = ()
+		if page is not None:
+			links = (self.paginator.get_next_link(), self.paginator.get_previous_link())
+
+		def render():
+			data = self.get_serializer(rows, many=True).data
+			if page is not None:
+				return self.get_paginated_response(data).data
+			return data
+
+		return rows, render, None, links
+
+	def _detail_parts(self, instance):
+		last_modified = None
+		if self.last_modified_field:
+			# HTTP dates have whole seconds
+			last_modified = int(getattr(instance, self.last_modified_field).timestamp())
+		return [instance], lambda: self.get_serializer(instance).data, last_modified, ()
+
+	def conditional_response(self, request, rows, render, last_modified=None, extra=()):
+		etag = self.get_etag(request, rows, extra)
+		response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+		if response is None:
+			key = self._cache_key(etag)
+			data = cache.get(key)
+			if data is None:
+				data = render()
+				cache.set(key, data, settings.CATALOGUE_RESPONSE_CACHE_TTL)
+			response = Response(data)
+		return self._patch_headers(response, etag, last_modified)
+
+	async def aconditional_response(self, request, rows, render, last_modified=None, extra=()):
+		etag = self.get_etag(request, rows, extra)
+		response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+		if response is None:
+			key = self._cache_key(etag)
+			data = await cache.aget(key)
+			if data is None:
+				data = render()
+				await cache.aset(key, data, settings.CATALOGUE_RESPONSE_CACHE_TTL)
+			response = Response(data)
+		return self._patch_headers(response, etag, last_modified)
+
+	def _cache_key(self, etag):
+		return f'catalogue:{self.basename}:{etag}'
+
+	def _patch_headers(self, response, etag, last_modified):
+		response['ETag'] = etag
+		if last_modified is not None:
+			response['Last-Modified'] = http_date(last_modified)
+		patch_cache_control(response, public=True, max_age=settings.CATALOGUE_CACHE_MAX_AGE)
+		patch_vary_headers(response, ['Accept'])
+		return response
+
+	def get_etag(self, request, rows, extra=()):
+		digest = hashlib.md5(usedforsecurity=False)
+		digest.update(request.get_full_path().encode())
+		digest.update(request.accepted_renderer.format.encode())
+		for value in extra:
+			digest.update(repr(value).encode())
+		for row in rows:
+			digest.update(repr([getattr(row, field) for field in self.etag_fields]).encode())
+		return f'"{digest.hexdigest()}"'
@@ -0,0 +1,87 @@
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+def _decimal(value):
+	try:
+		number = Decimal(value)
+	except InvalidOperation:
+		return None
+	return number if number.is_finite() else None
+
+
+def _datetime(value):
+	try:
+		moment = parse_datetime(value)
+	except ValueError:
+		return None
+	if moment is not None and timezone.is_naive(moment):
+		moment = timezone.make_aware(moment)
+	return moment
+
+
+def _boolean(value):
+	return {'true': True, '1': True, 'false': False, '0': False}.get(value.lower())
+
+
+def _ids(value):
+	try:
+		return [int(pk) for pk in value.split(',')]
+	except ValueError:
+		return None
+
+
+class ProductFilterBackend(BaseFilterBackend):
+	'''
+		Product filters pushed down to SQL:
+
+		?is_active=true|false
+		?category=<id>[,<id>...]
+		?min_price= / ?max_price=                   regular_price range
+		?min_discount_price= / ?max_discount_price= discount_price range
+		?created_after= / ?created_before=          ISO 8601, created_at window
+
+		Bounds are inclusive, except created_before. Only the active
+		catalogue is indexed for them: the (category, regular_price),
+		(regular_price) and (created_at) indexes of Product are partial,
+		WHERE is_active, so SQLite uses them only with ?is_active=true.
+		Without it, or for inactive products and discount_price ranges,
+		the rows are read through the created_at, id index of the list
+		ordering (or the category foreign key index) and the filters are
+		checked row by row.
+	'''
+	# query param -> (lookup, parser, message on a bad value)
+	params = {
+		'is_active': ('is_active', _boolean, 'expected true or false'),
+		'category': ('category__in', _ids, 'expected comma separated ids'),
+		'min_price': ('regular_price__gte', _decimal, 'expected a number'),
+		'max_price': ('regular_price__lte', _decimal, 'expected a number'),
+		'min_discount_price': ('discount_price__gte', _decimal, 'expected a number'),
+		'max_discount_price': ('discount_price__lte', _decimal, 'expected a number'),
+		'created_after': ('created_at__gte', _datetime, 'expected an ISO 8601 datetime'),
+		'created_before': ('created_at__lt', _datetime, 'expected an ISO 8601 datetime'),
+	}
+
+	def filter_queryset(self, request, queryset, view):
+		filters, errors = {}, {}
+		for param, (lookup, parse, message) in self.params.items():
+			value = request.query_params.get(param)
+			if value is None:
+				continue
+			parsed = parse(value)
+			if parsed is None:
+				errors[param] = message
+			else:
+				filters[lookup] = parsed
+
+		if errors:
+			raise ValidationError(errors)
+		# a single category is an equality, which the composite index can
+		# keep seeking on for the price column after it
+		if len(filters.get('category__in', ())) == 1:
+			filters['category'] = filters.pop('category__in')[0]
+		return queryset.filter(**filters)
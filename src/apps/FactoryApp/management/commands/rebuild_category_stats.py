@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.FactoryApp.stats import rebuild
+
+
+class Command(BaseCommand):
+	help = 'Recompute CategoryStats from Product, repairing rows that drifted'
+
+	def add_arguments(self, parser):
+		parser.add_argument('category', nargs='*', type=int,
+			help='ids of the categories to rebuild, every category by default')
+
+	def handle(self, *args, **options):
+		drifted = rebuild(options['category'] or None)
+		if drifted:
+			ids = ', '.join(map(str, drifted))
+			self.stdout.write(f'repaired {len(drifted)} categories: {ids}')
+		else:
+			self.stdout.write('category stats are up to date')
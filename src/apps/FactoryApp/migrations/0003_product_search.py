@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# the FTS5 table searched by apps.FactoryApp.search and the triggers keeping
+# it in step with Product and Category, changes to them need a new migration
+CREATE_SQL = [
+    '''CREATE VIRTUAL TABLE "FactoryApp_product_fts" USING fts5(
+        title, description, category, tokenize = 'unicode61 remove_diacritics 2'
+    )''',
+    '''CREATE TRIGGER "FactoryApp_product_fts_ai" AFTER INSERT ON "FactoryApp_product" BEGIN
+        INSERT INTO "FactoryApp_product_fts" (rowid, title, description, category)
+        VALUES (new.id, new.title, new.description,
+            (SELECT name FROM "FactoryApp_category" WHERE id = new.category_id));
+    END''',
+    '''CREATE TRIGGER "FactoryApp_product_fts_au" AFTER UPDATE OF title, description, category_id
+    ON "FactoryApp_product" BEGIN
+        DELETE FROM "FactoryApp_product_fts" WHERE rowid = old.id;
+        INSERT INTO "FactoryApp_product_fts" (rowid, title, description, category)
+        VALUES (new.id, new.title, new.description,
+            (SELECT name FROM "FactoryApp_category" WHERE id = new.category_id));
+    END''',
+    '''CREATE TRIGGER "FactoryApp_product_fts_ad" AFTER DELETE ON "FactoryApp_product" BEGIN
+        DELETE FROM "FactoryApp_product_fts" WHERE rowid = old.id;
+    END''',
+    '''CREATE TRIGGER "FactoryApp_product_fts_cu" AFTER UPDATE OF name ON "FactoryApp_category" BEGIN
+        UPDATE "FactoryApp_product_fts" SET category = new.name
+        WHERE rowid IN (SELECT id FROM "FactoryApp_product" WHERE category_id = new.id);
+    END''',
+    '''INSERT INTO "FactoryApp_product_fts" (rowid, title, description, category)
+        SELECT p.id, p.title, p.description, c.name
+        FROM "FactoryApp_product" p JOIN "FactoryApp_category" c ON c.id = p.category_id''',
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS "FactoryApp_product_fts_ai"',
+    'DROP TRIGGER IF EXISTS "FactoryApp_product_fts_au"',
+    'DROP TRIGGER IF EXISTS "FactoryApp_product_fts_ad"',
+    'DROP TRIGGER IF EXISTS "FactoryApp_product_fts_cu"',
+    'DROP TABLE IF EXISTS "FactoryApp_product_fts"',
+]
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite only, apps.FactoryApp.search falls back to icontains
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in CREATE_SQL:
+            schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in DROP_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FactoryApp', '0002_product_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
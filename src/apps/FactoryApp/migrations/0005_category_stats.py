@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q, Sum
+
+
+def build_category_stats(apps, schema_editor):
+    ''' the GROUP BY of stats.aggregate, over the historical models '''
+    Product = apps.get_model('FactoryApp', 'Product')
+    CategoryStats = apps.get_model('FactoryApp', 'CategoryStats')
+
+    aggregates = {
+        'product_count': Count('id'),
+        'active_count': Count('id', filter=Q(is_active=True)),
+    }
+    for price in ('regular_price', 'discount_price'):
+        aggregates[f'{price}_sum'] = Sum(price)
+        aggregates[f'{price}_min'] = Min(price)
+        aggregates[f'{price}_max'] = Max(price)
+    rows = Product.objects.order_by().values('category_id').annotate(**aggregates)
+    CategoryStats.objects.bulk_create(CategoryStats(**row) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FactoryApp', '0004_product_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='FactoryApp.category')),
+                ('product_count', models.PositiveIntegerField(default=0)),
+                ('active_count', models.PositiveIntegerField(default=0)),
+                ('regular_price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('regular_price_min', models.DecimalField(decimal_places=2, max_digits=5, null=True)),
+                ('regular_price_max', models.DecimalField(decimal_places=2, max_digits=5, null=True)),
+                ('discount_price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('discount_price_min', models.DecimalField(decimal_places=2, max_digits=5, null=True)),
+                ('discount_price_max', models.DecimalField(decimal_places=2, max_digits=5, null=True)),
+            ],
+        ),
+        migrations.RunPython(build_category_stats, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
 
@@ -9,6 +9,9 @@ class Category(models.Model):
         return self.name
 
 
+ACTIVE = models.Q(is_active=True)
+
+
 class Product(models.Model):
     """
     The Product table containing all product items.
@@ -56,5 +59,52 @@ class Product(models.Model):
         _("Created at"), auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination of the list endpoint
+            models.Index(fields=['created_at', 'id'],
+                         name='product_created_id_idx'),
+            # filters of ProductFilterBackend over the active catalogue, which
+            # nearly every storefront query pins. Partial indexes rather than
+            # a leading is_active column: Django compiles is_active=True to a
+            # bare "is_active" term that SQLite matches against an index
+            # condition but cannot seek on as a column.
+            models.Index(fields=['category', 'regular_price'], condition=ACTIVE,
+                         name='product_active_cat_price_idx'),
+            models.Index(fields=['regular_price'], condition=ACTIVE,
+                         name='product_active_price_idx'),
+            models.Index(fields=['created_at'], condition=ACTIVE,
+                         name='product_active_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        # the CategoryStats update of the post_save signal commits together
+        # with the row (deletes already run in a transaction)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class CategoryStats(models.Model):
+    """
+    Product aggregates of a category, kept up to date by the Product signals
+    in apps.FactoryApp.stats. Averages are sum / count, computed on read.
+    `manage.py rebuild_category_stats` recomputes the table from Product.
+    """
+    category = models.OneToOneField(
+        Category, on_delete=models.CASCADE, primary_key=True,
+        related_name='stats',
+    )
+    product_count = models.PositiveIntegerField(default=0)
+    active_count = models.PositiveIntegerField(default=0)
+    regular_price_sum = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    regular_price_min = models.DecimalField(max_digits=5, decimal_places=2, null=True)
+    regular_price_max = models.DecimalField(max_digits=5, decimal_places=2, null=True)
+    discount_price_sum = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    discount_price_min = models.DecimalField(max_digits=5, decimal_places=2, null=True)
+    discount_price_max = models.DecimalField(max_digits=5, decimal_places=2, null=True)
+
+    def __str__(self):
+        return f'{self.category_id}: {self.product_count} products'
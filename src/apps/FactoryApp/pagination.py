@@ -0,0 +1,6 @@
+from MyProject.pagination import KeysetPagination
+
+
+class ProductPagination(KeysetPagination):
+	# backed by the (created_at, id) index
+	ordering = ('-created_at', '-id')
@@ -0,0 +1,76 @@
+'''
+	Full text search of products.
+
+	On SQLite the catalogue is indexed by an FTS5 table kept up to date by
+	triggers (created by migration 0003_product_search), so bulk_create,
+	queryset.update() and raw SQL are indexed too, not only model saves.
+	Other databases fall back to icontains.
+'''
+import re
+
+from django.db import connection
+from django.db.models import Case, Q, When
+
+FTS_TABLE = 'FactoryApp_product_fts'
+
+# column weights for bm25, a title hit counts more than a category or
+# description one
+TITLE_WEIGHT, DESCRIPTION_WEIGHT, CATEGORY_WEIGHT = 10.0, 1.0, 5.0
+RANK_FUNCTION = f'bm25({TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}, {CATEGORY_WEIGHT})'
+
+
+def fts_available(using=connection):
+	return using.vendor == 'sqlite'
+
+
+def terms(query):
+	''' words of the query, lower cased, at most 10 '''
+	return re.findall(r'\w+', query.lower())[:10]
+
+
+def match_expression(words):
+	'''
+		FTS5 MATCH string: every word must be present, the last one as a
+		prefix so results show up while the user is typing. Words are quoted,
+		which keeps FTS5 operators in user input from being interpreted.
+	'''
+	quoted = [f'"{word}"' for word in words]
+	quoted[-1] += '*'
+	return ' '.join(quoted)
+
+
+def ranked_ids(query, limit, offset=0):
+	'''
+		ids of the best matching products, best first, newest first among
+		equal scores. Every match is scored, the sort keeps only the top
+		offset + limit rows (ORDER BY rank with a LIMIT).
+	'''
+	words = terms(query)
+	if not words:
+		return []
+	with connection.cursor() as cursor:
+		cursor.execute(
+			f'SELECT rowid FROM "{FTS_TABLE}" '
+			f'WHERE "{FTS_TABLE}" MATCH %s AND rank MATCH %s '
+			f'ORDER BY rank, rowid DESC LIMIT %s OFFSET %s',
+			[match_expression(words), RANK_FUNCTION, limit, offset],
+		)
+		return [row[0] for row in cursor.fetchall()]
+
+
+def search_products(queryset, query, limit=20, offset=0):
+	''' products of 'queryset' matching 'query', best match first '''
+	if not terms(query):
+		return queryset.none()
+	if fts_available(connection):
+		ids = ranked_ids(query, limit, offset)
+		if not ids:
+			return queryset.none()
+		order = Case(*[When(id=pk, then=position) for position, pk in enumerate(ids)])
+		return queryset.filter(id__in=ids).order_by(order)
+
+	condition = Q()
+	for word in terms(query):
+		condition &= (Q(title__icontains=word) | Q(description__icontains=word)
+			| Q(category__name__icontains=word))
+	return queryset.filter(condition).order_by('-id')[offset:offset + limit]
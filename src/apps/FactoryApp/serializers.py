@@ -1,7 +1,11 @@
+from decimal import Decimal
+
 from rest_framework.serializers import ModelSerializer
 from rest_framework import serializers
 from .models import Product, Category
 
+CENT = Decimal('0.01')
+
 
 class ProductSerializer(ModelSerializer):
 	class Meta:
@@ -13,7 +17,53 @@ class ProductSerializer(ModelSerializer):
 			raise serializers.ValidationError('slug is required')
 
 		return slug
+
+class ProductUpsertSerializer(ProductSerializer):
+	'''
+		An item of the bulk upsert. The category is a plain id, the view
+		checks them all with one query instead of one per item.
+	'''
+	category = serializers.IntegerField(min_value=1)
+
+	class Meta:
+		model = Product
+		fields = [
+			'slug', 'title', 'category', 'description', 'regular_price',
+			'discount_price', 'is_active',
+		]
+
 class CategorySerializer(ModelSerializer):
 	class Meta:
 		model = Category
 		fields = "__all__"
+
+
+class CategoryStatsSerializer(ModelSerializer):
+	'''
+		A category with the aggregates of its products, read from the
+		CategoryStats row that select_related('stats') joined in.
+	'''
+	class Meta:
+		model = Category
+		fields = ['id', 'name']
+
+	def to_representation(self, category):
+		data = super().to_representation(category)
+		# no row yet: a category nothing was ever saved in
+		stats = getattr(category, 'stats', None)
+		count = stats.product_count if stats else 0
+		data['product_count'] = count
+		data['active_count'] = stats.active_count if stats else 0
+		for price in ('regular_price', 'discount_price'):
+			total = getattr(stats, f'{price}_sum', None)
+			data[price] = {
+				'min': self._price(getattr(stats, f'{price}_min', None)),
+				'avg': self._price(total / count) if count else None,
+				'max': self._price(getattr(stats, f'{price}_max', None)),
+			}
+		return data
+
+	@staticmethod
+	def _price(value):
+		# the same 2 decimals string DecimalField renders for a product
+		return None if value is None else str(Decimal(value).quantize(CENT))
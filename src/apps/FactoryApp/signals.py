@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.FactoryApp.models import Product
+from apps.FactoryApp.stats import TRACKED, apply, state, stored_state
+
+
+def _tracked_in(update_fields):
+	''' the tracked columns written by a save(update_fields=...) '''
+	columns = {Product._meta.get_field(name).attname for name in update_fields}
+	return [column for column in TRACKED if column in columns]
+
+
+@receiver(pre_save, sender=Product)
+def product_stats_before(sender, instance, raw, update_fields=None, *args, **kwargs):
+	''' remember what the row counted for before the save overwrites it '''
+
+	instance._stats_before = None
+	if raw or instance.pk is None:
+		return
+	if update_fields is not None and not _tracked_in(update_fields):
+		return
+	instance._stats_before = stored_state(instance.pk)
+
+
+@receiver(post_save, sender=Product)
+def product_stats_saved(sender, instance, created, raw, update_fields=None, *args, **kwargs):
+	''' move the product's contribution in CategoryStats to its new values '''
+
+	if raw:
+		return
+	before = instance.__dict__.pop('_stats_before', None)
+	if before is None and not created:
+		return
+	after = state(instance)
+	if before is not None and update_fields is not None:
+		# columns left out of update_fields were not written
+		after = before | {column: after[column] for column in _tracked_in(update_fields)}
+	apply(before, after)
+
+
+@receiver(post_delete, sender=Product)
+def product_stats_deleted(sender, instance, *args, **kwargs):
+	''' take a deleted product out of CategoryStats '''
+
+	apply(state(instance), None)
@@ -0,0 +1,149 @@
+'''
+	Per category product aggregates, stored in CategoryStats.
+
+	A product save or delete applies its difference to the category's row
+	with one UPDATE of F() expressions, so concurrent writers never lose a
+	count. Min and max cannot be taken back: when a removed price was a
+	bound of its category, a CASE in that same UPDATE recomputes the bound
+	from Product. Moving a product to another category updates both rows.
+	Writes that skip the model signals (bulk_create, queryset.update(), raw
+	SQL, loaddata) leave the table behind until
+	`manage.py rebuild_category_stats`.
+'''
+from django.db import transaction
+from django.db.models import (Case, Count, F, Max, Min, OuterRef, Q, Subquery, Sum,
+                              Value, When)
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from .models import CategoryStats, Product
+
+PRICES = ('regular_price', 'discount_price')
+# Product columns the aggregates depend on
+TRACKED = ('category_id', 'is_active') + PRICES
+
+FIELDS = ['product_count', 'active_count'] + [
+	f'{price}_{aggregate}' for price in PRICES for aggregate in ('sum', 'min', 'max')
+]
+# what a category without products has, whether or not its row exists
+EMPTY = {field: None for field in FIELDS} | {
+	'product_count': 0, 'active_count': 0, 'regular_price_sum': 0, 'discount_price_sum': 0,
+}
+
+
+def state(product):
+	''' the tracked columns of an in memory product '''
+	return {
+		column: Product._meta.get_field(column).to_python(getattr(product, column))
+		for column in TRACKED
+	}
+
+
+def stored_state(pk):
+	''' the tracked columns of a product as they are in the database '''
+	return Product.objects.filter(pk=pk).values(*TRACKED).first()
+
+
+def apply(before, after):
+	''' move a product's contribution from 'before' to 'after', None is no row '''
+	if before == after:
+		return
+	with transaction.atomic():
+		if before is not None and after is not None \
+				and before['category_id'] == after['category_id']:
+			_update(after['category_id'], before, after)
+			return
+		if before is not None:
+			_update(before['category_id'], before, None)
+		if after is not None:
+			_update(after['category_id'], None, after)
+
+
+def _update(category_id, removed, added):
+	'''
+		One UPDATE of the category's row taking 'removed' out and putting
+		'added' in (either may be None), with only the columns that change.
+		The row is rebuilt from Product when it does not exist yet.
+	'''
+	def delta(column):
+		return ((added[column] if added is not None else 0)
+				- (removed[column] if removed is not None else 0))
+
+	changes = {}
+	counts = {
+		'product_count': (added is not None) - (removed is not None),
+		'active_count': delta('is_active'),
+	}
+	for field, count in counts.items():
+		if count:
+			changes[field] = F(field) + count
+
+	for price in PRICES:
+		if removed is not None and added is not None and removed[price] == added[price]:
+			continue
+		changes[f'{price}_sum'] = F(f'{price}_sum') + Value(delta(price))
+
+		low, high = F(f'{price}_min'), F(f'{price}_max')
+		if removed is not None:
+			# the signals run after the write, Product already is the new state
+			products = (Product.objects.filter(category_id=OuterRef('pk'))
+						.order_by().values('category_id'))
+			low = Case(
+				When(**{f'{price}_min__gte': removed[price]},
+					 then=Subquery(products.annotate(bound=Min(price)).values('bound'))),
+				default=low,
+			)
+			high = Case(
+				When(**{f'{price}_max__lte': removed[price]},
+					 then=Subquery(products.annotate(bound=Max(price)).values('bound'))),
+				default=high,
+			)
+		if added is not None:
+			# idempotent, whether or not a recomputed bound already saw it
+			value = Value(added[price])
+			low = Least(Coalesce(low, value), value)
+			high = Greatest(Coalesce(high, value), value)
+		changes[f'{price}_min'], changes[f'{price}_max'] = low, high
+
+	# apply() returns early on equal states, 'changes' is never empty
+	if not CategoryStats.objects.filter(pk=category_id).update(**changes):
+		# first product of the category, or its row was never built
+		rebuild([category_id])
+
+
+def aggregate(products):
+	''' category id -> CategoryStats values, one GROUP BY over 'products' '''
+	aggregates = {
+		'product_count': Count('id'),
+		'active_count': Count('id', filter=Q(is_active=True)),
+	}
+	for price in PRICES:
+		aggregates[f'{price}_sum'] = Sum(price)
+		aggregates[f'{price}_min'] = Min(price)
+		aggregates[f'{price}_max'] = Max(price)
+	rows = products.order_by().values('category_id').annotate(**aggregates)
+	return {row.pop('category_id'): row for row in rows}
+
+
+def rebuild(category_ids=None):
+	'''
+		Recompute the rows of 'category_ids', every category by default,
+		from Product. Returns the ids of the rows that were out of date.
+	'''
+	products = Product.objects.all()
+	stored = CategoryStats.objects.all()
+	if category_ids is not None:
+		products = products.filter(category_id__in=category_ids)
+		stored = stored.filter(category_id__in=category_ids)
+
+	with transaction.atomic():
+		expected = aggregate(products)
+		current = {row.pop('category_id'): row for row in stored.values('category_id', *FIELDS)}
+		drifted = sorted(
+			pk for pk in expected.keys() | current.keys()
+			if expected.get(pk, EMPTY) != current.get(pk, EMPTY)
+		)
+		CategoryStats.objects.filter(category_id__in=drifted).delete()
+		CategoryStats.objects.bulk_create(
+			CategoryStats(category_id=pk, **expected[pk]) for pk in drifted if pk in expected
+		)
+	return drifted
@@ -1,13 +1,103 @@
 from django.shortcuts import render
 from rest_framework import viewsets
-from .serializers import ProductSerializer, CategorySerializer
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.response import Response
+from apps.Metrics.mixins import TimedSerializerMixin
+from MyProject.asyncviews import AsyncReadMixin
+from MyProject.replica import ReplicaReadMixin
+from . import bulk
+from .caching import ConditionalGetMixin
+from .serializers import (ProductSerializer, CategorySerializer, CategoryStatsSerializer,
+	ProductUpsertSerializer)
 from .models import Product, Category
+from .filters import ProductFilterBackend
+from .pagination import ProductPagination
+from .search import search_products
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(TimedSerializerMixin, ConditionalGetMixin, ReplicaReadMixin, AsyncReadMixin,
+		viewsets.ModelViewSet):
 	serializer_class = ProductSerializer
 	queryset = Product.objects.all()
+	pagination_class = ProductPagination
+	# every save moves updated_at, writes through queryset.update() must set it
+	etag_fields = ('id', 'updated_at')
+	last_modified_field = 'updated_at'
+	filter_backends = [ProductFilterBackend, OrderingFilter]
+	# ?ordering=regular_price / -discount_price / created_at ..., the pagination
+	# adds 'id' to keep pages stable
+	ordering_fields = ['regular_price', 'discount_price', 'created_at']
+	search_page_size = 20
+	search_max_page_size = 100
+	# rows per statement of the bulk upsert
+	upsert_batch_size = 500
+	# largest list accepted by the bulk upsert in one request
+	upsert_max_rows = 10000
 
-class CategoryViewSet(viewsets.ModelViewSet):
+	@action(detail=False, methods=['get'])
+	def search(self, request):
+		''' /api/product/search/?q=<words>&limit=&offset=, best match first '''
+		query = request.query_params.get('q', '').strip()
+		if not query:
+			raise ValidationError({'q': 'this query parameter is required'})
+		limit = self._int_param(request, 'limit', self.search_page_size, minimum=1)
+		offset = self._int_param(request, 'offset', 0, minimum=0)
+		limit = min(limit, self.search_max_page_size)
+
+		products = search_products(self.get_queryset(), query, limit, offset)
+		serializer = self.get_serializer(products, many=True)
+		return Response({'results': serializer.data})
+
+	@action(detail=False, methods=['post'], url_path='bulk-upsert')
+	def bulk_upsert(self, request):
+		'''
+			Create or replace a list of products keyed on slug. Valid items
+			are written even when others are not, 'results' has the outcome
+			of every item in request order.
+		'''
+		items = request.data
+		if not isinstance(items, list):
+			raise ValidationError('expected a list of products')
+		if len(items) > self.upsert_max_rows:
+			raise ValidationError(
+				f'at most {self.upsert_max_rows} products can be upserted per request'
+			)
+
+		rows, errors = bulk.validate(items, ProductUpsertSerializer())
+		results = bulk.upsert(rows, batch_size=self.upsert_batch_size)
+		for index, detail in errors.items():
+			results[index] = {'status': 'invalid', 'errors': detail}
+
+		ordered = []
+		for index, item in enumerate(items):
+			slug = item.get('slug') if isinstance(item, dict) else None
+			ordered.append({'index': index, 'slug': slug, **results[index]})
+		summary = {status: 0 for status in ('created', 'updated', 'invalid')}
+		for result in ordered:
+			summary[result['status']] += 1
+		return Response({**summary, 'results': ordered})
+
+	@staticmethod
+	def _int_param(request, param, default, minimum):
+		try:
+			value = int(request.query_params.get(param, default))
+		except ValueError:
+			value = None
+		if value is None or value < minimum:
+			raise ValidationError({param: f'expected an integer >= {minimum}'})
+		return value
+
+class CategoryViewSet(TimedSerializerMixin, ConditionalGetMixin, AsyncReadMixin,
+		viewsets.ModelViewSet):
 	serializer_class = CategorySerializer
 	queryset = Category.objects.all()
+	# no updated_at, the serialized fields are the version
+	etag_fields = ('id', 'name')
+
+	@action(detail=False, methods=['get'])
+	def stats(self, request):
+		''' /api/category/stats/, product aggregates of every category '''
+		categories = self.get_queryset().select_related('stats').order_by('id')
+		return Response(CategoryStatsSerializer(categories, many=True).data)
@@ -0,0 +1,55 @@
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .models import ProfileRecord
+from .profiling import artifact_path, summary
+
+
+class ProfileRecordAdmin(admin.ModelAdmin):
+    ''' profiles are read and deleted here, never written '''
+    list_display = ['created_at', 'method', 'path', 'status_code', 'duration_ms', 'user',
+                    'download']
+    list_filter = ['endpoint', 'method']
+    search_fields = ['path']
+    fields = ['created_at', 'user', 'method', 'path', 'endpoint', 'status_code',
+              'duration_ms', 'size', 'download', 'top_functions']
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path('<int:pk>/download/', self.admin_site.admin_view(self.download_view),
+                 name='Metrics_profilerecord_download'),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        record = self.get_object(request, pk)
+        if record is None or not self.has_view_permission(request, record):
+            raise Http404
+        try:
+            artifact = open(artifact_path(record), 'rb')
+        except FileNotFoundError:
+            raise Http404('the profile file is gone')
+        return FileResponse(artifact, as_attachment=True, filename=record.artifact)
+
+    @admin.display(description='stats')
+    def download(self, record):
+        url = reverse('admin:Metrics_profilerecord_download', args=[record.pk])
+        return format_html('<a href="{}">{}</a>', url, record.artifact)
+
+    @admin.display(description='top functions (cumulative)')
+    def top_functions(self, record):
+        try:
+            return format_html('<pre>{}</pre>', summary(record))
+        except FileNotFoundError:
+            return 'the profile file is gone'
+
+
+admin.site.register(ProfileRecord, ProfileRecordAdmin)
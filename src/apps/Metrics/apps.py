@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class MetricsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.Metrics'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from apps.Metrics.recorder import install_query_recorder
+
+        connection_created.connect(install_query_recorder)
+        import apps.Metrics.signals
@@ -0,0 +1,67 @@
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from apps.Metrics.recorder import RequestMetrics, current
+from apps.Metrics.sinks import get_sink
+
+
+class MetricsMiddleware:
+    '''
+        Measures METRICS_SAMPLE_RATE of the requests: DB queries and time,
+        serializer time (views with TimedSerializerMixin) and total time.
+        They are sent to the METRICS_SINK and, with METRICS_SERVER_TIMING,
+        back to the client as a Server-Timing header. Put it first in
+        MIDDLEWARE so the total covers the other middleware too.
+    '''
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        token = current.set(RequestMetrics())
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics = current.get().finish()
+            current.reset(token)
+        return self.record(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        token = current.set(RequestMetrics())
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics = current.get().finish()
+            current.reset(token)
+        return self.record(request, response, metrics)
+
+    def sampled(self):
+        rate = settings.METRICS_SAMPLE_RATE
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def record(self, request, response, metrics):
+        get_sink().record(endpoint(request), metrics)
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = metrics.server_timing()
+        return response
+
+
+def endpoint(request):
+    ''' "GET transaction-list": the method and the url name, never the raw path '''
+    match = getattr(request, 'resolver_match', None)
+    name = match.view_name if match is not None and match.url_name else 'unmatched'
+    return f'{request.method} {name}'
@@ -0,0 +1,14 @@
+from apps.Metrics.recorder import current, timed
+
+
+class TimedSerializerMixin:
+    '''
+        Adds the time serializing the response of a sampled request to its
+        metrics (the 'ser' entry of Server-Timing).
+    '''
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if current.get() is not None:
+            serializer.to_representation = timed(serializer.to_representation)
+        return serializer
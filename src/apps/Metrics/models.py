@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.db import models
+
+
+class ProfileRecord(models.Model):
+    ''' a request profiled on demand, its call tree is 'artifact' under PROFILING_DIR '''
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2000)
+    endpoint = models.CharField(max_length=200)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    artifact = models.CharField(max_length=200)
+    size = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self) -> str:
+        return f'{self.method} {self.path} ({self.duration_ms:.0f} ms)'
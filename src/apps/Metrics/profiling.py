@@ -0,0 +1,124 @@
+'''
+    On-demand profiling of a single request.
+
+    A staff user adds '?_profile=1' or an 'X-Profile: 1' header and the
+    request runs under cProfile. The stats (pstats' marshal format) are
+    gzipped into PROFILING_DIR and listed in the admin as ProfileRecords.
+    Each user may profile PROFILING_RATE requests per PROFILING_RATE_WINDOW
+    seconds; the others are served as usual with 'X-Profile: rate-limited'.
+
+    Off unless PROFILING_ENABLED: the middleware then removes itself from
+    the chain when it is loaded, so requests pay nothing for it.
+'''
+import cProfile
+import gzip
+import io
+import marshal
+import os
+import pstats
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+
+from apps.Metrics.middleware import endpoint
+from apps.Metrics.models import ProfileRecord
+
+QUERY_PARAM = '_profile'
+HEADER = 'X-Profile'
+
+
+class ProfilingMiddleware:
+    ''' goes after AuthenticationMiddleware, it needs request.user '''
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not requested(request) or not request.user.is_staff:
+            return self.get_response(request)
+        if not allowed(request.user):
+            response = self.get_response(request)
+            response[HEADER] = 'rate-limited'
+            return response
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration = time.perf_counter() - start
+
+        record = save(profiler, request, response, duration)
+        response[HEADER] = str(record.pk)
+        return response
+
+
+def requested(request):
+    return request.GET.get(QUERY_PARAM) == '1' or request.headers.get(HEADER) == '1'
+
+
+def allowed(user):
+    ''' count this profile against the user's rate, False once it is used up '''
+    key = f'profiling:rate:{user.pk}'
+    cache.add(key, 0, settings.PROFILING_RATE_WINDOW)
+    try:
+        return cache.incr(key) <= settings.PROFILING_RATE
+    except ValueError:
+        # expired between add() and incr()
+        return True
+
+
+def save(profiler, request, response, duration):
+    ''' write the gzipped stats of 'profiler' and record them '''
+    profiler.create_stats()
+    data = gzip.compress(marshal.dumps(profiler.stats))
+
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    artifact = f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}.prof.gz'
+    tmp = directory / f'{artifact}.tmp'
+    tmp.write_bytes(data)
+    os.replace(tmp, directory / artifact)
+
+    return ProfileRecord.objects.create(
+        user=request.user, method=request.method, path=request.get_full_path()[:2000],
+        endpoint=endpoint(request), status_code=response.status_code,
+        duration_ms=duration * 1000, artifact=artifact, size=len(data),
+    )
+
+
+def artifact_path(record):
+    return Path(settings.PROFILING_DIR) / record.artifact
+
+
+class _LoadedStats:
+    ''' what pstats.Stats() loads stats from, besides a file name '''
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def load(record):
+    ''' pstats.Stats of a record '''
+    with gzip.open(artifact_path(record), 'rb') as f:
+        return pstats.Stats(_LoadedStats(marshal.load(f)))
+
+
+def summary(record, sort='cumulative', limit=40):
+    ''' the 'limit' top functions by 'sort', as pstats prints them '''
+    stream = io.StringIO()
+    stats = load(record)
+    stats.stream = stream
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
@@ -0,0 +1,77 @@
+'''
+    Per request measurements: DB queries and time, serializer time and
+    total latency.
+
+    'current' holds the RequestMetrics of the request being measured (None
+    when it was not sampled). Queries are counted by an execute wrapper put
+    on every connection when it is created, so the queries of other
+    threads (sync_to_async of the async views, which copies the context)
+    and of other databases land on the same request. An unsampled request
+    costs that wrapper a context variable lookup per query.
+'''
+import time
+from contextvars import ContextVar
+
+current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = None
+        self.total = None
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+        return self
+
+    def server_timing(self):
+        ''' value of the Server-Timing header, durations in milliseconds '''
+        parts = [f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"']
+        if self.serializer_time is not None:
+            parts.append(f'ser;dur={self.serializer_time * 1000:.2f}')
+        parts.append(f'total;dur={self.total * 1000:.2f}')
+        return ', '.join(parts)
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    ''' connection_created receiver '''
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def timed(to_representation):
+    '''
+        'to_representation' adding its time to the serializer time of the
+        current request, less the queries it ran (lazy relations), which
+        are DB time already.
+    '''
+    def wrapper(*args, **kwargs):
+        metrics = current.get()
+        if metrics is None:
+            return to_representation(*args, **kwargs)
+
+        start, db_time = time.perf_counter(), metrics.db_time
+        try:
+            return to_representation(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start - (metrics.db_time - db_time)
+            metrics.serializer_time = (metrics.serializer_time or 0.0) + elapsed
+
+    return wrapper
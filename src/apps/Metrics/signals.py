@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.Metrics.models import ProfileRecord
+from apps.Metrics.profiling import artifact_path
+
+
+@receiver(post_delete, sender=ProfileRecord)
+def artifact_remover(sender, instance, *args, **kwargs):
+    ''' a deleted profile takes its file along '''
+    artifact_path(instance).unlink(missing_ok=True)
@@ -0,0 +1,107 @@
+'''
+    Where the measurements of sampled requests go, picked with
+    settings.METRICS_SINK (a dotted path). A sink has record(endpoint,
+    metrics); one that can also render() is served at /metrics.
+'''
+import logging
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('apps.Metrics')
+
+# upper bounds of the buckets, in seconds and in queries
+SECONDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    ''' cumulative histogram in the Prometheus sense '''
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last one is +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.bounds + ('+Inf',), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum:g}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class HistogramSink:
+    '''
+        Histograms per endpoint kept in memory, rendered in the Prometheus
+        text format. Every process has its own, scrape each of them.
+    '''
+    metrics = (
+        # name, help, bounds, value of a RequestMetrics
+        ('http_request_duration_seconds', 'Total time of the request.', SECONDS,
+         lambda m: m.total),
+        ('http_request_db_seconds', 'Time spent in DB queries.', SECONDS,
+         lambda m: m.db_time),
+        ('http_request_db_queries', 'DB queries per request.', QUERIES,
+         lambda m: m.queries),
+        ('http_request_serializer_seconds', 'Time spent serializing, less its queries.',
+         SECONDS, lambda m: m.serializer_time),
+    )
+
+    def __init__(self):
+        self._histograms = {}   # (name, endpoint) -> Histogram
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, metrics):
+        with self._lock:
+            for name, _, bounds, value in self.metrics:
+                value = value(metrics)
+                if value is None:
+                    continue
+                histogram = self._histograms.get((name, endpoint))
+                if histogram is None:
+                    histogram = self._histograms[name, endpoint] = Histogram(bounds)
+                histogram.observe(value)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, help_text, _, _ in self.metrics:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (metric, endpoint), histogram in sorted(self._histograms.items()):
+                    if metric == name:
+                        lines.extend(histogram.lines(name, f'endpoint="{endpoint}"'))
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+class LogSink:
+    ''' a line per sampled request on the 'apps.Metrics' logger '''
+
+    def record(self, endpoint, metrics):
+        serializer = ('-' if metrics.serializer_time is None
+                      else f'{metrics.serializer_time * 1000:.2f}ms')
+        logger.info('%s queries=%d db=%.2fms ser=%s total=%.2fms', endpoint,
+                    metrics.queries, metrics.db_time * 1000, serializer, metrics.total * 1000)
+
+
+def get_sink():
+    return _sink(settings.METRICS_SINK)
+
+
+@lru_cache(maxsize=None)
+def _sink(path):
+    return import_string(path)()
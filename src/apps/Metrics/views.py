@@ -0,0 +1,11 @@
+from django.http import Http404, HttpResponse
+
+from apps.Metrics.sinks import get_sink
+
+
+def metrics(request):
+    ''' the histograms of this process in the Prometheus text format '''
+    sink = get_sink()
+    if not hasattr(sink, 'render'):
+        raise Http404('the metrics sink has nothing to serve')
+    return HttpResponse(sink.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
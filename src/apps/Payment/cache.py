@@ -0,0 +1,117 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.Payment.models import Currency
+
+
+class CurrencyCache:
+    '''
+        Process local code -> Currency cache with a TTL and LRU eviction.
+
+        Writes to Currency call invalidate() through signals. With a
+        'version_key' the cache also follows a version stored in Django's
+        cache framework, so a write in one process clears every other
+        process within 'version_check_interval' seconds.
+    '''
+
+    def __init__(self, maxsize=256, ttl=300, version_key=None,
+                 version_check_interval=1):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version_key = version_key
+        self.version_check_interval = version_check_interval
+
+        self._entries = OrderedDict()   # code -> (expires_at, currency)
+        self._codes = {}                # id -> code
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked_at = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+            }
+
+    def get(self, code):
+        ''' Currency with this code, raises Currency.DoesNotExist '''
+        currency = self._lookup(code)
+        if currency is None:
+            currency = Currency.objects.get(code=code)
+            self._store(currency)
+        return currency
+
+    def get_by_id(self, pk):
+        with self._lock:
+            code = self._codes.get(pk)
+        currency = self._lookup(code)
+        if currency is None:
+            currency = Currency.objects.get(pk=pk)
+            self._store(currency)
+        return currency
+
+    def invalidate(self):
+        self.clear()
+        if self.version_key:
+            cache.set(self.version_key, uuid.uuid4().hex, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._codes.clear()
+
+    def _lookup(self, code):
+        self._check_version()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(code)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def _store(self, currency):
+        with self._lock:
+            self._entries[currency.code] = (time.monotonic() + self.ttl, currency)
+            self._entries.move_to_end(currency.code)
+            self._codes[currency.pk] = currency.code
+            while len(self._entries) > self.maxsize:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._codes.pop(evicted.pk, None)
+
+    def _check_version(self):
+        if not self.version_key:
+            return
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+
+        version = cache.get(self.version_key)
+        if version != self._version:
+            self.clear()
+            self._version = version
+
+
+currency_cache = CurrencyCache(
+    maxsize=settings.CURRENCY_CACHE_MAXSIZE,
+    ttl=settings.CURRENCY_CACHE_TTL,
+    version_key=settings.CURRENCY_CACHE_VERSION_KEY,
+)
+
+
+def transaction_cache_key(field, value):
+    ''' Django cache key of a transaction looked up by 'field' '''
+    return f'payment:transaction:{field}:{value}'
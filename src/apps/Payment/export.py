@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+from rest_framework import serializers
+
+from apps.Payment.models import PAYMENT_LINK_PREFIX
+
+# same columns, in the same order, as FilledTransactionSerializer
+EXPORT_FIELDS = (
+    'id', 'currency', 'link', 'uid', 'name', 'email', 'creation_date',
+    'payment_intent_id', 'message',
+)
+_COLUMNS = (
+    'id', 'currency__code', 'uid', 'name', 'email', 'creation_date',
+    'payment_intent_id', 'message',
+)
+
+
+def transaction_rows(queryset, chunk_size=2000):
+    '''
+        Yield lists of export rows, one list per 'chunk_size' rows. Rows are
+        read with values_list and a server side iterator, so memory does not
+        grow with the size of the table.
+    '''
+    date_field = serializers.DateTimeField()
+    rows = (
+        queryset.order_by('id')
+        .values_list(*_COLUMNS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    chunk = []
+    for pk, code, uid, name, email, created, intent, message in rows:
+        chunk.append([
+            pk, code, f'{PAYMENT_LINK_PREFIX}{pk}', str(uid), name, email,
+            date_field.to_representation(created), intent, message,
+        ])
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ndjson_stream(chunks):
+    for chunk in chunks:
+        yield ''.join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False,
+                       separators=(',', ':')) + '\n'
+            for row in chunk
+        )
+
+
+def csv_stream(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_stream(stream):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for text in stream:
+        data = compressor.compress(text.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def async_stream(stream):
+    '''
+        'stream' as an async iterator, for StreamingHttpResponse under ASGI,
+        which would otherwise read a sync iterator to the end before sending
+        anything. Every chunk is read by sync_to_async, in the one thread
+        of the request, which keeps the cursor of the rows.
+    '''
+    iterator = iter(stream)
+    done = object()
+    while (chunk := await sync_to_async(next)(iterator, done)) is not done:
+        yield chunk
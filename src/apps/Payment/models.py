@@ -2,6 +2,9 @@ import uuid
 
 from django.db import models
 
+# payment form of a transaction is PAYMENT_LINK_PREFIX + id
+PAYMENT_LINK_PREFIX = 'http://127.0.0.1:8000/payment/'
+
 
 class Currency(models.Model):
     """Currency model"""
@@ -16,7 +19,7 @@ class Currency(models.Model):
 
 
 class Transaction(models.Model):
-    uid = models.UUIDField(default=uuid.uuid4, editable=False)
+    uid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     name = models.CharField(max_length=50, null=False, blank=False)
     email = models.EmailField(max_length=50, null=False, blank=False)
     creation_date = models.DateTimeField(auto_now_add=True)
@@ -26,6 +29,20 @@ class Transaction(models.Model):
         max_length=100, null=True, blank=False, default=None)
     message = models.TextField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination of the list endpoint
+            models.Index(fields=['creation_date', 'id'],
+                         name='transaction_created_id_idx'),
+            # reconciliation lookups
+            models.Index(fields=['email'], name='transaction_email_idx'),
+            models.Index(fields=['payment_intent_id'],
+                         name='transaction_intent_idx'),
+            # rows still waiting for a payment intent, read by the fill sweep
+            models.Index(fields=['id'], condition=models.Q(payment_intent_id=None),
+                         name='transaction_unfilled_idx'),
+        ]
+
     def __str__(self) -> str:
         return f"{self.name} - {self.id} : {self.currency}"
 
@@ -34,4 +51,4 @@ class Transaction(models.Model):
         """
             Link to a payment form for the transaction
         """
-        return f'http://127.0.0.1:8000/payment/{str(self.id)}'
+        return f'{PAYMENT_LINK_PREFIX}{str(self.id)}'
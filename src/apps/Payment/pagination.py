@@ -0,0 +1,6 @@
+from MyProject.pagination import KeysetPagination
+
+
+class TransactionPagination(KeysetPagination):
+    # backed by the (creation_date, id) index
+    ordering = ('-creation_date', '-id')
@@ -1,9 +1,39 @@
 from django.conf import settings
 from django.core.validators import (MaxLengthValidator,
                                     ProhibitNullCharactersValidator)
-from rest_framework import serializers
+from django.utils.encoding import smart_str
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 
-from apps.Payment.models import Currency, Transaction
+from apps.Payment.cache import currency_cache
+from apps.Payment.models import PAYMENT_LINK_PREFIX, Currency, Transaction
+
+
+class CachedCurrencyField(serializers.SlugRelatedField):
+    ''' currency given by its code, resolved through the currency cache '''
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('slug_field', 'code')
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            return currency_cache.get(str(data))
+        except Currency.DoesNotExist:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+
+
+class CurrencyCodeField(serializers.ReadOnlyField):
+    '''
+        Currency code of a transaction. Uses the related row when it is
+        already loaded, otherwise the currency cache, never a lazy FK fetch.
+    '''
+
+    def get_attribute(self, instance):
+        if Transaction.currency.is_cached(instance):
+            return instance.currency.code
+        return currency_cache.get_by_id(instance.currency_id).code
 
 
 class CurrencySerializer(serializers.ModelSerializer):
@@ -23,8 +53,7 @@ class CurrencySerializer(serializers.ModelSerializer):
 
 
 class UnfilledTransactionSerializer(serializers.ModelSerializer):
-    currency = serializers.SlugRelatedField(
-        slug_field='code',
+    currency = CachedCurrencyField(
         queryset=Currency.objects.all(),
     )
 
@@ -39,7 +68,7 @@ class UnfilledTransactionSerializer(serializers.ModelSerializer):
 
 
 class FilledTransactionSerializer(serializers.ModelSerializer):
-    currency = serializers.StringRelatedField(read_only=True)
+    currency = CurrencyCodeField()
     link = serializers.ReadOnlyField()
 
     class Meta:
@@ -51,3 +80,69 @@ class FilledTransactionSerializer(serializers.ModelSerializer):
             'creation_date': {'read_only': True},
             'payment_intent_id': {'read_only': True},
         }
+
+
+class TransactionRowSerializer(serializers.BaseSerializer):
+    '''
+        Read only twin of FilledTransactionSerializer for the rows of
+        queryset.values(*TransactionRowSerializer.columns). Builds the same
+        output with no field objects per row: the link is concatenated to
+        PAYMENT_LINK_PREFIX, the currency code comes with the row and the
+        timezone and format of creation_date are resolved once, not per row.
+    '''
+    columns = (
+        'id', 'currency__code', 'uid', 'name', 'email', 'creation_date',
+        'payment_intent_id', 'message',
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # formats like the creation_date field of FilledTransactionSerializer
+        self.date_field = serializers.DateTimeField()
+        self.timezone = self.date_field.default_timezone()
+        output_format = api_settings.DATETIME_FORMAT
+        self.iso_8601 = isinstance(output_format, str) and output_format.lower() == ISO_8601
+
+    def format_date(self, value):
+        ''' DateTimeField.to_representation of an aware datetime, inlined '''
+        if (value is None or value.tzinfo is None or self.timezone is None
+                or not self.iso_8601):
+            return self.date_field.to_representation(value)
+        value = value.astimezone(self.timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    def to_representation(self, row):
+        pk = row['id']
+        return {
+            'id': pk,
+            'currency': row['currency__code'],
+            'link': PAYMENT_LINK_PREFIX + str(pk),
+            'uid': str(row['uid']),
+            'name': row['name'],
+            'email': row['email'],
+            'creation_date': self.format_date(row['creation_date']),
+            'payment_intent_id': row['payment_intent_id'],
+            'message': row['message'],
+        }
+
+
+class TransactionLookupSerializer(serializers.Serializer):
+    ''' up to MAX_IDS payment intent ids and uids resolved in one query '''
+    MAX_IDS = 1000
+
+    payment_intent_ids = serializers.ListField(
+        child=serializers.CharField(max_length=100), required=False, default=list
+    )
+    uids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, default=list
+    )
+
+    def validate(self, data):
+        total = len(data['payment_intent_ids']) + len(data['uids'])
+        if total > self.MAX_IDS:
+            raise serializers.ValidationError(
+                f'at most {self.MAX_IDS} ids can be looked up per request'
+            )
+        return data
@@ -1,7 +1,12 @@
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from apps.Payment.models import Transaction
+from apps.Payment.cache import currency_cache, transaction_cache_key
+from apps.Payment.models import Currency, Transaction
+from apps.Payment.tasks import defer_fill
 from apps.Payment.utils import fill_transaction
 
 
@@ -10,4 +15,27 @@ def transaction_filler(sender, instance, created, *args, **kwargs):
 	''' fill 'payment_intent_id' field in a transacton before saving '''
 
 	if created:
-		fill_transaction(instance)
+		if settings.PAYMENT_FILL_DEFERRED:
+			# workers must only see the row once it is committed
+			db_transaction.on_commit(lambda: defer_fill(instance))
+		else:
+			fill_transaction(instance)
+
+
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def currency_cache_invalidator(sender, instance, *args, **kwargs):
+	''' a currency changed, drop every cached one (the table is tiny) '''
+
+	currency_cache.invalidate()
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def transaction_cache_invalidator(sender, instance, *args, **kwargs):
+	''' drop the cached by-intent / by-uid responses of this transaction '''
+
+	keys = [transaction_cache_key('uid', instance.uid)]
+	if instance.payment_intent_id:
+		keys.append(transaction_cache_key('payment_intent_id', instance.payment_intent_id))
+	cache.delete_many(keys)
@@ -0,0 +1,223 @@
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from apps.Payment.models import Transaction
+from apps.Payment.utils import fill_transaction, fill_transactions
+
+logger = logging.getLogger(__name__)
+
+
+class FillQueue:
+    '''
+        In-process queue of transaction ids still waiting for their
+        'payment_intent_id'. Worker threads drain it in batches of up to
+        'batch_size' ids and hand every batch to 'fill'.
+
+        A worker waits up to 'linger' seconds for a batch to fill up, so rows
+        created one request at a time still share a single UPDATE.
+
+        The queue is bounded by 'max_size'; put() gives up after 'put_timeout'
+        seconds and returns False so the caller can fill the row itself.
+
+        Ids that still fail after 'max_retries', or that were queued when the
+        process exited, are picked up again by 'sweep'. It is called with the
+        free queue capacity when the workers start and every 'sweep_interval'
+        seconds, and returns the ids of rows that are still unfilled.
+    '''
+
+    def __init__(self, fill, workers=2, batch_size=100, max_size=10000,
+                 linger=0.05, max_retries=3, retry_delay=0.1, put_timeout=0.05,
+                 sweep=None, sweep_interval=60):
+        self.fill = fill
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_size = max_size
+        self.linger = linger
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.put_timeout = put_timeout
+        self.sweep = sweep
+        self.sweep_interval = sweep_interval
+
+        self._queue = queue.Queue(maxsize=max_size)
+        self._pending = set()
+        self._threads = []
+        self._sweeper = None
+        self._lock = threading.Lock()
+
+        self.enqueued = 0
+        self.filled = 0
+        self.retried = 0
+        self.failed = 0
+        self.rejected = 0
+        self.swept = 0
+
+    @property
+    def depth(self):
+        ''' number of ids waiting to be picked up by a worker '''
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'depth': self.depth,
+                'enqueued': self.enqueued,
+                'filled': self.filled,
+                'retried': self.retried,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'swept': self.swept,
+            }
+
+    def _count(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def start(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f'payment-fill-{len(self._threads)}',
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+            if self.sweep is not None and self._sweeper is None:
+                self._sweeper = threading.Thread(
+                    target=self._sweep_forever,
+                    name='payment-fill-sweep',
+                    daemon=True,
+                )
+                self._sweeper.start()
+
+    def put(self, transaction_id):
+        self.start()
+        with self._lock:
+            if transaction_id in self._pending:
+                return True
+            self._pending.add(transaction_id)
+
+        try:
+            self._queue.put(transaction_id, timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(transaction_id)
+                self.rejected += 1
+            return False
+
+        self._count('enqueued')
+        return True
+
+    def join(self):
+        ''' block until every queued id has been processed '''
+        self._queue.join()
+
+    def sweep_once(self):
+        ''' queue the unfilled rows returned by 'sweep', returns how many '''
+        ids = self.sweep(self.max_size - self.depth)
+        queued = 0
+        for transaction_id in ids:
+            if not self.put(transaction_id):
+                break
+            queued += 1
+
+        self._count('swept', queued)
+        return queued
+
+    def _sweep_forever(self):
+        while True:
+            close_old_connections()
+            try:
+                self.sweep_once()
+            except Exception:
+                logger.exception('sweeping unfilled transactions failed')
+            finally:
+                close_old_connections()
+            logger.info('payment fill queue: %s', self.stats())
+            time.sleep(self.sweep_interval)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(
+                    self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                )
+            except queue.Empty:
+                break
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._fill_with_retry(batch)
+            finally:
+                with self._lock:
+                    self._pending.difference_update(batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _fill_with_retry(self, ids):
+        for attempt in range(self.max_retries + 1):
+            close_old_connections()
+            try:
+                self.fill(ids)
+            except Exception:
+                if attempt == self.max_retries:
+                    # left for the next sweep to queue again
+                    self._count('failed', len(ids))
+                    logger.exception('giving up on filling transactions %s', ids)
+                    return
+                self._count('retried')
+                time.sleep(self.retry_delay * 2 ** attempt)
+            else:
+                self._count('filled', len(ids))
+                return
+            finally:
+                close_old_connections()
+
+
+def unfilled_transaction_ids(limit):
+    return list(
+        Transaction.objects.filter(payment_intent_id=None)
+        .order_by('id')
+        .values_list('id', flat=True)[:limit]
+    )
+
+
+_fill_queue = None
+_fill_queue_lock = threading.Lock()
+
+
+def get_fill_queue():
+    ''' process wide queue built from the PAYMENT_FILL_* settings '''
+    global _fill_queue
+
+    if _fill_queue is None:
+        with _fill_queue_lock:
+            if _fill_queue is None:
+                _fill_queue = FillQueue(
+                    fill=lambda ids: fill_transactions(Transaction, ids),
+                    workers=settings.PAYMENT_FILL_WORKERS,
+                    batch_size=settings.PAYMENT_FILL_BATCH_SIZE,
+                    max_size=settings.PAYMENT_FILL_QUEUE_SIZE,
+                    max_retries=settings.PAYMENT_FILL_MAX_RETRIES,
+                    sweep=unfilled_transaction_ids,
+                    sweep_interval=settings.PAYMENT_FILL_SWEEP_INTERVAL,
+                )
+    return _fill_queue
+
+
+def defer_fill(transaction):
+    ''' queue the transaction, or fill it right away when the queue is full '''
+    if not get_fill_queue().put(transaction.id):
+        fill_transaction(transaction)
@@ -1,5 +1,13 @@
 import string
 import random
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import Case, CharField, Value, When
+
+PAYMENT_INTENT_ID_LENGTH = 6
 
 
 class Stripe:
@@ -9,10 +17,104 @@ class Stripe:
         chars = string.ascii_letters + string.digits
         return ''.join(random.choices(chars, k=length))
 
+    # to represent one batch call to strip API returning n ids
+    @staticmethod
+    def create_many(n, length):
+        chars = string.ascii_letters + string.digits
+        blob = ''.join(random.choices(chars, k=n * length))
+        return [blob[i:i + length] for i in range(0, n * length, length)]
+
+
+class PaymentIntentPool:
+    '''
+        In memory stock of payment intent ids. Ids are handed out from memory
+        and the pool is topped up to 'size' with one Stripe.create_many call in
+        a background thread once it drops to 'low_water'.
+    '''
+
+    def __init__(self, size=1000, low_water=200, length=PAYMENT_INTENT_ID_LENGTH):
+        self.size = size
+        self.low_water = low_water
+        self.length = length
+        self._ids = deque()
+        self._lock = threading.Lock()
+        # only one refill at a time, so two of them never overfill the pool
+        self._refill_lock = threading.Lock()
+        self._refill_thread = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def get(self):
+        return self.get_many(1)[0]
+
+    def get_many(self, n):
+        with self._lock:
+            ids = [self._ids.popleft() for _ in range(min(n, len(self._ids)))]
+
+        if len(ids) < n:
+            # pool ran dry, pay for a synchronous batch call for the rest
+            ids.extend(Stripe.create_many(n - len(ids), self.length))
+
+        self.refill_in_background()
+        return ids
+
+    def refill(self):
+        ''' top the pool up to its size with a single batch call '''
+        with self._refill_lock:
+            with self._lock:
+                missing = self.size - len(self._ids)
+            if missing > 0:
+                ids = Stripe.create_many(missing, self.length)
+                with self._lock:
+                    self._ids.extend(ids)
+
+    def refill_in_background(self):
+        with self._lock:
+            if len(self._ids) > self.low_water:
+                return
+            if self._refill_thread is not None and self._refill_thread.is_alive():
+                return
+            self._refill_thread = threading.Thread(
+                target=self.refill, name='payment-intent-pool', daemon=True
+            )
+            self._refill_thread.start()
+
+
+_intent_pool = None
+_intent_pool_lock = threading.Lock()
+
+
+def get_intent_pool():
+    ''' process wide pool built from the PAYMENT_INTENT_POOL_* settings '''
+    global _intent_pool
+
+    if _intent_pool is None:
+        with _intent_pool_lock:
+            if _intent_pool is None:
+                _intent_pool = PaymentIntentPool(
+                    size=settings.PAYMENT_INTENT_POOL_SIZE,
+                    low_water=settings.PAYMENT_INTENT_POOL_LOW_WATER,
+                )
+                _intent_pool.refill_in_background()
+    return _intent_pool
+
+
+def next_payment_intent_id():
+    if settings.PAYMENT_INTENT_POOL_ENABLED:
+        return get_intent_pool().get()
+    return Stripe.create(PAYMENT_INTENT_ID_LENGTH)
+
+
+def next_payment_intent_ids(n):
+    if settings.PAYMENT_INTENT_POOL_ENABLED:
+        return get_intent_pool().get_many(n)
+    return Stripe.create_many(n, PAYMENT_INTENT_ID_LENGTH)
+
 
 def fill_transaction(transaction):
     # get a transaction id before making an transaction
-    payment_intent_id = Stripe.create(6)
+    payment_intent_id = next_payment_intent_id()
 
     # get the queryset of all those transaction with this id
     t = transaction.__class__.objects.filter(id=transaction.id)
@@ -21,3 +123,43 @@ def fill_transaction(transaction):
     t.update(
         payment_intent_id=payment_intent_id,
     )
+
+
+def fill_transactions(model, ids):
+    '''
+        Batch version of fill_transaction. Only rows still without an id are
+        updated, so a retried or swept batch never overwrites an earlier fill.
+    '''
+    pending = list(
+        model.objects.filter(id__in=ids, payment_intent_id=None)
+        .values_list('id', flat=True)
+    )
+    if not pending:
+        return 0
+
+    intent_ids = next_payment_intent_ids(len(pending))
+    # one UPDATE for the whole batch, no post_save is sent
+    return model.objects.filter(id__in=pending, payment_intent_id=None).update(
+        payment_intent_id=Case(
+            *[When(id=pk, then=Value(intent_id))
+              for pk, intent_id in zip(pending, intent_ids)],
+            output_field=CharField(),
+        )
+    )
+
+
+def bulk_create_transactions(model, rows, batch_size=500):
+    '''
+        Insert already validated transaction rows with their 'payment_intent_id'
+        assigned up front. bulk_create do not send post_save, so no row needs
+        the follow up UPDATE done by fill_transaction.
+    '''
+    rows = list(rows)
+    intent_ids = next_payment_intent_ids(len(rows))
+    transactions = [
+        model(payment_intent_id=intent_id, **row)
+        for intent_id, row in zip(intent_ids, rows)
+    ]
+
+    with db_transaction.atomic():
+        return model.objects.bulk_create(transactions, batch_size=batch_size)
@@ -1,23 +1,208 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from apps.Metrics.mixins import TimedSerializerMixin
+from apps.Payment.cache import currency_cache, transaction_cache_key
+from apps.Payment.export import (async_stream, csv_stream, gzip_stream,
+                                 ndjson_stream, transaction_rows)
 from apps.Payment.models import Currency, Transaction
+from apps.Payment.pagination import TransactionPagination
+from apps.Payment.renderers import CSVRenderer, NDJSONRenderer
 from apps.Payment.serializers import (CurrencySerializer,
                                       FilledTransactionSerializer,
+                                      TransactionLookupSerializer,
+                                      TransactionRowSerializer,
                                       UnfilledTransactionSerializer)
+from apps.Payment.tasks import get_fill_queue
+from apps.Payment.utils import bulk_create_transactions
+from MyProject.asyncviews import AsyncReadMixin
+from MyProject.replica import ReplicaReadMixin
 
 
-class CurrencyViewSet(ModelViewSet):
+class CurrencyViewSet(TimedSerializerMixin, AsyncReadMixin, ModelViewSet):
     queryset = Currency.objects.all()
     serializer_class = CurrencySerializer
 
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        ''' hit/miss counters of the process local currency cache '''
+        return Response(currency_cache.stats())
 
-class TransactionViewset(ModelViewSet):
+
+class TransactionViewset(TimedSerializerMixin, ReplicaReadMixin, AsyncReadMixin,
+                         ModelViewSet):
     """ Transaction Viewset """
 
     queryset = Transaction.objects.all()
+    pagination_class = TransactionPagination
+    # rows written per INSERT statement by the bulk endpoint
+    bulk_batch_size = 500
+    # largest list accepted by the bulk endpoint in one request
+    bulk_max_rows = 5000
+    # rows fetched per round trip by the export endpoint
+    export_chunk_size = 2000
+
+    # columns rendered by FilledTransactionSerializer
+    read_fields = (
+        'id', 'uid', 'name', 'email', 'creation_date', 'payment_intent_id',
+        'message', 'currency', 'currency__code',
+    )
+
+    def get_queryset(self):
+        ''' query plan per action, so serializing N rows stays one query '''
+        queryset = super().get_queryset()
+
+        if self.action in ('list', 'retrieve', 'by_intent', 'by_uid', 'lookup'):
+            queryset = queryset.select_related('currency').only(*self.read_fields)
+        elif self.action in ('update', 'partial_update', 'destroy'):
+            queryset = queryset.select_related('currency')
+        return queryset
+
+    def filter_queryset(self, queryset):
+        ''' list and retrieve read plain rows for TransactionRowSerializer '''
+        queryset = super().filter_queryset(queryset)
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.values(*TransactionRowSerializer.columns)
+        return queryset
 
     def get_serializer_class(self):
-        if self.action == 'create':
+        if self.action in ('create', 'bulk_create'):
             return UnfilledTransactionSerializer
+        elif self.action in ('list', 'retrieve'):
+            return TransactionRowSerializer
         else:
             return FilledTransactionSerializer
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        ''' create a list of transactions with one INSERT per batch '''
+        if isinstance(request.data, list) and len(request.data) > self.bulk_max_rows:
+            raise ValidationError(
+                f'at most {self.bulk_max_rows} transactions can be created per request'
+            )
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        transactions = bulk_create_transactions(
+            Transaction,
+            serializer.validated_data,
+            batch_size=self.bulk_batch_size,
+        )
+
+        data = FilledTransactionSerializer(transactions, many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], url_path='export',
+            renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        '''
+            Stream every transaction as NDJSON or CSV (?format=ndjson|csv).
+            Optional ?since= / ?until= bound creation_date (ISO 8601) and
+            ?compress=gzip streams a gzip file. Under ASGI the body is an
+            async iterator, so it is streamed there as well.
+        '''
+        queryset = Transaction.objects.all()
+        for param, lookup in (('since', 'gte'), ('until', 'lt')):
+            value = request.query_params.get(param)
+            if value is None:
+                continue
+            try:
+                moment = parse_datetime(value)
+            except ValueError:
+                moment = None
+            if moment is None:
+                raise ValidationError({param: 'expected an ISO 8601 datetime'})
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            queryset = queryset.filter(**{f'creation_date__{lookup}': moment})
+
+        renderer = request.accepted_renderer
+        stream = (csv_stream if renderer.format == 'csv' else ndjson_stream)(
+            transaction_rows(queryset, chunk_size=self.export_chunk_size)
+        )
+        filename = f'transactions.{renderer.format}'
+        content_type = f'{renderer.media_type}; charset=utf-8'
+
+        if request.query_params.get('compress') == 'gzip':
+            stream = gzip_stream(stream)
+            filename += '.gz'
+            content_type = 'application/gzip'
+        if isinstance(request._request, ASGIRequest):
+            stream = async_stream(stream)
+
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=['get'],
+            url_path=r'by-intent/(?P<payment_intent_id>[A-Za-z0-9_]+)')
+    def by_intent(self, request, payment_intent_id):
+        ''' transaction of a payment intent, as sent by provider webhooks '''
+        return self._cached_lookup('payment_intent_id', payment_intent_id)
+
+    @action(detail=False, methods=['get'],
+            url_path=r'by-uid/(?P<uid>[0-9a-fA-F-]{32,36})')
+    def by_uid(self, request, uid):
+        return self._cached_lookup('uid', uid)
+
+    def _cached_lookup(self, field, value):
+        '''
+            one indexed query, then served from the cache for a short TTL.
+            A row still waiting for its payment intent is not cached, the
+            fill is a queryset update() that sends no signal to drop it.
+        '''
+        key = transaction_cache_key(field, value)
+        data = cache.get(key)
+        if data is None:
+            try:
+                instance = self.get_queryset().filter(**{field: value}).order_by('id').first()
+            except DjangoValidationError:
+                instance = None
+            if instance is None:
+                raise Http404
+            data = self.get_serializer(instance).data
+            if instance.payment_intent_id is not None:
+                cache.set(key, data, settings.TRANSACTION_LOOKUP_CACHE_TTL)
+        return Response(data)
+
+    @action(detail=False, methods=['post'], url_path='lookup')
+    def lookup(self, request):
+        '''
+            Resolve up to 1000 payment intent ids and uids in one query,
+            {"payment_intent_ids": [...], "uids": [...]}.
+        '''
+        lookup = TransactionLookupSerializer(data=request.data)
+        lookup.is_valid(raise_exception=True)
+        intent_ids = lookup.validated_data['payment_intent_ids']
+        uids = lookup.validated_data['uids']
+
+        transactions = list(self.get_queryset().filter(
+            Q(payment_intent_id__in=intent_ids) | Q(uid__in=uids)
+        ).order_by('id'))
+
+        found_intents = {t.payment_intent_id for t in transactions}
+        found_uids = {t.uid for t in transactions}
+        return Response({
+            'results': self.get_serializer(transactions, many=True).data,
+            'missing': {
+                'payment_intent_ids': [i for i in intent_ids if i not in found_intents],
+                'uids': [str(u) for u in uids if u not in found_uids],
+            },
+        })
+
+    @action(detail=False, methods=['get'], url_path='fill-queue')
+    def fill_queue(self, request):
+        ''' depth and counters of the deferred payment intent fill queue '''
+        return Response(get_fill_queue().stats())
@@ -0,0 +1,66 @@
+"""
+Rows/sec of POST /api/transaction/ one row at a time against
+POST /api/transaction/bulk/ with the same payload.
+
+    python -m benchmarks.bulk_ingest --rows 2000 --batch 500
+"""
+import argparse
+
+from benchmarks.utils import api_client, setup_django, temporary_database, timer
+
+
+def make_rows(n, code):
+    return [
+        {
+            'name': f'customer {i}',
+            'email': f'customer{i}@example.com',
+            'currency': code,
+            'message': 'bulk ingest',
+        }
+        for i in range(n)
+    ]
+
+
+def run(rows, batch):
+    from apps.Payment.models import Currency, Transaction
+
+    client = api_client()
+    Currency.objects.create(name='US Dollar', code='USD')
+    payload = make_rows(rows, 'USD')
+    elapsed = {}
+
+    with timer(elapsed, 'single'):
+        for row in payload:
+            response = client.post('/api/transaction/', row, format='json')
+            assert response.status_code == 201, response.content
+    Transaction.objects.all().delete()
+
+    with timer(elapsed, 'bulk'):
+        for start in range(0, rows, batch):
+            response = client.post(
+                '/api/transaction/bulk/',
+                payload[start:start + batch],
+                format='json',
+            )
+            assert response.status_code == 201, response.content
+    assert Transaction.objects.filter(payment_intent_id__isnull=True).count() == 0
+
+    for path, seconds in elapsed.items():
+        print(f'{path:>6}: {rows / seconds:10.0f} rows/sec ({seconds:.2f}s)')
+    print(f'speedup: {elapsed["single"] / elapsed["bulk"]:.1f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=500,
+                        help='rows per request to the bulk endpoint')
+    args = parser.parse_args()
+
+    setup_django()
+    with temporary_database():
+        run(args.rows, args.batch)
+
+
+if __name__ == '__main__':
+    main()
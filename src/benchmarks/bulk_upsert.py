@@ -0,0 +1,76 @@
+"""
+Rows/sec of a catalogue sync through the per item API (POST a new
+product, PUT an existing one) against POST /api/product/bulk-upsert/.
+Each path first inserts the rows, then updates all of them.
+
+    python -m benchmarks.bulk_upsert --rows 5000 --batch 5000
+"""
+import argparse
+
+from benchmarks.utils import api_client, setup_django, temporary_database, timer
+
+
+def make_rows(n, category_ids, price):
+    return [
+        {
+            'slug': f'erp-{i}',
+            'title': f'product {i}',
+            'category': category_ids[i % len(category_ids)],
+            'description': 'synced from the ERP',
+            'regular_price': price,
+            'discount_price': '1.00',
+        }
+        for i in range(n)
+    ]
+
+
+def run(rows, batch):
+    from apps.FactoryApp.models import Category, Product
+
+    client = api_client()
+    category_ids = [Category.objects.create(name=f'category {i}').id for i in range(20)]
+    inserts = make_rows(rows, category_ids, '10.00')
+    updates = make_rows(rows, category_ids, '12.00')
+    elapsed = {}
+
+    with timer(elapsed, 'single insert'):
+        ids = []
+        for row in inserts:
+            response = client.post('/api/product/', row, format='json')
+            assert response.status_code == 201, response.content
+            ids.append(response.json()['id'])
+    with timer(elapsed, 'single update'):
+        for pk, row in zip(ids, updates):
+            response = client.put(f'/api/product/{pk}/', row, format='json')
+            assert response.status_code == 200, response.content
+    Product.objects.all().delete()
+
+    for label, payload in (('bulk insert', inserts), ('bulk update', updates)):
+        with timer(elapsed, label):
+            for start in range(0, rows, batch):
+                response = client.post('/api/product/bulk-upsert/',
+                                       payload[start:start + batch], format='json')
+                assert response.status_code == 200, response.content
+                assert response.json()['invalid'] == 0, response.content
+    assert Product.objects.filter(regular_price='12.00').count() == rows
+
+    for label, seconds in elapsed.items():
+        print(f'{label:>13}: {rows / seconds:10.0f} rows/sec ({seconds:.2f}s)')
+    for kind in ('insert', 'update'):
+        print(f'{kind} speedup: {elapsed[f"single {kind}"] / elapsed[f"bulk {kind}"]:.1f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--batch', type=int, default=5000,
+                        help='items per request to the bulk endpoint')
+    args = parser.parse_args()
+
+    setup_django()
+    with temporary_database():
+        run(args.rows, args.batch)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+/api/category/stats/ against computing the same aggregates from Product,
+and what keeping CategoryStats adds to a product save.
+
+    python -m benchmarks.category_stats --products 1000000 --categories 50
+"""
+import argparse
+import random
+import time
+
+from benchmarks.utils import api_client, percentile, setup_django, temporary_database, timer
+
+
+def seed(products, categories):
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from apps.FactoryApp.models import Category
+
+    category_ids = [Category.objects.create(name=f'category {i}').id for i in range(categories)]
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    sql = ('INSERT INTO "FactoryApp_product" (title, category_id, description, slug, '
+           'regular_price, discount_price, is_active, created_at, updated_at) '
+           'VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)')
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, products, 10000):
+            rows = []
+            for i in range(start, min(start + 10000, products)):
+                price = random.randint(100, 99999)
+                rows.append((f'product {i}', random.choice(category_ids), '',
+                             f'product-{i}', f'{price / 100:.2f}',
+                             f'{random.randint(0, price) / 100:.2f}',
+                             random.random() < 0.9, now, now))
+            cursor.executemany(sql, rows)
+    return category_ids
+
+
+def sample(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return percentile(samples, 50) * 1000
+
+
+def statements(func):
+    ''' SQL statements func() runs, savepoints left out '''
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    # the log is capped, a full one hides the statements of func()
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as queries:
+        func()
+    return sum('SAVEPOINT' not in query['sql'] for query in queries)
+
+
+def run(products, categories, repeat):
+    from django.db.models.signals import post_save, pre_save
+
+    from apps.FactoryApp import signals
+    from apps.FactoryApp.models import Product
+    from apps.FactoryApp.stats import aggregate, rebuild
+
+    elapsed = {}
+    with timer(elapsed, 'seed'):
+        category_ids = seed(products, categories)
+    with timer(elapsed, 'rebuild'):
+        rebuild()
+    print(f'seeded {products} products, rebuild_category_stats took {elapsed["rebuild"]:.2f}s')
+
+    client = api_client()
+    endpoint = sample(lambda: client.get('/api/category/stats/'), repeat)
+    group_by = sample(lambda: aggregate(Product.objects.all()), max(1, repeat // 10))
+    print(f'GET /api/category/stats/ p50 {endpoint:.2f} ms')
+    print(f'GROUP BY over Product    p50 {group_by:.2f} ms')
+
+    product = Product.objects.order_by('?').first()
+
+    def reprice():
+        product.regular_price = f'{random.randint(100, 99999) / 100:.2f}'
+        product.save()
+
+    def move():
+        product.category_id = random.choice(category_ids)
+        reprice()
+
+    # the cheapest products of a category, each its minimum when repriced
+    cheapest = iter(Product.objects.filter(category_id=category_ids[0])
+                    .order_by('regular_price', 'id')[:3 * repeat + 1])
+
+    def bound():
+        product = next(cheapest)
+        product.regular_price = '999.99'
+        product.save()
+
+    saves = {'price change': reprice, 'category move': move, 'min price change': bound}
+    kept = {name: (sample(save, repeat), statements(save)) for name, save in saves.items()}
+    pre_save.disconnect(signals.product_stats_before, sender=Product)
+    post_save.disconnect(signals.product_stats_saved, sender=Product)
+    for name, save in saves.items():
+        ms, queries = kept[name]
+        print(f'{name + " save":<22} p50 {ms:.2f} ms, {queries} statements with stats, '
+              f'{sample(save, repeat):.2f} ms, {statements(save)} without')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--categories', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=100,
+                        help='requests and saves timed, the p50 is reported')
+    args = parser.parse_args()
+
+    setup_django()
+    with temporary_database():
+        run(args.products, args.categories, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Latency of catalogue reads for a polling client: a cold page, the same
+page from the response cache, and a revalidation answered with 304.
+
+    python -m benchmarks.conditional_get --products 10000 --page-size 100
+"""
+import argparse
+import time
+
+from benchmarks.utils import api_client, percentile, setup_django, temporary_database
+
+
+def sample(request, repeat, status, before=None):
+    samples = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        response = request()
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == status, response.status_code
+    return percentile(samples, 50) * 1000
+
+
+def run(products, page_size, repeat):
+    from django.core.cache import cache
+
+    from tests.FactoryApp.factory import CategoryFactory, ProductFactory
+
+    categories = CategoryFactory.create_batch(20)
+    for i in range(products):
+        ProductFactory.build(category=categories[i % len(categories)]).save()
+
+    client = api_client()
+    print(f"{'url':<32}{'cold ms':>10}{'cached ms':>11}{'304 ms':>9}")
+    for url in (f'/api/product/?page_size={page_size}', f'/api/product/{products // 2}/',
+                '/api/category/'):
+        get = lambda **headers: client.get(url, **headers)
+        etag = get()['ETag']
+        cold = sample(get, repeat, 200, before=cache.clear)
+        cached = sample(get, repeat, 200)
+        not_modified = sample(lambda: get(HTTP_IF_NONE_MATCH=etag), repeat, 304)
+        print(f'{url:<32}{cold:>10.2f}{cached:>11.2f}{not_modified:>9.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50,
+                        help='requests per url and mode, the p50 is reported')
+    args = parser.parse_args()
+
+    setup_django()
+    with temporary_database():
+        run(args.products, args.page_size, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
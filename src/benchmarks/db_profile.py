@@ -0,0 +1,207 @@
+"""
+Concurrent reads and writes against the database profiles: SQLite defaults
+with a connection per request, the tuned profile of the settings (WAL,
+synchronous=NORMAL, mmap / cache size, BEGIN IMMEDIATE, persistent
+connections) and the tuned profile reading list / retrieve requests from a
+replica file.
+
+MyProject.wsgi is served by a pool of threads, the way gunicorn's gthread
+workers do, so persistent connections are reused across requests. Reader
+threads list and retrieve transactions and products while writer threads
+create transactions and update product prices:
+
+    python -m benchmarks.db_profile --readers 6 --writers 2 --duration 10
+"""
+import argparse
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.loadtest import QuietHandler, ThreadingWSGIServer, http_request, seed
+from benchmarks.utils import percentile, setup_django, temporary_database
+
+PROFILES = ('default', 'tuned', 'tuned+replica')
+
+
+class PooledWSGIServer(ThreadingWSGIServer):
+    ''' handles requests on a fixed pool of threads instead of a thread each '''
+    pool_size = 8
+
+    def server_activate(self):
+        super().server_activate()
+        self.pool = ThreadPoolExecutor(max_workers=self.pool_size)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown()
+
+
+def start_server(threads):
+    from wsgiref.simple_server import make_server
+
+    from MyProject.wsgi import application
+
+    # failed requests are counted, not logged with their traceback (set after
+    # the import, get_wsgi_application() configures logging again)
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    PooledWSGIServer.pool_size = threads
+    server = make_server('127.0.0.1', 0, application, server_class=PooledWSGIServer,
+                         handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def apply_profile(profile, tuned):
+    ''' point the default database settings at 'profile' before connecting '''
+    from django.conf import settings
+
+    from MyProject.db import sqlite_options
+
+    default = settings.DATABASES['default']
+    if profile == 'default':
+        default['OPTIONS'] = sqlite_options(journal_mode='DELETE', synchronous='FULL')
+        default['CONN_MAX_AGE'] = 0
+    else:
+        default['OPTIONS'] = dict(tuned['OPTIONS'])
+        default['CONN_MAX_AGE'] = tuned['CONN_MAX_AGE']
+
+
+def add_replica(path):
+    ''' copy the seeded database to a replica file and route reads to it '''
+    from django.db import connections
+
+    from MyProject.db import REPLICA, replica_settings
+
+    replica_path = f'{path}.replica'
+    source, target = sqlite3.connect(path), sqlite3.connect(replica_path)
+    source.backup(target)
+    source.close()
+    target.close()
+
+    default = connections['default'].settings_dict
+    connections.settings[REPLICA] = connections.configure_settings({
+        'default': default, REPLICA: replica_settings(default, replica_path),
+    })[REPLICA]
+    return replica_path
+
+
+def remove_replica(replica_path):
+    from django.db import connections
+
+    from MyProject.db import REPLICA
+
+    connections.close_all()
+    del connections.settings[REPLICA]
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(replica_path + suffix):
+            os.unlink(replica_path + suffix)
+
+
+def workload(currency):
+    from apps.FactoryApp.models import Product
+    from apps.Payment.models import Transaction
+
+    transaction_ids = list(Transaction.objects.values_list('id', flat=True)[:100])
+    product_ids = list(Product.objects.values_list('id', flat=True)[:100])
+    reads = [('GET', '/api/transaction/', None), ('GET', '/api/product/', None)]
+    reads += [('GET', f'/api/transaction/{pk}/', None) for pk in transaction_ids[:10]]
+    reads += [('GET', f'/api/product/{pk}/', None) for pk in product_ids[:10]]
+    writes = [('POST', '/api/transaction/', {'currency': currency.code, 'name': 'profile',
+                                             'email': 'profile@test.com'})]
+    writes += [('PATCH', f'/api/product/{pk}/', {'regular_price': f'{10 + n % 7}.00'})
+               for n, pk in enumerate(product_ids)]
+    return reads, writes
+
+
+def run(send, reads, writes, readers, writers, duration):
+    ''' readers / writers threads sending their requests for 'duration' seconds '''
+    results = {'read': [], 'write': []}
+    errors = {'read': 0, 'write': 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def client(kind, requests):
+        latencies, failed = [], 0
+        for method, path, body in itertools.cycle(requests):
+            if time.perf_counter() >= stop:
+                break
+            start = time.perf_counter()
+            try:
+                status, _ = send(method, path, body)
+            except OSError:
+                status = 599
+            latencies.append(time.perf_counter() - start)
+            failed += status >= 400
+        with lock:
+            results[kind].extend(latencies)
+            errors[kind] += failed
+
+    threads = [threading.Thread(target=client, args=('read', reads[i % len(reads):] + reads))
+               for i in range(readers)]
+    threads += [threading.Thread(target=client, args=('write', writes[i::writers] or writes))
+                for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        f'{kind}_per_sec': round(len(results[kind]) / duration, 1) for kind in results
+    } | {
+        f'{kind}_p95_ms': round(percentile(results[kind], 95) * 1000, 2) for kind in results
+    } | {f'{kind}_errors': errors[kind] for kind in errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=6)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10, help='seconds per profile')
+    parser.add_argument('--threads', type=int, default=8, help='server threads')
+    parser.add_argument('--transactions', type=int, default=5000)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--profile', action='append', choices=PROFILES,
+                        help='only run these profiles (repeatable)')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connections
+
+    tuned = dict(settings.DATABASES['default'])
+    print(f"{'profile':<16}{'reads/s':>9}{'p95':>9}{'errors':>8}"
+          f"{'writes/s':>10}{'p95':>9}{'errors':>8}")
+    for profile in args.profile or PROFILES:
+        apply_profile(profile, tuned)
+        with temporary_database() as path:
+            currency = seed(args.transactions, args.products)
+            replica_path = add_replica(path) if profile == 'tuned+replica' else None
+            connections.close_all()
+
+            server, base_url = start_server(args.threads)
+            try:
+                reads, writes = workload(currency)
+                connections.close_all()
+                result = run(http_request(base_url), reads, writes,
+                             args.readers, args.writers, args.duration)
+            finally:
+                server.shutdown()
+                server.server_close()
+                if replica_path:
+                    remove_replica(replica_path)
+
+        print(f"{profile:<16}{result['read_per_sec']:>9}{result['read_p95_ms']:>9}"
+              f"{result['read_errors']:>8}{result['write_per_sec']:>10}"
+              f"{result['write_p95_ms']:>9}{result['write_errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+p50/p99 latency of POST /api/transaction/ with the payment intent filled
+inside the request (PAYMENT_FILL_DEFERRED off) and by the worker queue
+(PAYMENT_FILL_DEFERRED on).
+
+The Stripe stand-in answers instantly; --provider-latency adds a sleep to
+every create/create_many call to model the round trip to the real provider.
+
+    python -m benchmarks.deferred_fill --requests 1000 --provider-latency 20
+"""
+import argparse
+import time
+
+from benchmarks.utils import (api_client, percentile, setup_django,
+                              temporary_database)
+
+
+def measure(client, n, code):
+    latencies = []
+    for i in range(n):
+        row = {'name': f'customer {i}', 'email': f'customer{i}@example.com',
+               'currency': code}
+        start = time.perf_counter()
+        response = client.post('/api/transaction/', row, format='json')
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 201, response.content
+    return latencies
+
+
+def slow_provider(latency):
+    ''' wrap the Stripe stand-in so every call costs 'latency' seconds '''
+    from apps.Payment.utils import Stripe
+
+    create, create_many = Stripe.create, Stripe.create_many
+
+    def slow_create(length):
+        time.sleep(latency)
+        return create(length)
+
+    def slow_create_many(n, length):
+        time.sleep(latency)
+        return create_many(n, length)
+
+    Stripe.create = staticmethod(slow_create)
+    Stripe.create_many = staticmethod(slow_create_many)
+
+
+def run(n, provider_latency):
+    from django.conf import settings
+
+    from apps.Payment.models import Currency, Transaction
+    from apps.Payment.tasks import get_fill_queue
+
+    slow_provider(provider_latency)
+
+    client = api_client()
+    Currency.objects.create(name='US Dollar', code='USD')
+
+    for deferred in (False, True):
+        settings.PAYMENT_FILL_DEFERRED = deferred
+        latencies = measure(client, n, 'USD')
+        if deferred:
+            get_fill_queue().join()
+        assert not Transaction.objects.filter(payment_intent_id=None).exists()
+        Transaction.objects.all().delete()
+
+        mode = 'deferred' if deferred else 'sync'
+        print(f'{mode:>8}: p50 {percentile(latencies, 50) * 1000:6.2f}ms'
+              f'  p99 {percentile(latencies, 99) * 1000:6.2f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--provider-latency', type=float, default=20,
+                        help='milliseconds added to every Stripe call')
+    args = parser.parse_args()
+
+    setup_django()
+    with temporary_database():
+        run(args.requests, args.provider_latency / 1000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""
+Load test of the Payment and FactoryApp endpoints.
+
+Boots MyProject.wsgi on a local threaded server, MyProject.asgi on
+uvicorn (or drives the Django handler in process), seeds it with
+TransactionFactory / ProductFactory and runs every scenario at the given
+concurrency. Reports throughput, p50/p95/p99 latency and DB queries per
+request (not counted under ASGI), and writes them as JSON so two runs can
+be compared:
+
+    python -m benchmarks.loadtest --concurrency 8 --output before.json
+    python -m benchmarks.loadtest --concurrency 8 --output after.json --compare before.json
+
+The async read views against the sync ones, both on uvicorn:
+
+    python -m benchmarks.loadtest --server asgi --sync-views --output sync.json
+    python -m benchmarks.loadtest --server asgi --output async.json --compare sync.json
+"""
+import argparse
+import json
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks.utils import percentile, setup_django, temporary_database
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def counting_app(application):
+    ''' WSGI wrapper reporting the DB queries of a request in X-Query-Count '''
+    from django.db import connection
+
+    def app(environ, start_response):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            captured = {}
+
+            def capture(status, headers, exc_info=None):
+                captured['status'], captured['headers'] = status, headers
+
+            body = b''.join(application(environ, capture))
+
+        headers = captured['headers'] + [('X-Query-Count', str(counter.count))]
+        start_response(captured['status'], headers)
+        return [body]
+
+    return app
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def start_wsgi_server():
+    from MyProject.wsgi import application
+
+    server = make_server('127.0.0.1', 0, counting_app(application),
+                         server_class=ThreadingWSGIServer,
+                         handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.shutdown, f'http://127.0.0.1:{server.server_port}'
+
+
+def start_asgi_server():
+    '''
+        MyProject.asgi on uvicorn, in a thread of this process. Returns
+        (stop, base url), stop() ends the server and waits for its thread.
+    '''
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit('--server asgi needs uvicorn: pip install uvicorn')
+    from MyProject.asgi import application
+
+    server = uvicorn.Server(uvicorn.Config(
+        application, host='127.0.0.1', port=0, lifespan='off',
+        log_level='warning', access_log=False, backlog=128,
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+    return stop, f'http://127.0.0.1:{port}'
+
+
+def http_request(base_url):
+    def send(method, path, body):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(
+            base_url + path, data=data, method=method,
+            headers={'Content-Type': 'application/json'},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                return response.status, query_count(response.headers)
+        except urllib.error.HTTPError as error:
+            return error.code, query_count(error.headers)
+    return send
+
+
+def query_count(headers):
+    count = headers.get('X-Query-Count')
+    return None if count is None else int(count)
+
+
+def inprocess_request():
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    local = threading.local()
+
+    def send(method, path, body):
+        if not hasattr(local, 'client'):
+            local.client = APIClient(HTTP_HOST='localhost')
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = getattr(local.client, method.lower())(path, body, format='json')
+        return response.status_code, counter.count
+    return send
+
+
+def seed(transactions, products):
+    from tests.FactoryApp.factory import CategoryFactory, ProductFactory
+    from tests.Payment.factory import CurrencyFactory, TransactionFactory
+
+    currency = CurrencyFactory.create(code='USD', name='US Dollar')
+    TransactionFactory.create_bulk(transactions, currencies=[currency])
+    category = CategoryFactory.create()
+    ProductFactory.create_batch(products, category=category)
+    return currency
+
+
+def scenarios(currency):
+    from apps.FactoryApp.models import Product
+    from apps.Payment.models import Transaction
+
+    transaction = Transaction.objects.order_by('id').first()
+    product = Product.objects.order_by('id').first()
+    new_transaction = {'currency': currency.code, 'name': 'load test',
+                       'email': 'load@test.com'}
+
+    return {
+        'transaction-list': ('GET', '/api/transaction/', None),
+        'transaction-detail': ('GET', f'/api/transaction/{transaction.id}/', None),
+        'transaction-create': ('POST', '/api/transaction/', new_transaction),
+        'currency-list': ('GET', '/api/currency/', None),
+        'product-list': ('GET', '/api/product/', None),
+        'product-detail': ('GET', f'/api/product/{product.id}/', None),
+        'category-list': ('GET', '/api/category/', None),
+    }
+
+
+def run_scenario(send, method, path, body, requests, concurrency):
+    def one(_):
+        start = time.perf_counter()
+        status, queries = send(method, path, body)
+        return time.perf_counter() - start, status, queries
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _, _ in results]
+    queries = [q for _, _, q in results if q is not None]
+    return {
+        'requests': requests,
+        'errors': sum(1 for _, status, _ in results if status >= 400),
+        'throughput': round(requests / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report, baseline=None):
+    print(f"{'scenario':<20}{'req/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}")
+    for name, result in report['scenarios'].items():
+        line = (f"{name:<20}{result['throughput']:>10}{result['p50_ms']:>9}"
+                f"{result['p95_ms']:>9}{result['p99_ms']:>9}"
+                f"{result['queries_per_request'] if result['queries_per_request'] is not None else '-':>9}")
+        old = (baseline or {}).get('scenarios', {}).get(name)
+        if old and old['throughput']:
+            change = (result['throughput'] / old['throughput'] - 1) * 100
+            line += f"   {change:+.1f}% req/s vs {baseline['meta']['revision']}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=['wsgi', 'asgi', 'inprocess'], default='wsgi')
+    parser.add_argument('--sync-views', action='store_true',
+                        help='with --server asgi, keep the read views sync')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=500,
+                        help='requests per scenario')
+    parser.add_argument('--transactions', type=int, default=1000)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--scenario', action='append',
+                        help='only run these scenarios (repeatable)')
+    parser.add_argument('--output', default='loadtest.json')
+    parser.add_argument('--compare', help='earlier JSON result to diff against')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    # read before the URLconf is built by the first request
+    settings.ASYNC_READ_VIEWS = args.server == 'asgi' and not args.sync_views
+    with temporary_database():
+        currency = seed(args.transactions, args.products)
+
+        stop = None
+        if args.server == 'wsgi':
+            stop, base_url = start_wsgi_server()
+            send = http_request(base_url)
+        elif args.server == 'asgi':
+            stop, base_url = start_asgi_server()
+            send = http_request(base_url)
+        else:
+            send = inprocess_request()
+
+        report = {
+            'meta': {
+                'revision': git_revision(),
+                'server': args.server,
+                'async_views': settings.ASYNC_READ_VIEWS,
+                'concurrency': args.concurrency,
+                'requests': args.requests,
+                'transactions': args.transactions,
+                'products': args.products,
+            },
+            'scenarios': {},
+        }
+        try:
+            for name, (method, path, body) in scenarios(currency).items():
+                if args.scenario and name not in args.scenario:
+                    continue
+                report['scenarios'][name] = run_scenario(
+                    send, method, path, body, args.requests, args.concurrency)
+        finally:
+            if stop is not None:
+                stop()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
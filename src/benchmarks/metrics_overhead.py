@@ -0,0 +1,154 @@
+"""
+CPU cost of the request metrics: the same requests without MetricsMiddleware,
+with it and nothing sampled, at the default METRICS_SAMPLE_RATE and with
+every request measured.
+
+The differences are close to the noise of whole requests, so the cost of
+the middleware and of the query wrapper is also timed on its own and put
+against the CPU time and query count of the requests.
+
+    python -m benchmarks.metrics_overhead --requests 300 --rounds 15
+"""
+import argparse
+import time
+
+from benchmarks.utils import api_client, setup_django, temporary_database
+
+MIDDLEWARE = 'apps.Metrics.middleware.MetricsMiddleware'
+
+
+def seed(transactions):
+    from tests.Payment.factory import CurrencyFactory, TransactionFactory
+
+    currency = CurrencyFactory.create(code='USD', name='US Dollar')
+    TransactionFactory.create_bulk(transactions, currencies=[currency])
+
+
+def cpu_per_request(variants, paths, requests, rounds):
+    '''
+        fastest of 'rounds' runs, in CPU microseconds per request, of each
+        variant, the variants taking turns so drift hits them all alike
+    '''
+    from django.conf import settings
+
+    clients = {}
+    for name, middleware, rate in variants:
+        settings.MIDDLEWARE, settings.METRICS_SAMPLE_RATE = middleware, rate
+        clients[name] = api_client()
+        for path in paths:
+            clients[name].get(path)   # loads the middleware, warms the caches
+
+    samples = {name: [] for name, _, _ in variants}
+    for _ in range(rounds):
+        for name, middleware, rate in variants:
+            settings.METRICS_SAMPLE_RATE = rate
+            start = time.process_time()
+            for n in range(requests):
+                clients[name].get(paths[n % len(paths)])
+            samples[name].append((time.process_time() - start) / requests * 1e6)
+    return {name: min(values) for name, values in samples.items()}
+
+
+def per_call(func, calls):
+    ''' CPU microseconds per call of func(), fastest of 5 runs '''
+    samples = []
+    for _ in range(5):
+        start = time.process_time()
+        for _ in range(calls):
+            func()
+        samples.append((time.process_time() - start) / calls * 1e6)
+    return min(samples)
+
+
+def component_costs(calls):
+    ''' microseconds the metrics add per request and per query, sampled or not '''
+    from django.conf import settings
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from apps.Metrics.middleware import MetricsMiddleware
+    from apps.Metrics.recorder import RequestMetrics, current, record_query
+
+    request, response = RequestFactory().get('/'), HttpResponse()
+
+    def view(request):
+        return response
+
+    def execute(sql, params, many, context):
+        return None
+
+    middleware = MetricsMiddleware(view)
+    costs = {'view': per_call(lambda: view(request), calls),
+             'query': per_call(lambda: execute('', (), False, {}), calls)}
+    for name, rate in (('unsampled', 0), ('sampled', 1)):
+        settings.METRICS_SAMPLE_RATE = rate
+        costs[f'{name} request'] = per_call(lambda: middleware(request), calls) - costs['view']
+
+    costs['unsampled query'] = per_call(
+        lambda: record_query(execute, '', (), False, {}), calls) - costs['query']
+    token = current.set(RequestMetrics())
+    costs['sampled query'] = per_call(
+        lambda: record_query(execute, '', (), False, {}), calls) - costs['query']
+    current.reset(token)
+    return costs
+
+
+def queries_per_request(paths):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client = api_client()
+    with CaptureQueriesContext(connection) as queries:
+        for path in paths:
+            client.get(path)
+    return len(queries) / len(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000, help='requests per round')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--transactions', type=int, default=1000)
+    parser.add_argument('--calls', type=int, default=20000,
+                        help='calls per run when timing the middleware and query wrapper')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    default_rate = settings.METRICS_SAMPLE_RATE
+    middleware = list(settings.MIDDLEWARE)
+    paths = ['/api/transaction/', '/api/currency/', '/api/transaction/1/']
+    variants = [
+        ('no middleware', [m for m in middleware if m != MIDDLEWARE], 0),
+        ('sample rate 0', middleware, 0),
+        (f'sample rate {default_rate:g}', middleware, default_rate),
+        ('sample rate 1', middleware, 1),
+    ]
+
+    with temporary_database():
+        seed(args.transactions)
+        results = cpu_per_request(variants, paths, args.requests, args.rounds)
+        queries = queries_per_request(paths)
+    costs = component_costs(args.calls)
+
+    baseline = results['no middleware']
+    print(f"{'variant':<20}{'us/request':>12}{'overhead':>10}")
+    for name, cost in results.items():
+        print(f'{name:<20}{cost:>12.1f}{(cost / baseline - 1) * 100:>9.2f}%')
+
+    print()
+    for name in ('unsampled request', 'sampled request', 'unsampled query', 'sampled query'):
+        print(f'{name:<20}{costs[name]:>8.2f} us')
+    unsampled = costs['unsampled request'] + queries * costs['unsampled query']
+    sampled = costs['sampled request'] + queries * costs['sampled query']
+    print(f'{queries:.1f} queries per request')
+    for rate in sorted({0, default_rate, 1}):
+        cost = unsampled + rate * (sampled - unsampled)
+        print(f'sample rate {rate:g}: {cost:.1f} us per request, '
+              f'{cost / baseline * 100:.3f}% of {baseline:.0f} us')
+
+
+if __name__ == '__main__':
+    main()
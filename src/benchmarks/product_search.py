@@ -0,0 +1,101 @@
+"""
+Latency of /api/product/search/ backed by the FTS5 index against the
+icontains fallback over the same catalogue.
+
+    python -m benchmarks.product_search --products 1000000
+"""
+import argparse
+import random
+import time
+
+from faker import Faker
+
+from benchmarks.utils import api_client, percentile, setup_django, temporary_database, timer
+
+# catalogue text follows a Zipf distribution over Faker's word list, so a
+# few words are in most products and most words in very few
+VOCABULARY = sorted(Faker().get_words_list())
+random.Random(0).shuffle(VOCABULARY)
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+# (label, query) from a word in a third of the catalogue to no match at all
+QUERIES = [
+    ('common word', VOCABULARY[0]),
+    ('mid word', VOCABULARY[50]),
+    ('rare word', VOCABULARY[900]),
+    ('two words', f'{VOCABULARY[20]} {VOCABULARY[60]}'),
+    ('prefix', VOCABULARY[100][:3]),
+    ('no match', 'zzyzx'),
+]
+
+
+def words(k):
+    return ' '.join(random.choices(VOCABULARY, weights=WEIGHTS, k=k))
+
+
+def seed(products, categories=50):
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from apps.FactoryApp.models import Category
+
+    category_ids = [
+        Category.objects.create(name=f'{words(1)} {i}').id for i in range(categories)
+    ]
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    sql = ('INSERT INTO "FactoryApp_product" (title, category_id, description, slug, '
+           'regular_price, discount_price, is_active, created_at, updated_at) '
+           'VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)')
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, products, 10000):
+            rows = []
+            for i in range(start, min(start + 10000, products)):
+                rows.append((words(3), random.choice(category_ids),
+                             words(12), f'product-{i}',
+                             '9.99', '4.99', True, now, now))
+            cursor.executemany(sql, rows)
+
+
+def run(products, repeat):
+    from apps.FactoryApp import search
+
+    elapsed = {}
+    with timer(elapsed, 'seed'):
+        seed(products)
+    print(f'seeded {products} products (FTS kept by triggers) in {elapsed["seed"]:.1f}s')
+
+    client = api_client()
+    original = search.fts_available
+    print(f"{'query':<28}{'fts ms':>10}{'icontains ms':>14}")
+    try:
+        for label, query in QUERIES:
+            p50 = {}
+            for mode, available in (('fts', True), ('icontains', False)):
+                search.fts_available = lambda using=None, available=available: available
+                samples = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    response = client.get('/api/product/search/', {'q': query})
+                    samples.append(time.perf_counter() - start)
+                    assert response.status_code == 200, response.content
+                p50[mode] = percentile(samples, 50) * 1000
+            print(f"{f'{label} ({query})':<28}{p50['fts']:>10.1f}{p50['icontains']:>14.1f}")
+    finally:
+        search.fts_available = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='requests per query and mode, the p50 is reported')
+    args = parser.parse_args()
+
+    setup_django()
+    with temporary_database():
+        run(args.products, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Seconds to seed transactions with TransactionFactory.create_batch against
+TransactionFactory.create_bulk. create_batch is only timed on --batch-rows
+rows (it is slow) and extrapolated.
+
+    python -m benchmarks.seed --rows 100000
+"""
+import argparse
+
+from benchmarks.utils import setup_django, temporary_database, timer
+
+
+def run(rows, batch_rows):
+    from apps.Payment.models import Transaction
+    from tests.Payment.factory import CurrencyFactory, TransactionFactory
+
+    elapsed = {}
+    currency = CurrencyFactory.create(code='USD', name='US Dollar')
+
+    with timer(elapsed, 'create_batch'):
+        TransactionFactory.create_batch(batch_rows, currency=currency)
+    Transaction.objects.all().delete()
+
+    with timer(elapsed, 'create_bulk'):
+        TransactionFactory.create_bulk(rows)
+    assert Transaction.objects.count() == rows
+
+    batch_rate = batch_rows / elapsed['create_batch']
+    bulk_rate = rows / elapsed['create_bulk']
+    print(f'create_batch: {batch_rate:10.0f} rows/sec '
+          f'(~{rows / batch_rate:.1f}s for {rows} rows)')
+    print(f' create_bulk: {bulk_rate:10.0f} rows/sec '
+          f'({elapsed["create_bulk"]:.2f}s for {rows} rows)')
+    print(f'speedup: {bulk_rate / batch_rate:.1f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-rows', type=int, default=2000,
+                        help='rows seeded with create_batch for comparison')
+    args = parser.parse_args()
+
+    setup_django()
+    with temporary_database():
+        run(args.rows, args.batch_rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+CPU cost per row of rendering a page of transactions with
+FilledTransactionSerializer over model instances and with
+TransactionRowSerializer over values() rows, serializing alone and with
+the fetch of the rows and the JSON rendering.
+
+    python -m benchmarks.transaction_serializer --rows 1000 --rounds 20
+"""
+import argparse
+import time
+
+
+def seed(rows):
+    from tests.Payment.factory import CurrencyFactory, TransactionFactory
+
+    currency = CurrencyFactory.create(code='USD', name='US Dollar')
+    TransactionFactory.create_bulk(rows, currencies=[currency])
+
+
+def per_row(func, rows, rounds):
+    ''' CPU microseconds per row of func(), fastest of 'rounds' runs '''
+    samples = []
+    for _ in range(rounds):
+        start = time.process_time()
+        func()
+        samples.append((time.process_time() - start) / rows * 1e6)
+    return min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    from benchmarks.utils import setup_django, temporary_database
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.Payment.models import Transaction
+    from apps.Payment.serializers import (FilledTransactionSerializer,
+                                          TransactionRowSerializer)
+
+    renderer = JSONRenderer()
+    with temporary_database():
+        seed(args.rows)
+        queryset = Transaction.objects.order_by('id')
+        instances = lambda: queryset.select_related('currency')
+        rows = lambda: queryset.values(*TransactionRowSerializer.columns)
+        objects, values = list(instances()), list(rows())
+        assert (renderer.render(FilledTransactionSerializer(objects, many=True).data)
+                == renderer.render(TransactionRowSerializer(values, many=True).data))
+
+        results = {
+            'serialize': (
+                per_row(lambda: FilledTransactionSerializer(objects, many=True).data,
+                        args.rows, args.rounds),
+                per_row(lambda: TransactionRowSerializer(values, many=True).data,
+                        args.rows, args.rounds),
+            ),
+            'fetch + serialize + render': (
+                per_row(lambda: renderer.render(
+                    FilledTransactionSerializer(instances(), many=True).data),
+                    args.rows, args.rounds),
+                per_row(lambda: renderer.render(
+                    TransactionRowSerializer(rows(), many=True).data),
+                    args.rows, args.rounds),
+            ),
+        }
+
+    print(f"{'us per row':<28}{'model':>8}{'rows':>8}{'speedup':>9}")
+    for name, (model, fast) in results.items():
+        print(f'{name:<28}{model:>8.2f}{fast:>8.2f}{model / fast:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
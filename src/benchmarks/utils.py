@@ -0,0 +1,66 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Every benchmark runs against a throw-away SQLite file so the development
+database is never touched. Run them from the ``src`` dir, for example
+
+    python -m benchmarks.bulk_ingest --rows 5000
+"""
+import contextlib
+import os
+import shutil
+import tempfile
+import time
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'MyProject.settings')
+
+    import django
+    django.setup()
+
+
+@contextlib.contextmanager
+def temporary_database():
+    ''' point the default connection at a fresh, migrated SQLite file '''
+    from django.core.management import call_command
+    from django.db import connections
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench-')
+    path = os.path.join(tmp_dir, 'bench.sqlite3')
+
+    connection = connections['default']
+    old_name = connection.settings_dict['NAME']
+    connection.close()
+    connection.settings_dict['NAME'] = path
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+    try:
+        yield path
+    finally:
+        connections.close_all()
+        connection.settings_dict['NAME'] = old_name
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def api_client():
+    ''' APIClient sending a Host header the dev settings accept '''
+    from rest_framework.test import APIClient
+    return APIClient(HTTP_HOST='localhost')
+
+
+@contextlib.contextmanager
+def timer(result, key):
+    ''' store the elapsed wall time of the block in result[key] '''
+    start = time.perf_counter()
+    yield
+    result[key] = time.perf_counter() - start
+
+
+def percentile(samples, pct):
+    ''' nearest-rank percentile of an unsorted list of numbers '''
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100.0 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import cache
 
 from pytest_factoryboy import register
 from .factory import UserFactory, ProductFactory, CategoryFactory
@@ -14,3 +15,9 @@ register(CategoryFactory)
 def create_user(db, user_factory):
 	user = user_factory.create()
 	return user
+
+
+# serialized catalogue pages are cached, start every test without them
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+	cache.clear()
@@ -10,7 +10,7 @@ class UserFactory(factory.django.DjangoModelFactory):
         model = User
 
     # specifing some default args to user model
-    username = fake.name()
+    username = factory.LazyFunction(fake.name)
     is_staff = True
 
 
@@ -27,7 +27,7 @@ class ProductFactory(factory.django.DjangoModelFactory):
 
     title = "product_title"
     category = factory.SubFactory(CategoryFactory)
-    description = fake.text()
+    description = factory.LazyFunction(fake.text)
     slug = "product_slug"
     regular_price = 9.99
     discount_price = 4.99
@@ -0,0 +1,116 @@
+import pytest
+
+from apps.FactoryApp.models import CategoryStats, Product
+from apps.FactoryApp.stats import EMPTY, FIELDS, aggregate
+from apps.FactoryApp.views import ProductViewSet
+from tests.FactoryApp.factory import CategoryFactory, ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+ENDPOINT = '/api/product/bulk-upsert/'
+
+
+@pytest.fixture
+def category():
+    return CategoryFactory.create(name='books')
+
+
+def item(category, slug, **fields):
+    return {
+        'slug': slug, 'title': f'title {slug}', 'category': category.pk,
+        'regular_price': '10.00', 'discount_price': '8.00', **fields,
+    }
+
+
+def post(api_client, items):
+    return api_client().post(ENDPOINT, items, format='json')
+
+
+class TestBulkUpsert:
+
+    def test_creates_and_updates(self, api_client, category):
+        existing = ProductFactory.create(category=category, slug='kept', title='old')
+
+        response = post(api_client, [
+            item(category, 'kept', title='new', is_active=False),
+            item(category, 'fresh'),
+        ])
+
+        assert response.status_code == 200
+        body = response.json()
+        fresh = Product.objects.get(slug='fresh')
+        assert body == {
+            'created': 1, 'updated': 1, 'invalid': 0,
+            'results': [
+                {'index': 0, 'slug': 'kept', 'status': 'updated', 'id': existing.pk},
+                {'index': 1, 'slug': 'fresh', 'status': 'created', 'id': fresh.pk},
+            ],
+        }
+        existing.refresh_from_db()
+        assert (existing.title, existing.is_active) == ('new', False)
+        assert existing.updated_at > existing.created_at
+
+    def test_invalid_items_do_not_stop_the_others(self, api_client, category):
+        ProductFactory.create_batch(2, category=category, slug='shared')
+
+        response = post(api_client, [
+            item(category, 'ok'),
+            item(category, ''),
+            item(category, 'no-price', regular_price='abc'),
+            {**item(category, 'lost'), 'category': 999999},
+            item(category, 'ok'),
+            item(category, 'shared'),
+            'not an object',
+        ])
+
+        body = response.json()
+        statuses = [(result['slug'], result['status']) for result in body['results']]
+        assert statuses == [
+            ('ok', 'created'), ('', 'invalid'), ('no-price', 'invalid'), ('lost', 'invalid'),
+            ('ok', 'invalid'), ('shared', 'invalid'), (None, 'invalid'),
+        ]
+        errors = [result.get('errors') for result in body['results']]
+        assert set(errors[2]) == {'regular_price'}
+        assert errors[3] == {'category': ['Invalid pk "999999" - object does not exist.']}
+        assert errors[4] == {'slug': ['repeats item 0 of this request']}
+        assert 'held by 2 products' in errors[5]['slug'][0]
+        assert (body['created'], body['invalid']) == (1, 6)
+        assert Product.objects.filter(slug='ok').count() == 1
+
+    @pytest.mark.parametrize('data', [{'slug': 'x'}, 'x'])
+    def test_expects_a_list(self, api_client, data):
+        assert post(api_client, data).status_code == 400
+
+    def test_max_rows(self, api_client, category, monkeypatch):
+        monkeypatch.setattr(ProductViewSet, 'upsert_max_rows', 2)
+
+        response = post(api_client, [item(category, str(i)) for i in range(3)])
+
+        assert response.status_code == 400
+        assert not Product.objects.exists()
+
+    def test_queries_do_not_grow_with_items(self, api_client, category,
+                                            django_assert_max_num_queries, monkeypatch):
+        monkeypatch.setattr(ProductViewSet, 'upsert_batch_size', 1000)
+        for i in range(50):
+            ProductFactory.create(category=category, slug=f'old-{i}')
+        items = [item(category, f'old-{i}') for i in range(50)]
+        items += [item(category, f'new-{i}') for i in range(50)]
+
+        # categories, stored slugs, insert, update, stats rebuild and the
+        # transaction around them
+        with django_assert_max_num_queries(12):
+            response = post(api_client, items)
+
+        assert (response.json()['created'], response.json()['updated']) == (50, 50)
+
+    def test_category_stats_follow(self, api_client, category):
+        other = CategoryFactory.create(name='garden')
+        ProductFactory.create(category=category, slug='moving', regular_price=30)
+
+        post(api_client, [item(other, 'moving'), item(category, 'new', regular_price='50.00')])
+
+        expected = aggregate(Product.objects.all())
+        for each in (category, other):
+            row = CategoryStats.objects.filter(pk=each.pk).values(*FIELDS).first() or EMPTY
+            assert row == expected.get(each.pk, EMPTY)
@@ -0,0 +1,125 @@
+import pytest
+from django.utils.http import http_date
+
+from apps.FactoryApp.views import CategoryViewSet, ProductViewSet
+from tests.FactoryApp.factory import CategoryFactory, ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+PRODUCTS = '/api/product/'
+CATEGORIES = '/api/category/'
+
+
+@pytest.fixture
+def product():
+    return ProductFactory.create(category=CategoryFactory.create())
+
+
+@pytest.fixture
+def serializer_calls(mocker):
+    ''' count the serializers built by the catalogue views '''
+    return [
+        mocker.spy(ProductViewSet, 'get_serializer'),
+        mocker.spy(CategoryViewSet, 'get_serializer'),
+    ]
+
+
+def serialized(spies):
+    return sum(spy.call_count for spy in spies)
+
+
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('url', [PRODUCTS, CATEGORIES])
+    def test_headers(self, api_client, product, url):
+        response = api_client().get(url)
+
+        assert response.status_code == 200
+        assert response['ETag'].startswith('"')
+        assert response['Cache-Control'] == 'public, max-age=0'
+        assert 'Accept' in response['Vary']
+
+    @pytest.mark.parametrize('url', [PRODUCTS, CATEGORIES])
+    def test_not_modified_without_serializing(self, api_client, product, serializer_calls, url):
+        client = api_client()
+        etag = client.get(url)['ETag']
+        before = serialized(serializer_calls)
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert response.content == b''
+        assert serialized(serializer_calls) == before
+
+    def test_save_changes_etag(self, api_client, product):
+        client = api_client()
+        etag = client.get(PRODUCTS)['ETag']
+
+        product.title = 'renamed'
+        product.save()
+        response = client.get(PRODUCTS, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert response.json()['results'][0]['title'] == 'renamed'
+
+    def test_delete_and_insert_change_etag(self, api_client, product):
+        client = api_client()
+        first = client.get(PRODUCTS)['ETag']
+
+        ProductFactory.create(category=product.category)
+        second = client.get(PRODUCTS)['ETag']
+        product.delete()
+        third = client.get(PRODUCTS)['ETag']
+
+        assert len({first, second, third}) == 3
+
+    def test_next_page_appearing_changes_etag(self, api_client, product):
+        client = api_client()
+        etag = client.get(PRODUCTS, {'page_size': 1})['ETag']
+
+        # the newest product now fills the page and the old one moves to page 2
+        ProductFactory.create(category=product.category)
+
+        assert client.get(PRODUCTS, {'page_size': 1})['ETag'] != etag
+
+    def test_category_rename_changes_etag(self, api_client, product):
+        client = api_client()
+        etag = client.get(CATEGORIES)['ETag']
+
+        product.category.name = 'renamed'
+        product.category.save()
+
+        assert client.get(CATEGORIES, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_detail_last_modified(self, api_client, product):
+        client = api_client()
+        url = f'{PRODUCTS}{product.id}/'
+
+        response = client.get(url)
+        not_modified = client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        assert response['Last-Modified'] == http_date(product.updated_at.timestamp())
+        assert not_modified.status_code == 304
+
+
+class TestResponseCache:
+
+    def test_repeated_reads_are_served_from_cache(self, api_client, product, serializer_calls):
+        client = api_client()
+        first = client.get(PRODUCTS)
+        before = serialized(serializer_calls)
+
+        second = client.get(PRODUCTS)
+
+        assert serialized(serializer_calls) == before
+        assert second.json() == first.json()
+
+    def test_write_is_visible_at_once(self, api_client, product):
+        client = api_client()
+        client.get(f'{PRODUCTS}{product.id}/')
+
+        client.patch(f'{PRODUCTS}{product.id}/', {'title': 'patched'}, format='json')
+
+        assert client.get(f'{PRODUCTS}{product.id}/').json()['title'] == 'patched'
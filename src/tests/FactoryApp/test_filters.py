@@ -0,0 +1,123 @@
+import base64
+import datetime
+import json
+
+import pytest
+from django.utils import timezone
+
+from apps.FactoryApp.models import Product
+from tests.FactoryApp.factory import CategoryFactory, ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+ENDPOINT = '/api/product/'
+
+
+@pytest.fixture
+def products():
+    books, garden = CategoryFactory.create(name='books'), CategoryFactory.create(name='garden')
+    return {
+        'cheap': ProductFactory.create(category=books, regular_price=5, discount_price=4),
+        'mid': ProductFactory.create(category=garden, regular_price=20, discount_price=15),
+        'dear': ProductFactory.create(category=garden, regular_price=90, discount_price=80),
+        'hidden': ProductFactory.create(category=books, regular_price=20, discount_price=10,
+                                        is_active=False),
+    }
+
+
+def ids(response):
+    return [product['id'] for product in response.json()['results']]
+
+
+class TestFilters:
+
+    @pytest.mark.parametrize('params, expected', [
+        ({'is_active': 'false'}, ['hidden']),
+        ({'is_active': 'true', 'min_price': '10', 'max_price': '20'}, ['mid']),
+        ({'max_discount_price': '10'}, ['cheap', 'hidden']),
+        ({'min_discount_price': '80'}, ['dear']),
+    ])
+    def test_filter(self, api_client, products, params, expected):
+        response = api_client().get(ENDPOINT, params)
+
+        assert response.status_code == 200
+        assert sorted(ids(response)) == sorted(products[name].id for name in expected)
+
+    def test_category(self, api_client, products):
+        garden = products['mid'].category_id
+        books = products['cheap'].category_id
+
+        one = api_client().get(ENDPOINT, {'category': garden})
+        both = api_client().get(ENDPOINT, {'category': f'{garden},{books}'})
+
+        assert sorted(ids(one)) == sorted([products['mid'].id, products['dear'].id])
+        assert len(ids(both)) == 4
+
+    def test_created_window(self, api_client, products):
+        old = timezone.now() - datetime.timedelta(days=30)
+        Product.objects.filter(id=products['cheap'].id).update(created_at=old)
+        since = (timezone.now() - datetime.timedelta(days=1)).isoformat()
+
+        newer = api_client().get(ENDPOINT, {'created_after': since})
+        older = api_client().get(ENDPOINT, {'created_before': since})
+
+        assert products['cheap'].id not in ids(newer)
+        assert ids(older) == [products['cheap'].id]
+
+    @pytest.mark.parametrize('params', [
+        {'is_active': 'maybe'}, {'category': 'books'}, {'min_price': 'cheap'},
+        {'max_price': 'nan'}, {'created_after': 'yesterday'},
+    ])
+    def test_bad_value(self, api_client, params):
+        response = api_client().get(ENDPOINT, params)
+
+        assert response.status_code == 400
+        assert list(response.json()) == list(params)
+
+
+class TestOrdering:
+
+    def test_by_price_across_pages(self, api_client, products):
+        client = api_client()
+
+        first = client.get(ENDPOINT, {'ordering': '-regular_price', 'page_size': 2}).json()
+        second = client.get(first['next']).json()
+
+        prices = [p['regular_price'] for p in first['results'] + second['results']]
+        assert prices == ['90.00', '20.00', '20.00', '5.00']
+        # equal prices are ordered by id, in the direction of the price
+        assert first['results'][1]['id'] > second['results'][0]['id']
+        assert second['next'] is None
+
+    def test_previous_page(self, api_client, products):
+        client = api_client()
+
+        first = client.get(ENDPOINT, {'ordering': 'regular_price', 'page_size': 2}).json()
+        second = client.get(first['next']).json()
+        back = client.get(second['previous']).json()
+
+        assert back['results'] == first['results']
+
+    def test_cursor_is_tied_to_its_ordering(self, api_client, products):
+        client = api_client()
+        first = client.get(ENDPOINT, {'ordering': 'regular_price', 'page_size': 2}).json()
+
+        response = client.get(first['next'].replace('ordering=regular_price',
+                                                    'ordering=created_at'))
+
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize('position', [['x', 1], [None, 1], ['5.00', 'x']])
+    def test_tampered_cursor(self, api_client, products, position):
+        payload = {'p': position, 'r': False, 'o': ['regular_price', 'id']}
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        response = api_client().get(ENDPOINT, {'ordering': 'regular_price', 'cursor': cursor})
+
+        assert response.status_code == 404
+
+    def test_unknown_field_keeps_default(self, api_client, products):
+        response = api_client().get(ENDPOINT, {'ordering': 'description'})
+
+        expected = Product.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        assert ids(response) == list(expected)
@@ -0,0 +1,21 @@
+import json
+
+import pytest
+
+from apps.FactoryApp.models import Product
+
+
+@pytest.mark.django_db
+def test_product_pages(client, category_factory, product_factory):
+    category = category_factory.create()
+    product_factory.create_batch(3, category=category)
+    expected = list(
+        Product.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+    )
+
+    first = json.loads(client.get('/api/product/?page_size=2').content)
+    second = json.loads(client.get(first['next']).content)
+
+    assert [p['id'] for p in first['results']] == expected[:2]
+    assert [p['id'] for p in second['results']] == expected[2:]
+    assert second['next'] is None
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('endpoint', ['/api/product/', '/api/category/'])
+def test_list_queries(assert_max_queries, product_factory, endpoint):
+    product_factory.create_batch(5)
+
+    response = assert_max_queries(endpoint, 1)
+
+    assert response.status_code == 200
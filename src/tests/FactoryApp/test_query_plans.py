@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.FactoryApp.models import Product
+from apps.FactoryApp.views import ProductViewSet
+from MyProject.pagination import _after
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != 'sqlite',
+                       reason='EXPLAIN QUERY PLAN output is SQLite specific'),
+]
+
+
+def list_queryset(params):
+    ''' the queryset of one /api/product/ page, built like the view does it '''
+    request = Request(APIRequestFactory().get('/api/product/', params))
+    view = ProductViewSet(request=request, format_kwarg=None, action='list')
+    queryset = view.filter_queryset(view.get_queryset())
+    ordering = view.paginator.get_ordering(request, queryset, view)
+    return queryset.order_by(*ordering)[:101]
+
+
+# query params -> index that must serve them, and whether it also yields
+# the page order (a price range listed newest first still needs a sort)
+@pytest.mark.parametrize('params, index, ordered', [
+    ({'is_active': 'true', 'category': '1', 'min_price': '1', 'max_price': '50'},
+     'product_active_cat_price_idx', False),
+    ({'is_active': 'true', 'category': '1', 'ordering': 'regular_price'},
+     'product_active_cat_price_idx', True),
+    ({'is_active': 'true', 'min_price': '1', 'ordering': '-regular_price'},
+     'product_active_price_idx', True),
+    ({'is_active': 'true'},
+     'product_active_created_idx', True),
+    ({'is_active': 'true', 'created_after': '2024-01-01T00:00:00'},
+     'product_active_created_idx', True),
+    ({'created_after': '2024-01-01T00:00:00', 'created_before': '2024-02-01T00:00:00'},
+     'product_created_id_idx', True),
+], ids=['category-price-range', 'category-by-price', 'active-by-price', 'active',
+        'active-created-window', 'created-window'])
+def test_filters_use_index(params, index, ordered):
+    plan = list_queryset(params).explain()
+
+    assert index in plan, plan
+    if ordered:
+        assert 'TEMP B-TREE' not in plan, plan
+
+
+def test_next_page_by_price_seeks_into_index():
+    ordering = ['regular_price', 'id']
+    queryset = Product.objects.filter(is_active=True, category=1).order_by(*ordering)
+
+    plan = queryset.filter(_after(ordering, ['9.99', 10]))[:101].explain()
+
+    assert 'product_active_cat_price_idx (category_id=? AND regular_price>?)' in plan, plan
+    assert 'TEMP B-TREE' not in plan, plan
@@ -0,0 +1,111 @@
+import pytest
+
+from apps.FactoryApp import search
+from apps.FactoryApp.models import Category, Product
+from tests.FactoryApp.factory import CategoryFactory, ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+ENDPOINT = '/api/product/search/'
+
+
+@pytest.fixture
+def catalogue():
+    books = CategoryFactory.create(name='books')
+    garden = CategoryFactory.create(name='garden')
+    return {
+        'novel': ProductFactory.create(title='Python crash course', category=books,
+                                       description='a novel way to learn'),
+        'hose': ProductFactory.create(title='Garden hose', category=garden,
+                                      description='twenty meters, fits python taps'),
+        'shears': ProductFactory.create(title='Pruning shears', category=garden,
+                                        description='sharp'),
+    }
+
+
+def titles(response):
+    return [product['title'] for product in response.json()['results']]
+
+
+class TestSearchEndpoint:
+
+    def test_title_match_ranks_first(self, api_client, catalogue):
+        response = api_client().get(ENDPOINT, {'q': 'python'})
+
+        assert response.status_code == 200
+        assert titles(response) == ['Python crash course', 'Garden hose']
+
+    def test_prefix_of_the_last_word(self, api_client, catalogue):
+        response = api_client().get(ENDPOINT, {'q': 'prun'})
+
+        assert titles(response) == ['Pruning shears']
+
+    def test_all_words_must_match(self, api_client, catalogue):
+        response = api_client().get(ENDPOINT, {'q': 'garden sharp'})
+
+        assert titles(response) == ['Pruning shears']
+
+    def test_category_name(self, api_client, catalogue):
+        response = api_client().get(ENDPOINT, {'q': 'books'})
+
+        assert titles(response) == ['Python crash course']
+
+    def test_operators_are_plain_words(self, api_client, catalogue):
+        response = api_client().get(ENDPOINT, {'q': 'python OR "NEAR(*'})
+
+        assert response.status_code == 200
+        assert titles(response) == []
+
+    def test_every_match_is_ranked(self, api_client, catalogue):
+        # the best match is older than 5000 weaker ones, past any window of
+        # newest matches
+        best = ProductFactory.create(title='Oak oak table', description='oak')
+        Product.objects.bulk_create(
+            ProductFactory.build(title=f'chair {i}', description='oak', slug=f'chair-{i}',
+                                 category=best.category)
+            for i in range(5001)
+        )
+
+        response = api_client().get(ENDPOINT, {'q': 'oak', 'limit': 3})
+
+        assert titles(response)[0] == 'Oak oak table'
+
+    def test_limit_and_offset(self, api_client, catalogue):
+        response = api_client().get(ENDPOINT, {'q': 'python', 'limit': 1, 'offset': 1})
+
+        assert titles(response) == ['Garden hose']
+
+    @pytest.mark.parametrize('params', [
+        {}, {'q': ' '}, {'q': 'python', 'limit': 0}, {'q': 'python', 'offset': 'x'},
+    ])
+    def test_bad_request(self, api_client, params):
+        response = api_client().get(ENDPOINT, params)
+
+        assert response.status_code == 400
+
+
+class TestSearchIndex:
+
+    def test_follows_updates_and_deletes(self, catalogue):
+        catalogue['shears'].title = 'Hedge trimmer'
+        catalogue['shears'].save()
+        catalogue['novel'].delete()
+
+        assert search.ranked_ids('hedge', 10) == [catalogue['shears'].id]
+        assert search.ranked_ids('pruning', 10) == []
+        assert search.ranked_ids('crash', 10) == []
+
+    def test_follows_bulk_writes(self, catalogue):
+        Product.objects.filter(id=catalogue['hose'].id).update(title='Watering can')
+        Category.objects.filter(name='garden').update(name='outdoor')
+
+        assert search.ranked_ids('watering', 10) == [catalogue['hose'].id]
+        assert sorted(search.ranked_ids('outdoor', 10)) == sorted(
+            [catalogue['hose'].id, catalogue['shears'].id])
+
+    def test_icontains_fallback(self, mocker, catalogue):
+        mocker.patch.object(search, 'fts_available', return_value=False)
+
+        products = search.search_products(Product.objects.all(), 'garden sharp')
+
+        assert [p.title for p in products] == ['Pruning shears']
@@ -0,0 +1,190 @@
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.FactoryApp.models import CategoryStats, Product
+from apps.FactoryApp.stats import EMPTY, FIELDS, aggregate, rebuild
+from tests.FactoryApp.factory import CategoryFactory, ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+ENDPOINT = '/api/category/stats/'
+
+
+@pytest.fixture
+def books():
+    return CategoryFactory.create(name='books')
+
+
+@pytest.fixture
+def garden():
+    return CategoryFactory.create(name='garden')
+
+
+def stored(category):
+    row = CategoryStats.objects.filter(pk=category.pk).values(*FIELDS).first()
+    return row or EMPTY
+
+
+def assert_consistent(*categories):
+    ''' the incrementally kept rows equal a GROUP BY over Product '''
+    expected = aggregate(Product.objects.all())
+    for category in categories:
+        assert stored(category) == expected.get(category.pk, EMPTY)
+
+
+class TestIncremental:
+
+    def test_create(self, books):
+        ProductFactory.create(category=books, regular_price=10, discount_price=8)
+        ProductFactory.create(category=books, regular_price=30, discount_price=5, is_active=False)
+
+        assert stored(books) == EMPTY | {
+            'product_count': 2, 'active_count': 1,
+            'regular_price_sum': Decimal('40'), 'regular_price_min': 10, 'regular_price_max': 30,
+            'discount_price_sum': Decimal('13'), 'discount_price_min': 5, 'discount_price_max': 8,
+        }
+
+    def test_update_price_and_visibility(self, books):
+        cheap = ProductFactory.create(category=books, regular_price=10)
+        ProductFactory.create(category=books, regular_price=30)
+
+        cheap.regular_price = 50
+        cheap.is_active = False
+        cheap.save()
+
+        assert_consistent(books)
+        assert stored(books)['regular_price_min'] == 30
+
+    def test_update_inside_bounds(self, books):
+        for price in (10, 20, 30):
+            product = ProductFactory.create(category=books, regular_price=price,
+                                            discount_price=price)
+
+        product.regular_price = 25
+        product.save()
+        middle = Product.objects.get(category=books, regular_price=20)
+        middle.discount_price = 15
+        middle.save()
+
+        assert_consistent(books)
+
+    def test_move_category(self, books, garden):
+        product = ProductFactory.create(category=books)
+        ProductFactory.create(category=garden)
+
+        product.category = garden
+        product.save()
+
+        assert_consistent(books, garden)
+        assert stored(books)['product_count'] == 0
+        assert stored(garden)['product_count'] == 2
+
+    @pytest.mark.parametrize('price', [10, 20, 30])
+    def test_delete(self, books, price):
+        products = {p: ProductFactory.create(category=books, regular_price=p, discount_price=p)
+                    for p in (10, 20, 30)}
+
+        products[price].delete()
+
+        assert_consistent(books)
+
+    def test_delete_last(self, books):
+        ProductFactory.create(category=books).delete()
+
+        assert stored(books) == EMPTY
+
+    def test_untracked_save_writes_nothing(self, books):
+        product = ProductFactory.create(category=books)
+
+        product.title = 'renamed'
+        with CaptureQueriesContext(connection) as queries:
+            product.save(update_fields=['title'])
+
+        statements = [query['sql'] for query in queries if 'SAVEPOINT' not in query['sql']]
+        assert len(statements) == 1
+        assert statements[0].startswith('UPDATE "FactoryApp_product"')
+
+    @pytest.mark.parametrize('price', [10, 20, 30])
+    def test_price_change_is_one_statement(self, books, price):
+        products = {p: ProductFactory.create(category=books, regular_price=p, discount_price=p)
+                    for p in (10, 20, 30)}
+
+        product = products[price]
+        product.regular_price = 25
+        with CaptureQueriesContext(connection) as queries:
+            product.save()
+
+        stats = [query['sql'] for query in queries if 'FactoryApp_categorystats' in query['sql']]
+        # a removed bound is recomputed inside the UPDATE, no read follows
+        assert len(stats) == 1
+        assert stats[0].startswith('UPDATE "FactoryApp_categorystats"')
+        assert_consistent(books)
+
+    def test_update_fields_keeps_unsaved_columns(self, books):
+        product = ProductFactory.create(category=books, regular_price=10, discount_price=5)
+
+        product.regular_price = 20
+        product.discount_price = 99
+        product.save(update_fields=['regular_price'])
+
+        assert_consistent(books)
+
+
+class TestRebuild:
+
+    def test_repairs_drift(self, books, garden):
+        ProductFactory.create(category=books, regular_price=10)
+        ProductFactory.create(category=garden, regular_price=10)
+        # skips the signals
+        Product.objects.filter(category=books).update(regular_price=70)
+
+        assert rebuild() == [books.pk]
+        assert rebuild() == []
+        assert_consistent(books, garden)
+
+    def test_command(self, books, capsys):
+        ProductFactory.create(category=books)
+        CategoryStats.objects.all().delete()
+
+        call_command('rebuild_category_stats')
+        call_command('rebuild_category_stats', str(books.pk))
+
+        out = capsys.readouterr().out.splitlines()
+        assert out == [f'repaired 1 categories: {books.pk}', 'category stats are up to date']
+        assert_consistent(books)
+
+
+class TestEndpoint:
+
+    def test_stats(self, api_client, books, garden):
+        ProductFactory.create(category=books, regular_price=10, discount_price='7.50')
+        ProductFactory.create(category=books, regular_price=21, discount_price=5, is_active=False)
+
+        response = api_client().get(ENDPOINT)
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {
+                'id': books.pk, 'name': 'books', 'product_count': 2, 'active_count': 1,
+                'regular_price': {'min': '10.00', 'avg': '15.50', 'max': '21.00'},
+                'discount_price': {'min': '5.00', 'avg': '6.25', 'max': '7.50'},
+            },
+            {
+                'id': garden.pk, 'name': 'garden', 'product_count': 0, 'active_count': 0,
+                'regular_price': {'min': None, 'avg': None, 'max': None},
+                'discount_price': {'min': None, 'avg': None, 'max': None},
+            },
+        ]
+
+    def test_one_query_whatever_the_catalogue(self, api_client, django_assert_num_queries):
+        for _ in range(3):
+            ProductFactory.create_batch(5, category=CategoryFactory.create())
+
+        with django_assert_num_queries(1):
+            response = api_client().get(ENDPOINT)
+
+        assert len(response.json()) == 3
@@ -0,0 +1,131 @@
+import logging
+import re
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.Metrics.middleware import MetricsMiddleware
+from apps.Metrics.recorder import current
+from apps.Metrics.sinks import Histogram, get_sink
+from apps.Payment.models import Currency
+from tests.Payment.factory import CurrencyFactory, TransactionFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def sample_everything(settings):
+    settings.METRICS_SAMPLE_RATE = 1
+    settings.METRICS_SERVER_TIMING = True
+    sink = get_sink()
+    sink.clear()
+    yield
+    sink.clear()
+
+
+def server_timing(response):
+    ''' {'db': (ms, desc), 'ser': (ms, None), 'total': (ms, None)} '''
+    entries = {}
+    for entry in response['Server-Timing'].split(', '):
+        match = re.fullmatch(r'(\w+);dur=([\d.]+)(?:;desc="(.*)")?', entry)
+        entries[match[1]] = (float(match[2]), match[3])
+    return entries
+
+
+def test_server_timing():
+    TransactionFactory.create_batch(3)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = APIClient().get('/api/transaction/')
+
+    timing = server_timing(response)
+    assert timing['db'][1] == f'{len(queries)} queries'
+    assert set(timing) == {'db', 'ser', 'total'}
+    assert timing['total'][0] >= timing['db'][0] + timing['ser'][0]
+
+
+def test_views_without_the_mixin_have_no_serializer_time():
+    response = APIClient().get('/metrics')
+
+    assert set(server_timing(response)) == {'db', 'total'}
+
+
+def test_unsampled_requests_are_not_measured(settings):
+    settings.METRICS_SAMPLE_RATE = 0
+
+    response = APIClient().get('/api/currency/')
+
+    assert 'Server-Timing' not in response
+    assert 'http_request_duration_seconds_count' not in get_sink().render()
+
+
+def test_server_timing_can_be_turned_off(settings):
+    settings.METRICS_SERVER_TIMING = False
+
+    response = APIClient().get('/api/currency/')
+
+    assert 'Server-Timing' not in response
+    assert 'endpoint="GET currency-list"' in get_sink().render()
+
+
+def test_metrics_endpoint():
+    CurrencyFactory.create()
+    client = APIClient()
+    client.get('/api/currency/')
+    client.get('/api/currency/')
+    client.get('/no/such/page/')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    body = response.content.decode()
+    assert 'http_request_duration_seconds_count{endpoint="GET currency-list"} 2' in body
+    assert 'http_request_db_queries_bucket{endpoint="GET currency-list",le="+Inf"} 2' in body
+    assert 'http_request_serializer_seconds_count{endpoint="GET currency-list"} 2' in body
+    # the path is never a label, every 404 shares one
+    assert 'http_request_duration_seconds_count{endpoint="GET unmatched"} 1' in body
+
+
+def test_log_sink(settings, caplog):
+    settings.METRICS_SINK = 'apps.Metrics.sinks.LogSink'
+
+    with caplog.at_level(logging.INFO, logger='apps.Metrics'):
+        APIClient().get('/api/currency/')
+
+    assert re.fullmatch(r'GET currency-list queries=\d+ db=[\d.]+ms ser=[\d.]+ms total=[\d.]+ms',
+                        caplog.records[-1].getMessage())
+    # nothing to serve without histograms
+    assert APIClient().get('/metrics').status_code == 404
+
+
+def test_async_requests_count_queries_of_other_threads():
+    async def view(request):
+        await Currency.objects.acount()
+        await sync_to_async(Currency.objects.count)()
+        return HttpResponse()
+
+    middleware = MetricsMiddleware(view)
+    response = async_to_sync(middleware)(RequestFactory().get('/'))
+
+    assert server_timing(response)['db'][1] == '2 queries'
+    assert current.get() is None
+
+
+def test_histogram():
+    histogram = Histogram((1, 5))
+    for value in (0, 1, 3, 7):
+        histogram.observe(value)
+
+    assert list(histogram.lines('queries', 'endpoint="x"')) == [
+        'queries_bucket{endpoint="x",le="1"} 2',
+        'queries_bucket{endpoint="x",le="5"} 3',
+        'queries_bucket{endpoint="x",le="+Inf"} 4',
+        'queries_sum{endpoint="x"} 11',
+        'queries_count{endpoint="x"} 4',
+    ]
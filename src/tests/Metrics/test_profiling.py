@@ -0,0 +1,124 @@
+import gzip
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.test import APIClient
+
+from apps.Metrics.models import ProfileRecord
+from apps.Metrics.profiling import ProfilingMiddleware, artifact_path, load, summary
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def profiling(settings, tmp_path):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_DIR = str(tmp_path)
+    settings.PROFILING_RATE = 5
+    cache.clear()
+    return settings
+
+
+@pytest.fixture
+def staff_client(django_user_model):
+    user = django_user_model.objects.create_user('staff', password='x', is_staff=True)
+    client = APIClient()
+    client.force_login(user)
+    return client
+
+
+def test_staff_request_is_profiled(staff_client):
+    response = staff_client.get('/api/currency/?_profile=1')
+
+    assert response.status_code == 200
+    record = ProfileRecord.objects.get(pk=response['X-Profile'])
+    assert (record.method, record.path, record.endpoint, record.status_code) == (
+        'GET', '/api/currency/?_profile=1', 'GET currency-list', 200)
+    assert record.user.username == 'staff'
+    assert artifact_path(record).stat().st_size == record.size
+    # the view ran under the profiler
+    assert any(function == 'list' for _, _, function in load(record).stats)
+    assert 'cumulative' in summary(record)
+
+
+def test_header_asks_for_a_profile(staff_client):
+    response = staff_client.get('/api/currency/', HTTP_X_PROFILE='1')
+
+    assert ProfileRecord.objects.filter(pk=response['X-Profile']).exists()
+
+
+def test_only_staff_requests_are_profiled(django_user_model):
+    user = django_user_model.objects.create_user('user', password='x')
+    client = APIClient()
+    client.force_login(user)
+
+    for response in (client.get('/api/currency/?_profile=1'),
+                     APIClient().get('/api/currency/?_profile=1')):
+        assert response.status_code == 200
+        assert 'X-Profile' not in response
+    assert not ProfileRecord.objects.exists()
+
+
+def test_requests_without_the_flag_are_not_profiled(staff_client):
+    response = staff_client.get('/api/currency/?_profile=0')
+
+    assert 'X-Profile' not in response
+    assert not ProfileRecord.objects.exists()
+
+
+def test_rate_limit(staff_client, profiling):
+    profiling.PROFILING_RATE = 2
+
+    responses = [staff_client.get('/api/currency/?_profile=1') for _ in range(3)]
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert responses[2]['X-Profile'] == 'rate-limited'
+    assert ProfileRecord.objects.count() == 2
+
+
+def test_disabled_by_default(settings, staff_client):
+    settings.PROFILING_ENABLED = False
+
+    with pytest.raises(MiddlewareNotUsed):
+        ProfilingMiddleware(lambda request: None)
+    # the middleware is left out of a handler loaded now
+    response = APIClient().get('/api/currency/?_profile=1')
+    assert 'X-Profile' not in response
+
+
+class TestAdmin:
+
+    @pytest.fixture
+    def admin_client(self, admin_client, staff_client):
+        self.record = ProfileRecord.objects.get(
+            pk=staff_client.get('/api/currency/?_profile=1')['X-Profile'])
+        return admin_client
+
+    def test_list(self, admin_client):
+        response = admin_client.get('/admin/Metrics/profilerecord/')
+
+        assert response.status_code == 200
+        assert self.record.artifact in response.content.decode()
+
+    def test_detail_shows_the_top_functions(self, admin_client):
+        response = admin_client.get(f'/admin/Metrics/profilerecord/{self.record.pk}/change/')
+
+        assert response.status_code == 200
+        assert 'cumulative' in response.content.decode()
+
+    def test_download(self, admin_client):
+        response = admin_client.get(f'/admin/Metrics/profilerecord/{self.record.pk}/download/')
+
+        assert response.status_code == 200
+        assert gzip.decompress(b''.join(response.streaming_content))
+
+    def test_delete_removes_the_file(self, admin_client):
+        path = artifact_path(self.record)
+
+        response = admin_client.post(f'/admin/Metrics/profilerecord/{self.record.pk}/delete/',
+                                     {'post': 'yes'})
+
+        assert response.status_code == 302
+        assert not ProfileRecord.objects.exists()
+        assert not path.exists()
@@ -2,6 +2,8 @@ import pytest
 from .factory import TransactionFactory, CurrencyFactory
 from pytest_factoryboy import register
 
+from apps.Payment.cache import currency_cache
+
 register(CurrencyFactory)
 register(TransactionFactory)
 
@@ -24,3 +26,9 @@ def create_transaction(db, transaction_factory):
 @pytest.fixture
 def get_payment_id():
     return "tnMMv6"
+
+
+@pytest.fixture(autouse=True)
+def clear_currency_cache():
+    # rolled back test data never sends post_delete, so start every test cold
+    currency_cache.clear()
@@ -1,9 +1,44 @@
+import uuid
+from contextlib import contextmanager
+
 import factory
+import factory.random
+from django.db import connection, transaction as db_transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
 
 from apps.Payment.models import Transaction, Currency
+from apps.Payment.signals import transaction_filler
+from apps.Payment.utils import PAYMENT_INTENT_ID_LENGTH, Stripe
 from faker import Faker
+from faker.providers.currency import Provider as CurrencyProvider
 fake = Faker()
 
+# fixed (code, name) pairs used by the bulk seeding, so it never collides
+# on the unique currency columns the way random Faker currencies can
+CURRENCY_POOL = [
+    ('USD', 'US Dollar'), ('EUR', 'Euro'), ('GBP', 'Pound Sterling'),
+    ('INR', 'Indian Rupee'), ('JPY', 'Yen'), ('CHF', 'Swiss Franc'),
+    ('CAD', 'Canadian Dollar'), ('AUD', 'Australian Dollar'),
+]
+
+# every other Faker currency, unique on both code and name
+CURRENCIES = list({
+    name: (code, name) for code, name in CurrencyProvider.currencies
+    if code not in dict(CURRENCY_POOL)
+}.values())
+factory.random.randgen.shuffle(CURRENCIES)
+
+
+@contextmanager
+def muted_transaction_filler():
+    ''' disconnect the 'payment_intent_id' filling signal for the duration '''
+    post_save.disconnect(transaction_filler, sender=Transaction)
+    try:
+        yield
+    finally:
+        post_save.connect(transaction_filler, sender=Transaction)
+
 
 class CurrencyFactory(factory.django.DjangoModelFactory):
     class Meta:
@@ -22,8 +57,11 @@ class CurrencyFactory(factory.django.DjangoModelFactory):
 
     # Since currency is declared as a parameter, it won't be passed to 
     # the model (it's automatically added to Meta.exclude.
+
+    # Faker("currency") picks at random and two currencies of one test could
+    # collide on the unique code, so walk a shuffled list of them instead
     class Params:
-        currency = factory.Faker("currency")  # (code, name)
+        currency = factory.Sequence(lambda n: CURRENCIES[n % len(CURRENCIES)])  # (code, name)
 
     code = factory.LazyAttribute(lambda o: o.currency[0])
     name = factory.LazyAttribute(lambda o: o.currency[1])
@@ -41,6 +79,52 @@ class TransactionFactory(factory.django.DjangoModelFactory):
     email = factory.LazyAttribute(lambda _: fake.email())
     name = factory.LazyAttribute(lambda _: fake.name())
 
+    @classmethod
+    def create_bulk(cls, n, currencies=None, filled=True, batch_size=5000,
+                    distinct_values=1000):
+        '''
+            Seed n transactions with a few executemany INSERTs, skipping model
+            instances and per field value preparation (most of the cost of
+            bulk_create at 100k rows). Faker is called once per distinct value and
+            the pools are sampled for every row; currencies come from CURRENCY_POOL
+            unless given. No post_save is sent, so 'payment_intent_id' is assigned
+            up front (or left empty with filled=False). Returns the rows written.
+        '''
+        if currencies is None:
+            currencies = [
+                Currency.objects.get_or_create(code=code, defaults={'name': name})[0]
+                for code, name in CURRENCY_POOL
+            ]
+        pool = min(n, distinct_values) or 1
+        names = [fake.name() for _ in range(pool)]
+        emails = [fake.email() for _ in range(pool)]
+        intent_ids = (Stripe.create_many(n, PAYMENT_INTENT_ID_LENGTH) if filled
+                      else [None] * n)
+        new_uid = (uuid.uuid4 if connection.features.has_native_uuid_field
+                   else lambda: uuid.uuid4().hex)
+        created = connection.ops.adapt_datetimefield_value(timezone.now())
+        # factory_boy's generator, seeded per run by tests.parallel.seed_factories
+        choices = factory.random.randgen.choices
+
+        rows = [
+            (new_uid(), name, email, created, currency_id, intent_id)
+            for name, email, currency_id, intent_id in zip(
+                choices(names, k=n), choices(emails, k=n),
+                choices([c.pk for c in currencies], k=n), intent_ids)
+        ]
+        meta = Transaction._meta
+        columns = ', '.join(
+            connection.ops.quote_name(meta.get_field(f).column)
+            for f in ('uid', 'name', 'email', 'creation_date', 'currency', 'payment_intent_id')
+        )
+        sql = (f'INSERT INTO {connection.ops.quote_name(meta.db_table)} ({columns}) '
+               f'VALUES (%s, %s, %s, %s, %s, %s)')
+
+        with db_transaction.atomic(), connection.cursor() as cursor:
+            for start in range(0, n, batch_size):
+                cursor.executemany(sql, rows[start:start + batch_size])
+        return n
+
 
 class FilledTransactionFactory(factory.django.DjangoModelFactory):
     ''' Transaction obj with 'payment_intent_id' field assigned '''
@@ -51,7 +135,7 @@ class FilledTransactionFactory(factory.django.DjangoModelFactory):
     payment_intent_id = "abcdef"
     email = factory.LazyAttribute(lambda _: fake.email())
     name = factory.LazyAttribute(lambda _: fake.name())
-    message = fake.text()[:20].strip()
+    message = factory.LazyFunction(lambda: fake.text()[:20].strip())
 
 
 class CurrencylessTransactionFactory(factory.django.DjangoModelFactory):
@@ -60,4 +144,4 @@ class CurrencylessTransactionFactory(factory.django.DjangoModelFactory):
     
     email = factory.LazyAttribute(lambda _: fake.email())
     name = factory.LazyAttribute(lambda _: fake.name())
-    message = fake.text()[:20].strip()
+    message = factory.LazyFunction(lambda: fake.text()[:20].strip())
@@ -3,6 +3,7 @@ import pytest
 
 from .factory import CurrencyFactory, TransactionFactory
 from apps.Payment.models import Currency, Transaction
+from apps.Payment.views import TransactionViewset
 
 # applying universal marker
 pytestmark = pytest.mark.django_db
@@ -141,7 +142,7 @@ class TestTransactionEndpoints:
         response = client.get(url)
 
         assert response.status_code == 200
-        assert len(json.loads(response.content)) == 3
+        assert len(json.loads(response.content)['results']) == 3
 
     def test_create(self, api_client):
         client = api_client()
@@ -168,6 +169,71 @@ class TestTransactionEndpoints:
         assert json.loads(response.content) == valid_data_dict
         assert Transaction.objects.last().link
 
+    def test_bulk_create(self, api_client):
+        currency = CurrencyFactory.create()
+        rows = [
+            {
+                'currency': currency.code,
+                'name': f'name {i}',
+                'email': f'user{i}@email.com',
+                'message': 'bulk'
+            }
+            for i in range(5)
+        ]
+
+        response = api_client().post(
+            f'{self.endpoint}bulk/',
+            rows,
+            format='json'
+        )
+
+        assert response.status_code == 201
+        content = json.loads(response.content)
+        assert len(content) == 5
+        assert [row['email'] for row in content] == [row['email'] for row in rows]
+        assert Transaction.objects.count() == 5
+        # payment_intent_id is assigned before insert, not by the signal
+        assert not Transaction.objects.filter(payment_intent_id=None).exists()
+
+    def test_bulk_create_invalid(self, api_client):
+        currency = CurrencyFactory.create()
+        rows = [
+            {'currency': currency.code, 'name': 'valid', 'email': 'valid@email.com'},
+            {'currency': 'ZZZ', 'name': 'invalid', 'email': 'invalid@email.com'},
+        ]
+
+        response = api_client().post(
+            f'{self.endpoint}bulk/',
+            rows,
+            format='json'
+        )
+
+        assert response.status_code == 400
+        assert Transaction.objects.count() == 0
+
+    def test_bulk_create_too_many(self, api_client, mocker):
+        mocker.patch.object(TransactionViewset, 'bulk_max_rows', 2)
+        currency = CurrencyFactory.create()
+        rows = [
+            {'currency': currency.code, 'name': 'name', 'email': 'user@email.com'}
+            for _ in range(3)
+        ]
+
+        response = api_client().post(
+            f'{self.endpoint}bulk/',
+            rows,
+            format='json'
+        )
+
+        assert response.status_code == 400
+        assert Transaction.objects.count() == 0
+
+    def test_fill_queue_stats(self, api_client):
+        response = api_client().get(f'{self.endpoint}fill-queue/')
+
+        assert response.status_code == 200
+        assert 'depth' in json.loads(response.content)
+
     def test_retrieve(self, api_client):
         t = TransactionFactory.create()
         t = Transaction.objects.last()
@@ -0,0 +1,99 @@
+import pytest
+
+from apps.Payment.cache import CurrencyCache, currency_cache
+from apps.Payment.models import Currency
+from tests.Payment.factory import CurrencyFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestCurrencyCache:
+
+    def test_hit_and_miss(self, django_assert_num_queries):
+        currency = CurrencyFactory.create()
+        cache = CurrencyCache()
+
+        with django_assert_num_queries(1):
+            assert cache.get(currency.code) == currency
+            assert cache.get(currency.code) == currency
+            assert cache.get_by_id(currency.id) == currency
+
+        assert cache.stats() == {'hits': 2, 'misses': 1, 'size': 1}
+
+    def test_unknown_code(self):
+        with pytest.raises(Currency.DoesNotExist):
+            CurrencyCache().get('ZZZ')
+
+    def test_ttl(self, django_assert_num_queries):
+        currency = CurrencyFactory.create()
+        cache = CurrencyCache(ttl=0)
+
+        with django_assert_num_queries(2):
+            cache.get(currency.code)
+            cache.get(currency.code)
+
+    def test_lru_eviction(self):
+        first, second, third = [
+            CurrencyFactory.create(code=code, name=code) for code in ('AAA', 'BBB', 'CCC')
+        ]
+        cache = CurrencyCache(maxsize=2)
+
+        cache.get(first.code)
+        cache.get(second.code)
+        cache.get(first.code)       # second is now least recently used
+        cache.get(third.code)
+
+        assert list(cache._entries) == [first.code, third.code]
+        assert second.id not in cache._codes
+
+    def test_invalidate_on_save(self):
+        currency = CurrencyFactory.create()
+        currency_cache.get(currency.code)
+
+        currency.symbol = '€'
+        currency.save()
+
+        assert currency_cache.get(currency.code).symbol == '€'
+
+    def test_invalidate_on_delete(self):
+        currency = CurrencyFactory.create()
+        currency_cache.get(currency.code)
+
+        currency.delete()
+
+        with pytest.raises(Currency.DoesNotExist):
+            currency_cache.get(currency.code)
+
+    def test_version_key(self):
+        currency = CurrencyFactory.create()
+        this_process = CurrencyCache(version_key='currency-version',
+                                     version_check_interval=0)
+        other_process = CurrencyCache(version_key='currency-version',
+                                      version_check_interval=0)
+        this_process.get(currency.code)
+
+        other_process.invalidate()
+        this_process.get(currency.code)
+
+        assert this_process.stats()['misses'] == 2
+
+
+class TestCachedSerializers:
+
+    def test_create_reuses_cached_currency(self, assert_max_queries):
+        currency = CurrencyFactory.create()
+        data = {'currency': currency.code, 'name': 'name', 'email': 'user@email.com'}
+        assert_max_queries('/api/transaction/', 3, method='post', data=data, format='json')
+
+        # INSERT and the payment intent UPDATE, the currency comes from memory
+        response = assert_max_queries(
+            '/api/transaction/', 2, method='post', data=data, format='json'
+        )
+
+        assert response.status_code == 201
+
+    def test_cache_stats(self, api_client):
+        response = api_client().get('/api/currency/cache-stats/')
+
+        assert response.status_code == 200
+        assert set(response.json()) == {'hits', 'misses', 'size'}
@@ -0,0 +1,95 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from apps.Payment.export import EXPORT_FIELDS
+from apps.Payment.models import Transaction
+from apps.Payment.serializers import FilledTransactionSerializer
+from tests.Payment.factory import CurrencyFactory, TransactionFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTransactionExport:
+
+    endpoint = '/api/transaction/export/'
+
+    @pytest.fixture
+    def transactions(self):
+        currency = CurrencyFactory.create()
+        TransactionFactory.create_batch(3, currency=currency, message='a, "quoted" one')
+        return list(Transaction.objects.order_by('id'))
+
+    def test_ndjson(self, api_client, transactions):
+        response = api_client().get(f'{self.endpoint}?format=ndjson')
+        content = b''.join(response.streaming_content).decode()
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        assert rows == json.loads(json.dumps(
+            FilledTransactionSerializer(transactions, many=True).data
+        ))
+
+    def test_csv(self, api_client, transactions):
+        response = api_client().get(f'{self.endpoint}?format=csv')
+        content = b''.join(response.streaming_content).decode()
+
+        rows = list(csv.reader(io.StringIO(content)))
+        assert rows[0] == list(EXPORT_FIELDS)
+        assert [int(row[0]) for row in rows[1:]] == [t.id for t in transactions]
+        assert rows[1][EXPORT_FIELDS.index('message')] == 'a, "quoted" one'
+
+    def test_chunks(self, api_client, transactions, mocker):
+        mocker.patch('apps.Payment.views.TransactionViewset.export_chunk_size', 2)
+
+        response = api_client().get(f'{self.endpoint}?format=ndjson')
+        chunks = list(response.streaming_content)
+
+        assert len(chunks) == 2
+        assert b''.join(chunks).count(b'\n') == 3
+
+    def test_chunks_under_asgi(self, transactions, mocker):
+        mocker.patch('apps.Payment.views.TransactionViewset.export_chunk_size', 2)
+
+        async def export():
+            response = await AsyncClient().get(f'{self.endpoint}?format=ndjson')
+            return response, [chunk async for chunk in response.streaming_content]
+
+        response, chunks = async_to_sync(export)()
+
+        # an async body, sent chunk by chunk rather than read in full first
+        assert response.is_async
+        assert len(chunks) == 2
+        assert b''.join(chunks).count(b'\n') == 3
+
+    def test_date_range(self, api_client, transactions):
+        middle = transactions[1]
+        since = middle.creation_date.isoformat()
+        until = (middle.creation_date + datetime.timedelta(microseconds=1)).isoformat()
+
+        response = api_client().get(
+            self.endpoint, {'format': 'ndjson', 'since': since, 'until': until}
+        )
+        content = b''.join(response.streaming_content).decode()
+
+        assert [json.loads(line)['id'] for line in content.splitlines()] == [middle.id]
+
+    def test_gzip(self, api_client, transactions):
+        response = api_client().get(f'{self.endpoint}?format=csv&compress=gzip')
+        content = gzip.decompress(b''.join(response.streaming_content)).decode()
+
+        assert response['Content-Type'] == 'application/gzip'
+        assert 'transactions.csv.gz' in response['Content-Disposition']
+        assert len(content.splitlines()) == 4
+
+    def test_invalid_date(self, api_client):
+        response = api_client().get(f'{self.endpoint}?format=ndjson&since=yesterday')
+
+        assert response.status_code == 400
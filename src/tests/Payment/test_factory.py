@@ -0,0 +1,49 @@
+import pytest
+
+from apps.Payment.models import Currency, Transaction
+from tests.Payment.factory import (CURRENCY_POOL, CurrencyFactory,
+                                   TransactionFactory, muted_transaction_filler)
+
+pytestmark = pytest.mark.django_db
+
+
+class TestCreateBulk:
+
+    def test_creates_filled_rows(self):
+        TransactionFactory.create_bulk(500)
+
+        assert Transaction.objects.count() == 500
+        assert not Transaction.objects.filter(payment_intent_id=None).exists()
+        assert Currency.objects.count() == len(CURRENCY_POOL)
+
+    def test_rows_are_usable(self):
+        TransactionFactory.create_bulk(10)
+
+        transaction = Transaction.objects.select_related('currency').first()
+        assert transaction.uid
+        assert transaction.creation_date
+        assert transaction.currency.code in dict(CURRENCY_POOL)
+
+    def test_reuses_given_currencies(self):
+        currency = CurrencyFactory.create(code='USD', name='US Dollar')
+
+        TransactionFactory.create_bulk(20, currencies=[currency], filled=False)
+
+        assert Currency.objects.count() == 1
+        assert Transaction.objects.filter(payment_intent_id=None).count() == 20
+
+    def test_empty(self):
+        assert TransactionFactory.create_bulk(0) == 0
+
+
+def test_muted_transaction_filler():
+    currency = CurrencyFactory.create(code='USD', name='US Dollar')
+
+    with muted_transaction_filler():
+        muted = TransactionFactory.create(currency=currency)
+    filled = TransactionFactory.create(currency=currency)
+
+    muted.refresh_from_db()
+    filled.refresh_from_db()
+    assert muted.payment_intent_id is None
+    assert filled.payment_intent_id is not None
@@ -0,0 +1,129 @@
+import uuid
+
+import pytest
+from django.core.cache import cache
+
+from apps.Payment.models import Transaction
+from apps.Payment.serializers import TransactionLookupSerializer
+from apps.Payment.utils import fill_transactions
+from tests.Payment.factory import (CurrencyFactory, TransactionFactory,
+                                   muted_transaction_filler)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def transaction():
+    t = TransactionFactory.create()
+    return Transaction.objects.get(id=t.id)
+
+
+class TestLookupEndpoints:
+
+    endpoint = '/api/transaction/'
+
+    def test_by_intent(self, api_client, transaction):
+        response = api_client().get(
+            f'{self.endpoint}by-intent/{transaction.payment_intent_id}/'
+        )
+
+        assert response.status_code == 200
+        assert response.json()['id'] == transaction.id
+
+    def test_by_uid(self, api_client, transaction):
+        response = api_client().get(f'{self.endpoint}by-uid/{transaction.uid}/')
+
+        assert response.status_code == 200
+        assert response.json()['uid'] == str(transaction.uid)
+
+    @pytest.mark.parametrize('path', [
+        'by-intent/missing/',
+        'by-uid/00000000-0000-4000-8000-000000000000/',
+        'by-uid/--------------------------------/',
+    ])
+    def test_not_found(self, api_client, path):
+        response = api_client().get(f'{self.endpoint}{path}')
+
+        assert response.status_code == 404
+
+    def test_cached(self, api_client, transaction, django_assert_num_queries):
+        url = f'{self.endpoint}by-uid/{transaction.uid}/'
+        api_client().get(url)
+
+        with django_assert_num_queries(0):
+            response = api_client().get(url)
+
+        assert response.json()['id'] == transaction.id
+
+    def test_invalidated_on_save(self, api_client, transaction):
+        url = f'{self.endpoint}by-intent/{transaction.payment_intent_id}/'
+        api_client().get(url)
+
+        transaction.name = 'renamed'
+        transaction.save()
+
+        assert api_client().get(url).json()['name'] == 'renamed'
+
+    def test_unfilled_rows_are_not_cached(self, api_client):
+        with muted_transaction_filler():
+            transaction = TransactionFactory.create()
+        url = f'{self.endpoint}by-uid/{transaction.uid}/'
+        assert api_client().get(url).json()['payment_intent_id'] is None
+
+        # the deferred fill, an update() without post_save
+        fill_transactions(Transaction, [transaction.id])
+
+        filled = Transaction.objects.get(id=transaction.id).payment_intent_id
+        assert filled is not None
+        assert api_client().get(url).json()['payment_intent_id'] == filled
+
+    def test_invalidated_on_delete(self, api_client, transaction):
+        url = f'{self.endpoint}by-uid/{transaction.uid}/'
+        api_client().get(url)
+
+        transaction.delete()
+
+        assert api_client().get(url).status_code == 404
+
+
+class TestBulkLookup:
+
+    endpoint = '/api/transaction/lookup/'
+
+    def test_lookup(self, api_client, django_assert_max_num_queries):
+        currency = CurrencyFactory.create()
+        TransactionFactory.create_batch(4, currency=currency)
+        first, second, third, _ = Transaction.objects.order_by('id')
+        missing_uid = str(uuid.uuid4())
+
+        with django_assert_max_num_queries(1):
+            response = api_client().post(self.endpoint, {
+                'payment_intent_ids': [first.payment_intent_id, 'missing'],
+                'uids': [str(second.uid), str(third.uid), missing_uid],
+            }, format='json')
+
+        assert response.status_code == 200
+        content = response.json()
+        assert [row['id'] for row in content['results']] == [first.id, second.id, third.id]
+        assert content['missing'] == {
+            'payment_intent_ids': ['missing'], 'uids': [missing_uid]
+        }
+
+    def test_too_many(self, api_client, mocker):
+        mocker.patch.object(TransactionLookupSerializer, 'MAX_IDS', 2)
+
+        response = api_client().post(self.endpoint, {
+            'payment_intent_ids': ['a', 'b'], 'uids': [str(uuid.uuid4())],
+        }, format='json')
+
+        assert response.status_code == 400
+
+    def test_invalid_uid(self, api_client):
+        response = api_client().post(self.endpoint, {'uids': ['nope']}, format='json')
+
+        assert response.status_code == 400
@@ -0,0 +1,80 @@
+import base64
+import json
+
+import pytest
+
+from apps.Payment.models import Transaction
+from tests.Payment.factory import CurrencyFactory, TransactionFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTransactionPagination:
+
+    endpoint = '/api/transaction/'
+
+    def walk(self, client, url):
+        ''' follow the next links, return the ids of every page '''
+        pages = []
+        while url:
+            content = json.loads(client.get(url).content)
+            pages.append([row['id'] for row in content['results']])
+            url = content['next']
+        return pages
+
+    def test_pages(self, api_client):
+        currency = CurrencyFactory.create()
+        TransactionFactory.create_batch(5, currency=currency)
+        expected = list(
+            Transaction.objects.order_by('-creation_date', '-id')
+            .values_list('id', flat=True)
+        )
+
+        pages = self.walk(api_client(), f'{self.endpoint}?page_size=2')
+
+        assert pages == [expected[0:2], expected[2:4], expected[4:5]]
+
+    def test_previous(self, api_client):
+        currency = CurrencyFactory.create()
+        TransactionFactory.create_batch(5, currency=currency)
+        client = api_client()
+
+        first = json.loads(client.get(f'{self.endpoint}?page_size=2').content)
+        second = json.loads(client.get(first['next']).content)
+        back = json.loads(client.get(second['previous']).content)
+
+        assert first['previous'] is None
+        assert back['results'] == first['results']
+        assert back['previous'] is None
+
+    def test_new_rows_do_not_shift_pages(self, api_client):
+        currency = CurrencyFactory.create()
+        TransactionFactory.create_batch(4, currency=currency)
+        client = api_client()
+
+        first = json.loads(client.get(f'{self.endpoint}?page_size=2').content)
+        TransactionFactory.create_batch(3, currency=currency)
+        second = json.loads(client.get(first['next']).content)
+
+        seen = [row['id'] for row in first['results'] + second['results']]
+        assert len(set(seen)) == 4
+
+    def test_invalid_cursor(self, api_client):
+        response = api_client().get(f'{self.endpoint}?cursor=not-a-cursor')
+
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize('position', [
+        ['notadate', 1],
+        [None, None],
+        ['2020-01-01T00:00:00', 'x'],
+        [{}, 1],
+    ])
+    def test_tampered_cursor(self, api_client, position):
+        TransactionFactory.create()
+        payload = {'p': position, 'r': False, 'o': ['-creation_date', '-id']}
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        response = api_client().get(self.endpoint, {'cursor': cursor})
+
+        assert response.status_code == 404
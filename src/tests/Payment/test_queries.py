@@ -0,0 +1,58 @@
+import pytest
+
+from tests.Payment.factory import CurrencyFactory, TransactionFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTransactionQueries:
+
+    endpoint = '/api/transaction/'
+
+    @pytest.mark.parametrize('rows', [1, 20])
+    def test_list(self, assert_max_queries, rows):
+        currencies = CurrencyFactory.create_batch(2)
+        for i in range(rows):
+            TransactionFactory.create(currency=currencies[i % 2])
+
+        response = assert_max_queries(self.endpoint, 1)
+
+        assert response.status_code == 200
+
+    def test_retrieve(self, assert_max_queries):
+        transaction = TransactionFactory.create()
+
+        response = assert_max_queries(f'{self.endpoint}{transaction.id}/', 1)
+
+        assert response.status_code == 200
+
+    def test_update(self, assert_max_queries):
+        transaction = TransactionFactory.create()
+
+        response = assert_max_queries(
+            f'{self.endpoint}{transaction.id}/', 2,
+            method='patch', data={'name': 'new name'}, format='json'
+        )
+
+        assert response.status_code == 200
+
+    def test_create(self, assert_max_queries):
+        currency = CurrencyFactory.create()
+
+        # currency lookup, INSERT and the payment intent UPDATE
+        response = assert_max_queries(
+            self.endpoint, 3, method='post', format='json',
+            data={'currency': currency.code, 'name': 'name', 'email': 'user@email.com'}
+        )
+
+        assert response.status_code == 201
+
+
+class TestCurrencyQueries:
+
+    def test_list(self, assert_max_queries):
+        CurrencyFactory.create_batch(3)
+
+        response = assert_max_queries('/api/currency/', 1)
+
+        assert response.status_code == 200
@@ -0,0 +1,63 @@
+import datetime
+import uuid
+
+import pytest
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.Payment.models import Transaction
+from MyProject.pagination import _after
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != 'sqlite',
+                       reason='EXPLAIN QUERY PLAN output is SQLite specific'),
+]
+
+NOW = timezone.now()
+PAGE_ORDERING = ['-creation_date', '-id']
+
+
+def full_scans(queryset):
+    ''' lines of the plan that read the whole transaction table '''
+    plan = queryset.explain()
+    return [
+        line for line in plan.splitlines()
+        if 'SCAN Payment_transaction' in line and 'USING' not in line
+    ]
+
+
+# queryset -> plan fragments, one of which must show up in the plan
+@pytest.mark.parametrize('queryset, indexes', [
+    (lambda: Transaction.objects.filter(email='user@email.com'),
+     ('transaction_email_idx',)),
+    (lambda: Transaction.objects.filter(payment_intent_id='tnMMv6'),
+     ('transaction_intent_idx',)),
+    (lambda: Transaction.objects.filter(uid=uuid.uuid4()),
+     ('(uid=?)',)),
+    (lambda: Transaction.objects.filter(
+        creation_date__gte=NOW - datetime.timedelta(days=1), creation_date__lt=NOW),
+     ('transaction_created_id_idx',)),
+    (lambda: Transaction.objects.order_by(*PAGE_ORDERING)
+     .filter(_after(PAGE_ORDERING, [NOW.isoformat(), 10]))[:100],
+     ('transaction_created_id_idx',)),
+    (lambda: Transaction.objects.filter(payment_intent_id=None).order_by('id')[:100],
+     # without ANALYZE stats SQLite may prefer the payment_intent_id index
+     ('transaction_unfilled_idx', 'transaction_intent_idx')),
+    (lambda: Transaction.objects.filter(
+        Q(payment_intent_id__in=['a', 'b']) | Q(uid__in=[uuid.uuid4()])),
+     ('MULTI-INDEX OR',)),
+], ids=['email', 'payment_intent_id', 'uid', 'creation_date', 'page', 'unfilled',
+        'bulk_lookup'])
+def test_lookup_uses_index(queryset, indexes):
+    queryset = queryset()
+    plan = queryset.explain()
+
+    assert not full_scans(queryset), plan
+    assert any(index in plan for index in indexes), plan
+
+
+def test_full_scan_is_detected():
+    assert full_scans(Transaction.objects.filter(name='name'))
+
@@ -1,8 +1,11 @@
 import factory
 import pytest
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
 
-from rest_framework.relations import SlugRelatedField
-from apps.Payment.serializers import CurrencySerializer, UnfilledTransactionSerializer, FilledTransactionSerializer
+from apps.Payment.cache import currency_cache
+from apps.Payment.models import Transaction
+from apps.Payment.serializers import CurrencySerializer, UnfilledTransactionSerializer, FilledTransactionSerializer, TransactionRowSerializer
 from tests.Payment.factory import CurrencyFactory, TransactionFactory, FilledTransactionFactory, CurrencylessTransactionFactory
 
 
@@ -55,8 +58,7 @@ class TestUnfilledTransactionSerializer:
 
         # we do this to avoid searching DB for currency instance 
         # with respective currency code
-        retrieve_currency = mocker.Mock(return_value=currency)
-        SlugRelatedField.to_internal_value = retrieve_currency
+        mocker.patch.object(currency_cache, 'get', return_value=currency)
 
         serializer = UnfilledTransactionSerializer(data=valid_serialized_data)
         
@@ -105,3 +107,47 @@ class TestFilledTransactionSerializer:
 
         assert serializer.is_valid(raise_exception=True)
         assert serializer.errors == {}
+
+
+class TestTransactionRowSerializer:
+
+    @pytest.mark.django_db
+    def test_same_json_as_the_model_serializer(self):
+        TransactionFactory.create_batch(3)
+        FilledTransactionFactory.create(message='h\u00e9llo "\u2603"\n', payment_intent_id=None)
+        queryset = Transaction.objects.order_by('id')
+
+        expected = FilledTransactionSerializer(
+            queryset.select_related('currency'), many=True).data
+        rows = TransactionRowSerializer(
+            queryset.values(*TransactionRowSerializer.columns), many=True).data
+
+        assert len(rows) == 4
+        assert JSONRenderer().render(rows) == JSONRenderer().render(expected)
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize('rest_framework', [{}, {'DATETIME_FORMAT': '%d/%m/%Y %H:%M'}])
+    def test_dates_follow_the_timezone_and_format(self, settings, rest_framework):
+        settings.REST_FRAMEWORK = rest_framework
+        TransactionFactory.create()
+        queryset = Transaction.objects.all()
+
+        with timezone.override('Asia/Kolkata'):
+            expected = FilledTransactionSerializer(queryset, many=True).data
+            rows = TransactionRowSerializer(
+                queryset.values(*TransactionRowSerializer.columns), many=True).data
+
+        assert rows[0]['creation_date'] == expected[0]['creation_date']
+        assert not rows[0]['creation_date'].endswith('Z')
+
+    @pytest.mark.django_db
+    def test_list_and_retrieve_render_the_model_serializer_json(self, client):
+        transaction = FilledTransactionFactory.create()
+        expected = FilledTransactionSerializer(
+            Transaction.objects.get(pk=transaction.pk)).data
+
+        detail = client.get(f'/api/transaction/{transaction.id}/')
+        page = client.get('/api/transaction/')
+
+        assert detail.content == JSONRenderer().render(expected)
+        assert page.json()['results'] == [expected]
@@ -18,3 +18,16 @@ class TestTransactionFiller:
 
         post_save.send(Transaction, instance=instance, created=True)
         mock.assert_called_with(instance)
+
+    @pytest.mark.django_db
+    def test_post_save_deferred(self, mocker, settings, django_capture_on_commit_callbacks):
+        settings.PAYMENT_FILL_DEFERRED = True
+        instance = TransactionFactory.build()
+        fill_mock = mocker.patch('apps.Payment.signals.fill_transaction')
+        defer_mock = mocker.patch('apps.Payment.signals.defer_fill')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            post_save.send(Transaction, instance=instance, created=True)
+
+        defer_mock.assert_called_with(instance)
+        fill_mock.assert_not_called()
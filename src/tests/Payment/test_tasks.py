@@ -0,0 +1,148 @@
+import threading
+
+import pytest
+
+from apps.Payment.models import Transaction
+from apps.Payment import tasks
+from apps.Payment.tasks import FillQueue, defer_fill, get_fill_queue
+from apps.Payment.utils import fill_transactions
+from tests.Payment.factory import CurrencyFactory, TransactionFactory
+
+
+class TestFillQueue:
+
+    def test_fills_in_batches(self):
+        batches = []
+        # no worker yet, so every id stays queued
+        fill_queue = FillQueue(fill=batches.append, workers=0, batch_size=10)
+        for i in range(25):
+            assert fill_queue.put(i)
+        assert fill_queue.depth == 25
+
+        fill_queue.workers = 1
+        fill_queue.start()
+        fill_queue.join()
+
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+        assert fill_queue.stats()['filled'] == 25
+        assert fill_queue.depth == 0
+
+    def test_retry(self, mocker):
+        fill = mocker.Mock(side_effect=[Exception('provider down'), None])
+        fill_queue = FillQueue(fill=fill, workers=1, retry_delay=0)
+
+        fill_queue.put(1)
+        fill_queue.join()
+
+        assert fill.call_count == 2
+        assert fill_queue.retried == 1
+        assert fill_queue.filled == 1
+        assert fill_queue.failed == 0
+
+    def test_give_up_after_max_retries(self, mocker):
+        fill = mocker.Mock(side_effect=Exception('provider down'))
+        fill_queue = FillQueue(fill=fill, workers=1, max_retries=2, retry_delay=0)
+
+        fill_queue.put(1)
+        fill_queue.join()
+
+        assert fill.call_count == 3
+        assert fill_queue.failed == 1
+
+    def test_backpressure(self):
+        release = threading.Event()
+        fill_queue = FillQueue(
+            fill=lambda ids: release.wait(5),
+            workers=1,
+            batch_size=1,
+            max_size=1,
+            put_timeout=0.01,
+        )
+
+        accepted = [fill_queue.put(i) for i in range(5)]
+        release.set()
+        fill_queue.join()
+
+        assert False in accepted
+        assert fill_queue.rejected == accepted.count(False)
+        assert fill_queue.enqueued == accepted.count(True)
+
+    def test_sweep_requeues_unfilled(self, mocker):
+        # put() starts the sweeper thread, its first sweep would race this one
+        mocker.patch.object(FillQueue, '_sweep_forever')
+        fill_queue = FillQueue(
+            fill=lambda ids: None,
+            workers=0,
+            max_size=10,
+            sweep=lambda limit: [1, 2, 3][:limit],
+        )
+        fill_queue.put(1)
+
+        # id 1 is already queued and is not queued twice
+        assert fill_queue.sweep_once() == 3
+        assert fill_queue.depth == 3
+        assert fill_queue.stats()['swept'] == 3
+
+
+class TestDeferFill:
+
+    def test_queue(self, mocker):
+        fill_queue = mocker.patch('apps.Payment.tasks.get_fill_queue').return_value
+        fill_queue.put.return_value = True
+        fill_mock = mocker.patch('apps.Payment.tasks.fill_transaction')
+        transaction = TransactionFactory.build()
+
+        defer_fill(transaction)
+
+        fill_queue.put.assert_called_with(transaction.id)
+        fill_mock.assert_not_called()
+
+    def test_fill_inline_when_queue_full(self, mocker):
+        fill_queue = mocker.patch('apps.Payment.tasks.get_fill_queue').return_value
+        fill_queue.put.return_value = False
+        fill_mock = mocker.patch('apps.Payment.tasks.fill_transaction')
+        transaction = TransactionFactory.build()
+
+        defer_fill(transaction)
+
+        fill_mock.assert_called_with(transaction)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestDeferredCreate:
+
+    def test_create_is_filled_by_worker(self, api_client, settings, mocker):
+        settings.PAYMENT_FILL_DEFERRED = True
+        # a fresh queue built from settings, without the periodic sweep
+        mocker.patch.object(tasks, '_fill_queue', None)
+        mocker.patch.object(tasks, 'unfilled_transaction_ids', return_value=[])
+        sync_fill = mocker.patch('apps.Payment.signals.fill_transaction')
+        currency = CurrencyFactory.create()
+
+        response = api_client().post(
+            '/api/transaction/',
+            {'currency': currency.code, 'name': 'name', 'email': 'user@email.com'},
+            format='json'
+        )
+        get_fill_queue().join()
+
+        assert response.status_code == 201
+        sync_fill.assert_not_called()
+        assert get_fill_queue().stats()['filled'] == 1
+        assert Transaction.objects.get().payment_intent_id is not None
+
+
+@pytest.mark.django_db
+class TestFillTransactions:
+
+    def test_fill_transactions(self, mocker):
+        mocker.patch('apps.Payment.signals.fill_transaction')
+        transactions = TransactionFactory.create_batch(3)
+        filled = Transaction.objects.filter(id=transactions[0].id)
+        filled.update(payment_intent_id='keep')
+
+        count = fill_transactions(Transaction, [t.id for t in transactions])
+
+        assert count == 2
+        assert Transaction.objects.get(id=transactions[0].id).payment_intent_id == 'keep'
+        assert not Transaction.objects.filter(payment_intent_id=None).exists()
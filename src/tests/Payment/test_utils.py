@@ -1,5 +1,5 @@
 from .factory import TransactionFactory
-from apps.Payment.utils import Stripe
+from apps.Payment.utils import PaymentIntentPool, Stripe
 from apps.Payment.models import Transaction
 from apps.Payment.utils import fill_transaction
 
@@ -12,12 +12,10 @@ class TestUtilFunctions:
         strip_intent_id = get_payment_id
 
         # mocking API call
-        payment_intent_mock = mocker.Mock(return_value=strip_intent_id)
-        Stripe.create = payment_intent_mock
+        mocker.patch.object(Stripe, 'create', return_value=strip_intent_id)
 
-        # mocking DB calls
-        filter_call_mock = mocker.Mock()
-        Transaction.objects.filter = filter_call_mock
+        # mocking DB calls, patch.object undoes them after the test
+        filter_call_mock = mocker.patch.object(Transaction.objects, 'filter')
         update_call_mock = mocker.Mock()
         filter_call_mock.return_value.update = update_call_mock
 
@@ -28,3 +26,70 @@ class TestUtilFunctions:
         update_call_mock.assert_called_with(
             payment_intent_id=strip_intent_id
         )
+
+
+class TestStripeCreateMany:
+
+    def test_create_many(self):
+        ids = Stripe.create_many(50, 6)
+
+        assert len(ids) == 50
+        assert all(len(i) == 6 and i.isalnum() for i in ids)
+
+    def test_create_many_empty(self):
+        assert Stripe.create_many(0, 6) == []
+
+
+class TestPaymentIntentPool:
+
+    def test_get_many_from_memory(self, mocker):
+        pool = PaymentIntentPool(size=10, low_water=2)
+        pool.refill()
+        create_many = mocker.spy(Stripe, 'create_many')
+
+        ids = pool.get_many(5)
+
+        assert len(ids) == 5
+        assert len(pool) == 5
+        # still above the low-water mark, nothing was requested
+        create_many.assert_not_called()
+
+    def test_refill_at_low_water(self):
+        pool = PaymentIntentPool(size=10, low_water=5)
+        pool.refill()
+
+        pool.get_many(6)
+        pool._refill_thread.join(timeout=5)
+
+        assert len(pool) == 10
+
+    def test_get_many_when_dry(self, mocker):
+        pool = PaymentIntentPool(size=10, low_water=2)
+        mocker.patch.object(pool, 'refill_in_background')
+
+        ids = pool.get_many(3)
+
+        assert len(ids) == 3
+        assert len(set(ids)) == 3
+
+    def test_fill_transaction_uses_pool(self, mocker, settings):
+        settings.PAYMENT_INTENT_POOL_ENABLED = True
+        pool = PaymentIntentPool(size=1, low_water=0)
+        pool._ids.append('pooled')
+        mocker.patch('apps.Payment.utils.get_intent_pool', return_value=pool)
+        filter_mock = mocker.patch.object(Transaction.objects, 'filter')
+
+        fill_transaction(TransactionFactory.build())
+
+        filter_mock.return_value.update.assert_called_with(
+            payment_intent_id='pooled'
+        )
+
+    def test_concurrent_refill_does_not_overfill(self):
+        pool = PaymentIntentPool(size=10, low_water=5)
+
+        pool.refill_in_background()
+        pool.refill()
+        pool._refill_thread.join(timeout=5)
+
+        assert len(pool) == 10
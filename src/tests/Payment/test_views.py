@@ -1,6 +1,7 @@
 import json
 
 import pytest
+from apps.Payment.cache import currency_cache
 from apps.Payment.models import Currency, Transaction
 from apps.Payment.views import CurrencyViewSet, TransactionViewset
 from django.urls import reverse
@@ -261,7 +262,7 @@ class TestTransactionViewSet:
         response = view(request).render()
 
         assert response.status_code == 200
-        assert len(json.loads(response.content)) == 3
+        assert len(json.loads(response.content)['results']) == 3
 
     def test_create(self, mocker, rf):
         # we create the Transaction instance without assigning Currency to it
@@ -293,8 +294,7 @@ class TestTransactionViewSet:
 
         # this return the currency instance when serializer tries to get the 
         # saved instance of Currency withing DB using the Currency Code
-        retrieve_currency = mocker.Mock(return_value=currency)
-        SlugRelatedField.to_internal_value = retrieve_currency
+        mocker.patch.object(currency_cache, 'get', return_value=currency)
 
         # prevent execution of save method in Transaction Model
         mocker.patch.object(
@@ -330,13 +330,18 @@ class TestTransactionViewSet:
         # <WSGIRequest: GET '/api/transaction/None/'>
         request = rf.get(url)
 
-        TransactionViewset.get_queryset = mocker.Mock(
+        mocker.patch.object(
+            TransactionViewset,
+            'get_queryset',
             return_value=MockSet(transaction)
         )
 
         # let related field of transaction retrieve the currency instance we created
-        retrieve_currency = mocker.Mock(return_value=transaction.currency)
-        StringRelatedField.to_internal_value = retrieve_currency
+        mocker.patch.object(
+            StringRelatedField,
+            'to_internal_value',
+            return_value=transaction.currency
+        )
 
         view = TransactionViewset.as_view(
             {'get': 'retrieve'}
@@ -365,8 +370,11 @@ class TestTransactionViewSet:
 
         # /api/transaction/None/
         url = reverse('transaction-detail', kwargs={'pk': old_transaction.id})
-        retrieve_currency = mocker.Mock(return_value=old_transaction.currency)
-        SlugRelatedField.to_internal_value = retrieve_currency
+        mocker.patch.object(
+            SlugRelatedField,
+            'to_internal_value',
+            return_value=old_transaction.currency
+        )
 
         # get old instance on lookup
         mocker.patch.object(
@@ -376,7 +384,7 @@ class TestTransactionViewSet:
         )
 
         # to prevent saving of updated instance, hence no DB call
-        Transaction.save = mocker.Mock()
+        mocker.patch.object(Transaction, 'save')
 
         request = rf.put(
             url,
@@ -411,7 +419,9 @@ class TestTransactionViewSet:
             kwargs={'pk': old_transaction.id}
         )
 
-        SlugRelatedField.to_internal_value = mocker.Mock(
+        mocker.patch.object(
+            SlugRelatedField,
+            'to_internal_value',
             return_value=old_transaction.currency
         )
         mocker.patch.object(
@@ -419,7 +429,7 @@ class TestTransactionViewSet:
             'get_object',
             return_value=old_transaction
         )
-        Transaction.save = mocker.Mock()
+        mocker.patch.object(Transaction, 'save')
 
         request = rf.patch(
             url,
@@ -1,73 +1,65 @@
+import os
+
 import pytest
-from selenium import webdriver
+
+from .pool import BrowserPool
+from .screenshot import ScreenshotWriter
+
+
+@pytest.fixture(scope="session")
+def browser_pool():
+    # browsers started here are shared by every class of the session and
+    # only quit at the end, SELENIUM_POOL_SIZE headless ones per browser
+    pool = BrowserPool(max_per_browser=int(os.environ.get("SELENIUM_POOL_SIZE", 2)))
+    yield pool
+    pool.close()
 
 
 @pytest.fixture(scope="class")
-def chrome_driver_init(request):
-
-    options = webdriver.ChromeOptions()
-    options.headless = True
-    chrome_driver = webdriver.Chrome(
-        executable_path="./chromedriver",
-        options=options
-    )
-    request.cls.driver = chrome_driver
-    yield
-    chrome_driver.close()
+def chrome_driver_init(request, browser_pool):
+    with browser_pool.session("chrome") as chrome_driver:
+        request.cls.driver = chrome_driver
+        yield
 
 
 # a more generic fixture can be used for both chrome as well firefox
 @pytest.fixture(params=["chrome", "firefox"], scope="class")
-def driver_init(request):
-    if request.param == "chrome":
-        options = webdriver.ChromeOptions()
-        options.headless = True
-        web_driver = webdriver.Chrome(
-            executable_path="./chromedriver",
-            options=options
-        )
-    if request.param == "firefox":
-        options = webdriver.FirefoxOptions()
-        options.headless = True
-        web_driver = webdriver.Firefox(
-            executable_path="./geckodriver",
-            options=options
-        )
-    request.cls.driver = web_driver
-    yield 
-    web_driver.close()
-
-
-# fixture to run for each type of ss
-@pytest.fixture(params=["chrome1980", "chrome411", "firefox"], scope="class")
-def driver_init_screenshot(request):
-    if request.param == "chrome1980":
-        options = webdriver.ChromeOptions()
-        options.headless = True
-        options.add_argument("--window-size=1920,1080")
-        web_driver = webdriver.Chrome(
-            executable_path="./chromedriver",
-            options=options
-        )
-        request.cls.browser = "Chrome1920x1080"
-    if request.param == "chrome411":
-        options = webdriver.ChromeOptions()
-        options.headless = True
-        options.add_argument("--window-size=411,823")
-        web_driver = webdriver.Chrome(
-            executable_path="./chromedriver",
-            options=options
-        )
-        request.cls.browser = "Chrome411x823"
-    if request.param == "firefox":
-        options = webdriver.FirefoxOptions()
-        options.headless = True
-        web_driver = webdriver.Firefox(
-            executable_path="./geckodriver",
-            options=options
-        )
-        request.cls.browser = "Firefox"
-
-    request.cls.driver = web_driver
-    yield 
-    web_driver.close()
+def driver_init(request, browser_pool):
+    with browser_pool.session(request.param) as web_driver:
+        request.cls.driver = web_driver
+        yield
+
+
+# fixture to run for each type of ss, viewports of one browser reuse
+# the same pooled driver and only resize its window
+SCREENSHOT_BROWSERS = {
+    "chrome1980": ("chrome", (1920, 1080), "Chrome1920x1080"),
+    "chrome411": ("chrome", (411, 823), "Chrome411x823"),
+    "firefox": ("firefox", None, "Firefox"),
+}
+
+
+@pytest.fixture(params=list(SCREENSHOT_BROWSERS), scope="class")
+def driver_init_screenshot(request, browser_pool):
+    browser, size, name = SCREENSHOT_BROWSERS[request.param]
+    with browser_pool.session(browser, size) as web_driver:
+        request.cls.browser = name
+        request.cls.driver = web_driver
+        yield
+
+
+@pytest.fixture(scope="session")
+def screenshots():
+    # pending writes are flushed and the manifest saved at the end of the session
+    writer = ScreenshotWriter("screenshot")
+    yield writer
+    writer.close()
+
+
+@pytest.fixture(autouse=True)
+def clean_browser(request):
+    # cookies and storage must not leak from one test to the next
+    yield
+    driver = getattr(request.cls, "driver", None)
+    if driver is not None:
+        BrowserPool.reset(driver)
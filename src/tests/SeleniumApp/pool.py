@@ -0,0 +1,129 @@
+'''
+    Session wide pool of headless browsers for the Selenium fixtures.
+
+    Starting Chrome or Firefox takes seconds, so drivers are started once and
+    handed from class to class. Viewport variants resize the window of a
+    pooled driver instead of launching another one, and cookies plus web
+    storage are cleared between tests.
+'''
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from selenium import webdriver
+
+# local driver binaries (relative to manage.py), PATH / Selenium Manager otherwise
+DRIVER_PATHS = {
+    'chrome': './chromedriver',
+    'firefox': './geckodriver',
+}
+
+DEFAULT_WINDOW_SIZE = (1280, 800)
+
+
+def make_driver(browser):
+    ''' start a headless driver, preferring a locally installed binary '''
+    if browser == 'chrome':
+        options = webdriver.ChromeOptions()
+        options.add_argument('--headless=new')
+        driver_class, service_class = webdriver.Chrome, webdriver.ChromeService
+    elif browser == 'firefox':
+        options = webdriver.FirefoxOptions()
+        options.add_argument('-headless')
+        driver_class, service_class = webdriver.Firefox, webdriver.FirefoxService
+    else:
+        raise ValueError(f'unknown browser {browser!r}')
+
+    path = DRIVER_PATHS[browser]
+    service = service_class(executable_path=path) if os.path.exists(path) else service_class()
+    return driver_class(service=service, options=options)
+
+
+class BrowserPool:
+
+    def __init__(self, factory=make_driver, max_per_browser=2):
+        self.factory = factory
+        self.max_per_browser = max_per_browser
+        self._idle = defaultdict(list)
+        self._started = defaultdict(list)
+        self._sizes = {}
+        self._condition = threading.Condition()
+
+    def warm(self, browser, count=None):
+        ''' start drivers concurrently ahead of the tests that need them '''
+        count = min(count or self.max_per_browser, self.max_per_browser)
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            drivers = list(executor.map(lambda _: self.acquire(browser, None), range(count)))
+        for driver in drivers:
+            self._put_back(driver, browser)
+
+    def acquire(self, browser, size=DEFAULT_WINDOW_SIZE):
+        '''
+            Take an idle driver of 'browser', starting one while under
+            max_per_browser and waiting for a release otherwise.
+        '''
+        with self._condition:
+            while not self._idle[browser] and len(self._started[browser]) >= self.max_per_browser:
+                self._condition.wait()
+            driver = self._idle[browser].pop() if self._idle[browser] else None
+            if driver is None:
+                self._started[browser].append(None)
+
+        if driver is None:
+            try:
+                driver = self.factory(browser)
+            except BaseException:
+                with self._condition:
+                    self._started[browser].remove(None)
+                    self._condition.notify_all()
+                raise
+            with self._condition:
+                started = self._started[browser]
+                started[started.index(None)] = driver
+
+        self.resize(driver, size)
+        return driver
+
+    def release(self, driver, browser):
+        self.reset(driver)
+        self._put_back(driver, browser)
+
+    def _put_back(self, driver, browser):
+        with self._condition:
+            self._idle[browser].append(driver)
+            self._condition.notify()
+
+    @contextmanager
+    def session(self, browser, size=DEFAULT_WINDOW_SIZE):
+        driver = self.acquire(browser, size)
+        try:
+            yield driver
+        finally:
+            self.release(driver, browser)
+
+    def resize(self, driver, size):
+        ''' set the viewport, skipping the round trip when it already matches '''
+        if size is not None and self._sizes.get(id(driver)) != size:
+            driver.set_window_size(*size)
+            self._sizes[id(driver)] = size
+
+    @staticmethod
+    def reset(driver):
+        ''' forget everything a test left behind in the browser '''
+        driver.delete_all_cookies()
+        # storage belongs to the current origin, pages like about:blank have none
+        driver.execute_script(
+            'try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}'
+        )
+        driver.get('about:blank')
+
+    def close(self):
+        with self._condition:
+            drivers = [d for started in self._started.values() for d in started if d]
+            self._idle.clear()
+            self._started.clear()
+            self._sizes.clear()
+        for driver in drivers:
+            driver.quit()
@@ -0,0 +1,109 @@
+'''
+    Screenshot capture for the Selenium tests.
+
+    Only grabbing the image talks to the browser, so that stays on the test's
+    thread. Decoding, hashing and writing run on a thread pool, and images
+    whose content did not change since the last run are not written again.
+    'manifest.json' lists the hash of every image and which ones changed, so
+    a visual diff only needs to look at those.
+'''
+import base64
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+MANIFEST = 'manifest.json'
+
+
+class ScreenshotWriter:
+
+    def __init__(self, root='screenshot', workers=4):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix='screenshot')
+        self._lock = threading.Lock()
+        self._futures = []
+        self._dirs = set()
+        # hash -> path written in this run, identical images are linked to it
+        self._written = {}
+        self._previous = self._load_manifest()
+        self.images = {}
+
+    def capture(self, driver, name):
+        ''' grab the screenshot now, store it as root/name in the background '''
+        encoded = driver.get_screenshot_as_base64()
+        future = self._executor.submit(self._store, name, encoded)
+        with self._lock:
+            self._futures.append(future)
+        return future
+
+    def close(self):
+        ''' wait for every pending write and save the manifest '''
+        with self._lock:
+            futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+        self._executor.shutdown()
+        self._save_manifest()
+
+    def changed(self):
+        return sorted(name for name, image in self.images.items()
+                      if image['status'] != 'unchanged')
+
+    def _store(self, name, encoded):
+        data = base64.b64decode(encoded)
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.root, name)
+
+        previous = self._previous.get(name)
+        if previous and previous['sha256'] == digest and os.path.exists(path):
+            status = 'unchanged'
+        else:
+            status = 'changed' if previous else 'new'
+            self._write(path, data, digest)
+
+        with self._lock:
+            self._written.setdefault(digest, path)
+            self.images[name] = {'sha256': digest, 'bytes': len(data), 'status': status}
+        return status
+
+    def _write(self, path, data, digest):
+        directory = os.path.dirname(path)
+        if directory not in self._dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._dirs.add(directory)
+
+        tmp = f'{path}.tmp'
+        with self._lock:
+            same = self._written.get(digest)
+        if same:
+            # same pixels as another image of this run, share its inode
+            try:
+                os.link(same, tmp)
+            except OSError:
+                same = None
+        if not same:
+            with open(tmp, 'wb') as f:
+                f.write(data)
+        os.replace(tmp, path)
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST)) as f:
+                return json.load(f)['images']
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def _save_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        # images not captured this run are kept for the next comparison
+        images = {name: {**image, 'status': 'unchanged'}
+                  for name, image in self._previous.items()}
+        images.update(self.images)
+        path = os.path.join(self.root, MANIFEST)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump({'changed': self.changed(), 'images': images}, f,
+                      indent=2, sort_keys=True)
+        os.replace(f'{path}.tmp', path)
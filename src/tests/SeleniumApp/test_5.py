@@ -1,27 +1,18 @@
-import os
 import pytest
 
 
-def take_screenshot(driver, name):
-    # first make the required dir
-    os.makedirs(
-        os.path.join("screenshot",  # path where to make directory
-        os.path.dirname(name)       # name of new dir
-        ),
-        exist_ok=True				# no error if already exists
-    )
-    # now save the image to given dir with given name
-    driver.save_screenshot(
-        # fullname of path where to save ss
-        os.path.join("screenshot", name)
-    )
+def take_screenshot(screenshots, driver, name):
+    # only the capture happens here, decoding and saving the image to
+    # screenshot/<name> run in the background and are skipped when the
+    # image did not change since the last run (see screenshot/manifest.json)
+    return screenshots.capture(driver, name)
 
 
 @pytest.mark.skip
 @pytest.mark.usefixtures("driver_init_screenshot")
 class TestScreenshot:
-    def test_screenshot_admin(self, live_server):
+    def test_screenshot_admin(self, live_server, screenshots):
         self.driver.get(f"{live_server.url}/admin/")
-        take_screenshot(self.driver, "admin/" +
+        take_screenshot(screenshots, self.driver, "admin/" +
                         "admin_" + self.browser + ".png")
         assert "Log in | Django site admin" in self.driver.title
@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from .pool import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self, browser):
+        self.browser = browser
+        self.calls = []
+
+    def set_window_size(self, width, height):
+        self.calls.append(('size', width, height))
+
+    def delete_all_cookies(self):
+        self.calls.append('cookies')
+
+    def execute_script(self, script):
+        self.calls.append('storage')
+
+    def get(self, url):
+        self.calls.append(url)
+
+    def quit(self):
+        self.calls.append('quit')
+
+
+@pytest.fixture
+def started():
+    return []
+
+
+@pytest.fixture
+def pool(started):
+    def factory(browser):
+        driver = FakeDriver(browser)
+        started.append(driver)
+        return driver
+
+    return BrowserPool(factory=factory, max_per_browser=2)
+
+
+class TestBrowserPool:
+
+    def test_driver_is_reused(self, pool, started):
+        with pool.session('chrome') as first:
+            pass
+        with pool.session('chrome') as second:
+            pass
+
+        assert first is second
+        assert len(started) == 1
+
+    def test_viewports_resize_the_same_driver(self, pool, started):
+        with pool.session('chrome', (1920, 1080)):
+            pass
+        with pool.session('chrome', (411, 823)) as driver:
+            pass
+        with pool.session('chrome', (411, 823)):
+            pass
+
+        assert len(started) == 1
+        sizes = [call for call in driver.calls if call[0] == 'size']
+        assert sizes == [('size', 1920, 1080), ('size', 411, 823)]
+
+    def test_reset_on_release(self, pool):
+        with pool.session('firefox') as driver:
+            driver.calls.clear()
+
+        assert driver.calls == ['cookies', 'storage', 'about:blank']
+
+    def test_browsers_get_their_own_drivers(self, pool, started):
+        with pool.session('chrome') as chrome, pool.session('firefox') as firefox:
+            assert chrome is not firefox
+        assert [driver.browser for driver in started] == ['chrome', 'firefox']
+
+    def test_concurrent_sessions_wait_for_a_free_driver(self, pool, started):
+        first = pool.acquire('chrome')
+        second = pool.acquire('chrome')
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire('chrome')))
+        waiter.start()
+        waiter.join(0.1)
+        assert not acquired
+
+        pool.release(first, 'chrome')
+        waiter.join(1)
+
+        assert acquired == [first]
+        assert len(started) == 2
+        pool.release(second, 'chrome')
+
+    def test_warm_and_close(self, pool, started):
+        pool.warm('chrome')
+        with pool.session('chrome'):
+            pass
+        pool.close()
+
+        assert len(started) == 2
+        assert all(driver.calls[-1] == 'quit' for driver in started)
+
+    def test_failed_start_frees_the_slot(self, started):
+        def factory(browser):
+            if not started:
+                started.append(None)
+                raise RuntimeError('no driver')
+            return FakeDriver(browser)
+
+        pool = BrowserPool(factory=factory, max_per_browser=1)
+        with pytest.raises(RuntimeError):
+            pool.acquire('chrome')
+
+        assert isinstance(pool.acquire('chrome'), FakeDriver)
@@ -0,0 +1,63 @@
+import base64
+import json
+import os
+
+from .screenshot import MANIFEST, ScreenshotWriter
+
+
+class FakeDriver:
+    def __init__(self, image):
+        self.image = image
+
+    def get_screenshot_as_base64(self):
+        return base64.b64encode(self.image).decode()
+
+
+def capture(root, shots):
+    writer = ScreenshotWriter(str(root))
+    for name, image in shots.items():
+        writer.capture(FakeDriver(image), name)
+    writer.close()
+    return writer
+
+
+class TestScreenshotWriter:
+
+    def test_writes_images_and_manifest(self, tmp_path):
+        capture(tmp_path, {'admin/chrome.png': b'png-1', 'admin/firefox.png': b'png-2'})
+
+        assert (tmp_path / 'admin' / 'chrome.png').read_bytes() == b'png-1'
+        manifest = json.loads((tmp_path / MANIFEST).read_text())
+        assert manifest['changed'] == ['admin/chrome.png', 'admin/firefox.png']
+        assert manifest['images']['admin/firefox.png']['status'] == 'new'
+
+    def test_unchanged_images_are_not_rewritten(self, tmp_path):
+        capture(tmp_path, {'a.png': b'same', 'b.png': b'old'})
+        os.utime(tmp_path / 'a.png', (0, 0))
+
+        writer = capture(tmp_path, {'a.png': b'same', 'b.png': b'new'})
+
+        assert os.stat(tmp_path / 'a.png').st_mtime == 0
+        assert (tmp_path / 'b.png').read_bytes() == b'new'
+        assert writer.changed() == ['b.png']
+        manifest = json.loads((tmp_path / MANIFEST).read_text())
+        assert manifest['changed'] == ['b.png']
+        assert manifest['images']['a.png']['status'] == 'unchanged'
+
+    def test_deleted_image_is_written_again(self, tmp_path):
+        capture(tmp_path, {'a.png': b'same'})
+        os.remove(tmp_path / 'a.png')
+
+        writer = capture(tmp_path, {'a.png': b'same'})
+
+        assert (tmp_path / 'a.png').read_bytes() == b'same'
+        assert writer.images['a.png']['status'] == 'changed'
+
+    def test_identical_images_share_storage(self, tmp_path):
+        writer = ScreenshotWriter(str(tmp_path))
+        writer.capture(FakeDriver(b'pixels'), 'a.png').result()
+        writer.capture(FakeDriver(b'pixels'), 'b.png').result()
+        writer.close()
+
+        assert (tmp_path / 'b.png').read_bytes() == b'pixels'
+        assert os.stat(tmp_path / 'a.png').st_ino == os.stat(tmp_path / 'b.png').st_ino
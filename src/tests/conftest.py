@@ -1,9 +1,105 @@
 # fixtures or factory declared here will be accessible to all the tests of all apps
 
+import os
+
 import pytest
 from rest_framework.test import APIClient
 
+from tests.db_snapshot import DatabaseSnapshot, schema_hash
+from tests.parallel import ParallelPlugin, seed_factories, session_seed, worker_index
+
+
+def pytest_configure(config):
+    # one seed per session, offset per xdist worker so workers never generate
+    # the same data
+    config.faker_seed = session_seed(config)
+    seed_factories(config.faker_seed + worker_index(config))
+
+    if config.pluginmanager.hasplugin('xdist'):
+        config.pluginmanager.register(ParallelPlugin(config), 'learn-pytest-parallel')
+
+
+def pytest_report_header(config):
+    return f'faker seed: {config.faker_seed} (replay with PYTEST_FAKER_SEED)'
+
+
+@pytest.fixture(scope='session')
+def django_db_snapshot(request):
+    '''
+        Snapshot of the migrated test database, None when it does not apply:
+        PYTEST_DB_SNAPSHOT=0, a non SQLite database or --nomigrations.
+        --create-db migrates from scratch and refreshes the snapshot.
+    '''
+    from django.conf import settings
+
+    engine = settings.DATABASES['default']['ENGINE']
+    if (os.environ.get('PYTEST_DB_SNAPSHOT', '1') == '0'
+            or engine != 'django.db.backends.sqlite3'
+            or request.config.getvalue('nomigrations')):
+        return None
+
+    directory = os.environ.get(
+        'PYTEST_DB_SNAPSHOT_DIR',
+        request.config.rootpath / '.pytest_cache' / 'db-snapshots',
+    )
+    worker = getattr(request.config, 'workerinput', {}).get('workerid', 'main')
+    return DatabaseSnapshot(directory, schema_hash(), worker)
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix,
+                                 django_db_snapshot, request):
+    ''' point the test database at a file and copy the snapshot into it '''
+    if django_db_snapshot is None:
+        return
+    from django.conf import settings
+
+    test_settings = settings.DATABASES['default'].setdefault('TEST', {})
+    test_settings['NAME'] = str(django_db_snapshot.database)
+    django_db_snapshot.directory.mkdir(parents=True, exist_ok=True)
+    if not request.config.getvalue('create_db'):
+        django_db_snapshot.restore()
+
+
+@pytest.fixture(scope='session')
+def django_db_keepdb(request, django_db_snapshot, django_db_modify_db_settings):
+    ''' a restored snapshot is kept as is instead of being recreated '''
+    restored = django_db_snapshot is not None and django_db_snapshot.restored
+    return request.config.getvalue('reuse_db') or restored
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_snapshot, django_db_blocker):
+    if django_db_snapshot is None:
+        yield
+        return
+
+    if not django_db_snapshot.restored:
+        from django.db import connection
+        with django_db_blocker.unblock():
+            django_db_snapshot.save(connection)
+
+    yield
+
+    # kept databases are not destroyed by pytest-django
+    if django_db_snapshot.restored:
+        from django.db import connection
+        with django_db_blocker.unblock():
+            connection.close()
+        django_db_snapshot.cleanup()
+
 
 @pytest.fixture
 def api_client():
     return APIClient
+
+
+@pytest.fixture
+def assert_max_queries(api_client, django_assert_max_num_queries):
+    ''' call an endpoint and fail if it runs more than 'num' queries '''
+    def request(url, num, method='get', **kwargs):
+        with django_assert_max_num_queries(num):
+            response = getattr(api_client(), method)(url, **kwargs)
+        return response
+
+    return request
@@ -0,0 +1,115 @@
+'''
+    Migrated SQLite test database kept between pytest sessions.
+
+    The first session migrates as usual and saves the result as
+    'db-<hash>.sqlite3', the hash covering every migration file, the models
+    of apps without migrations and the Django version. Later sessions (and
+    every xdist worker) copy the snapshot in and let Django keep it, so the
+    only migrate work left is checking that nothing is unapplied.
+'''
+import hashlib
+import importlib
+import os
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import django
+from django.apps import apps
+from django.db.migrations.loader import MigrationLoader
+
+
+def _module_files(module_name):
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        return []
+    if hasattr(module, '__path__'):
+        return sorted(
+            path for directory in module.__path__
+            for path in Path(directory).glob('*.py')
+        )
+    return [Path(module.__file__)]
+
+
+def schema_hash():
+    ''' hash of everything that decides the schema of the test database '''
+    digest = hashlib.sha256(django.get_version().encode())
+    for app_config in apps.get_app_configs():
+        migrations_module, _ = MigrationLoader.migrations_module(app_config.label)
+        files = _module_files(migrations_module) if migrations_module else []
+        # run_syncdb creates the tables of apps without migrations from models
+        if not any(path.stem != '__init__' for path in files):
+            files = _module_files(f'{app_config.name}.models')
+
+        digest.update(app_config.label.encode())
+        for path in files:
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class DatabaseSnapshot:
+
+    def __init__(self, directory, key, worker='main'):
+        self.directory = Path(directory)
+        self.path = self.directory / f'db-{key}.sqlite3'
+        # one file per session and worker, so concurrent runs never share one
+        self.database = self.directory / f'test-{key}-{worker}-{os.getpid()}.sqlite3'
+        self.restored = False
+
+    def restore(self):
+        ''' copy the snapshot in as this session's test database, if there is one '''
+        if not self.path.exists():
+            return False
+        shutil.copyfile(self.path, self.database)
+        self.restored = True
+        return True
+
+    def save(self, connection):
+        '''
+            Write the migrated database through the SQLite backup API (consistent
+            even with the connection open) and move it in place atomically, so
+            concurrent workers never read a half written snapshot.
+
+            The backup never reads from 'connection' itself: a backup from a
+            connection holding a write transaction (a test's BEGIN IMMEDIATE)
+            waits for it forever. A database file is read through a
+            connection of its own, an in-memory one is serialized first.
+        '''
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            target = sqlite3.connect(tmp)
+            try:
+                if connection.is_in_memory_db():
+                    connection.ensure_connection()
+                    source = sqlite3.connect(':memory:')
+                    source.deserialize(connection.connection.serialize())
+                else:
+                    source = sqlite3.connect(connection.settings_dict['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    source.close()
+            finally:
+                target.close()
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._prune()
+
+    def cleanup(self):
+        for path in (self.database, *(Path(f'{self.database}-{suffix}')
+                                      for suffix in ('journal', 'wal', 'shm'))):
+            if path.exists():
+                path.unlink()
+
+    def _prune(self):
+        ''' drop snapshots of older schemas '''
+        for path in self.directory.glob('db-*.sqlite3'):
+            if path != self.path:
+                path.unlink(missing_ok=True)
@@ -0,0 +1,120 @@
+'''
+    Support for running the suite with pytest-xdist (`pytest -n auto`).
+
+    Every worker gets its own test database (pytest-django suffixes it with
+    the worker id) and its own Faker / factory_boy seed derived from one
+    session seed, so data generated at import time differs between workers
+    and a failing run can be replayed with PYTEST_FAKER_SEED.
+
+    Test durations are recorded in the pytest cache and the next parallel run
+    hands out the longest tests first, so no worker is left finishing a slow
+    test after the others ran out of work.
+'''
+import os
+import random
+
+import factory.random
+from faker import Faker
+
+DURATIONS_KEY = 'learn-pytest/durations'
+
+
+def worker_index(config):
+    ''' 0 for a serial run or the controller, n for worker gw<n> '''
+    worker_id = getattr(config, 'workerinput', {}).get('workerid', 'gw0')
+    return int(worker_id[2:])
+
+
+def session_seed(config):
+    if hasattr(config, 'workerinput'):
+        return config.workerinput['faker_seed']
+    return int(os.environ.get('PYTEST_FAKER_SEED') or random.randrange(2 ** 32))
+
+
+def seed_factories(seed):
+    ''' seed Faker (also used through factory.Faker) and factory_boy '''
+    Faker.seed(seed)
+    factory.random.reseed_random(seed)
+
+
+def load_durations(config):
+    cache = getattr(config, 'cache', None)
+    return cache.get(DURATIONS_KEY, {}) if cache is not None else {}
+
+
+def _scheduling_class():
+    from xdist.scheduler import LoadScheduling
+
+    class DurationScheduling(LoadScheduling):
+        '''
+            LoadScheduling handing out the longest known tests first (the LPT
+            heuristic). Tests without a recorded duration are assumed average.
+        '''
+
+        def __init__(self, config, log=None, durations=None):
+            super().__init__(config, log)
+            self.durations = durations or {}
+            if self.maxschedchunk is None:
+                # small chunks keep the longest first order across workers
+                self.maxschedchunk = 2
+
+        def schedule(self):
+            assert self.collection_is_completed
+
+            if self.collection is not None:
+                return super().schedule()
+
+            if not self._check_nodes_have_same_collection():
+                self.log('**Different tests collected, aborting run**')
+                return
+
+            self.collection = next(iter(self.node2collection.values()))
+            if not self.collection:
+                return
+
+            average = sum(self.durations.values()) / len(self.durations)
+            self.pending[:] = sorted(
+                range(len(self.collection)),
+                key=lambda index: self.durations.get(self.collection[index], average),
+                reverse=True,
+            )
+            for node in self.nodes:
+                self._send_tests(node, min(self.maxschedchunk, len(self.pending)))
+
+            if not self.pending:
+                for node in self.nodes:
+                    node.shutdown()
+
+    return DurationScheduling
+
+
+class ParallelPlugin:
+    ''' registered by tests/conftest.py when pytest-xdist is installed '''
+
+    def __init__(self, config):
+        self.config = config
+        self.durations = {}
+
+    def pytest_configure_node(self, node):
+        node.workerinput['faker_seed'] = self.config.faker_seed
+
+    def pytest_xdist_make_scheduler(self, config, log):
+        durations = load_durations(config)
+        if config.getvalue('dist') != 'load' or not durations:
+            return None
+        return _scheduling_class()(config, log, durations)
+
+    def pytest_runtest_logreport(self, report):
+        if hasattr(self.config, 'workerinput'):
+            return
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0) + report.duration
+
+    def pytest_sessionfinish(self, session):
+        cache = getattr(self.config, 'cache', None)
+        if hasattr(self.config, 'workerinput') or cache is None or not self.durations:
+            return
+        durations = load_durations(self.config)
+        durations.update({
+            nodeid: round(duration, 4) for nodeid, duration in self.durations.items()
+        })
+        cache.set(DURATIONS_KEY, durations)
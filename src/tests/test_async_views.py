@@ -0,0 +1,132 @@
+import importlib
+import inspect
+import os
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import clear_url_caches, resolve
+
+import MyProject.urls
+from apps.FactoryApp import urls as factory_urls
+from apps.Payment import urls as payment_urls
+from tests.FactoryApp.factory import CategoryFactory, ProductFactory
+from tests.Payment.factory import CurrencyFactory, TransactionFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def rebuild_urls():
+    for module in (factory_urls, payment_urls, MyProject.urls):
+        importlib.reload(module)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    ''' the URLconf with async read views, as ASYNC_READ_VIEWS=True serves it '''
+    settings.ASYNC_READ_VIEWS = True
+    rebuild_urls()
+    yield
+    settings.ASYNC_READ_VIEWS = False
+    rebuild_urls()
+
+
+@pytest.fixture
+def catalogue():
+    currency = CurrencyFactory.create()
+    TransactionFactory.create_batch(3, currency=currency)
+    category = CategoryFactory.create()
+    ProductFactory.create_batch(3, category=category, regular_price=5)
+    ProductFactory.create(category=category, regular_price=50)
+    return currency, category
+
+
+def read(url, **headers):
+    return async_to_sync(AsyncClient().get)(url, headers=headers)
+
+
+def test_only_reads_are_async(async_views):
+    assert inspect.iscoroutinefunction(resolve('/api/product/').func)
+    assert inspect.iscoroutinefunction(resolve('/api/transaction/1/').func)
+    assert not inspect.iscoroutinefunction(resolve('/api/product/search/').func)
+
+
+def test_sync_by_default(monkeypatch):
+    monkeypatch.delenv('ASYNC_READ_VIEWS', raising=False)
+    importlib.reload(importlib.import_module('MyProject.asgi'))
+
+    # serving the project with MyProject.asgi does not turn them on
+    assert 'ASYNC_READ_VIEWS' not in os.environ
+    assert not inspect.iscoroutinefunction(resolve('/api/product/').func)
+
+
+@pytest.mark.parametrize('path', [
+    '/api/transaction/',
+    '/api/transaction/?page_size=2',
+    '/api/transaction/{transaction}/',
+    '/api/transaction/999999/',
+    '/api/transaction/?cursor=bogus',
+    '/api/currency/',
+    '/api/currency/{currency}/',
+    '/api/product/',
+    '/api/product/?page_size=1&ordering=-regular_price',
+    '/api/product/?max_price=10',
+    '/api/product/?min_price=abc',
+    '/api/product/{product}/',
+    '/api/product/x/',
+    '/api/category/',
+    '/api/category/{category}/',
+])
+def test_same_responses(api_client, catalogue, settings, path):
+    from apps.FactoryApp.models import Product
+    from apps.Payment.models import Transaction
+
+    currency, category = catalogue
+    path = path.format(
+        transaction=Transaction.objects.first().id, currency=currency.id,
+        product=Product.objects.first().id, category=category.id,
+    )
+    expected = api_client().get(path, HTTP_ACCEPT='application/json')
+
+    settings.ASYNC_READ_VIEWS = True
+    rebuild_urls()
+    try:
+        response = read(path, accept='application/json')
+    finally:
+        settings.ASYNC_READ_VIEWS = False
+        rebuild_urls()
+
+    assert response.status_code == expected.status_code
+    assert response.content == expected.content
+    assert response.get('ETag') == expected.get('ETag')
+
+
+def test_next_page(async_views, catalogue):
+    first = read('/api/product/?page_size=2').json()
+    second = read(first['next']).json()
+
+    assert len(second['results']) == 2
+    assert second['previous']
+
+
+def test_not_modified(async_views, catalogue):
+    _, category = catalogue
+    url = f'/api/category/{category.id}/'
+    etag = read(url)['ETag']
+
+    assert read(url, if_none_match=etag).status_code == 304
+
+
+def test_writes_stay_sync(async_views, catalogue):
+    _, category = catalogue
+    product = {
+        'title': 'async', 'slug': 'async', 'category': category.id,
+        'regular_price': '1.00', 'discount_price': '1.00',
+    }
+
+    response = async_to_sync(AsyncClient().post)(
+        '/api/product/', product, content_type='application/json')
+
+    assert response.status_code == 201
+    assert read(f"/api/product/{response.json()['id']}/").json()['title'] == 'async'
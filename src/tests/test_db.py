@@ -0,0 +1,167 @@
+import pytest
+from django.conf import settings
+from django.db import OperationalError, connection, connections
+from rest_framework.test import APIClient
+
+from apps.FactoryApp.models import Category, Product
+from apps.Payment.models import Currency, Transaction
+from MyProject.db import REPLICA, ReplicaRouter, read_database, replica_settings, sqlite_options
+from tests.db_snapshot import DatabaseSnapshot
+from tests.FactoryApp.factory import CategoryFactory
+
+
+def test_sqlite_options():
+    options = sqlite_options(mmap_size=2 ** 20, cache_size=-1024, busy_timeout=2,
+                             transaction_mode='IMMEDIATE')
+
+    assert options['init_command'].split(';') == [
+        'PRAGMA journal_mode=WAL', 'PRAGMA synchronous=NORMAL',
+        'PRAGMA mmap_size=1048576', 'PRAGMA cache_size=-1024',
+    ]
+    assert options['timeout'] == 2
+    assert options['transaction_mode'] == 'IMMEDIATE'
+    assert 'transaction_mode' not in sqlite_options()
+
+
+def test_replica_settings():
+    default = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'db.sqlite3',
+               'OPTIONS': sqlite_options(transaction_mode='IMMEDIATE')}
+
+    replica = replica_settings(default, 'replica.sqlite3')
+
+    assert replica['NAME'] == 'replica.sqlite3'
+    assert replica['OPTIONS']['init_command'].endswith(';PRAGMA query_only=1')
+    assert 'transaction_mode' not in replica['OPTIONS']
+    assert replica['TEST'] == {'MIRROR': 'default'}
+    # the default settings are left alone
+    assert 'query_only' not in default['OPTIONS']['init_command']
+
+
+@pytest.mark.django_db
+def test_pragmas_are_applied_on_connect():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        assert cursor.fetchone()[0] == 1  # NORMAL
+        cursor.execute('PRAGMA cache_size')
+        expected = settings.DATABASES['default']['OPTIONS']['init_command']
+        assert f'PRAGMA cache_size={cursor.fetchone()[0]}' in expected
+        cursor.execute('PRAGMA journal_mode')
+        # an in-memory test database has no WAL
+        assert cursor.fetchone()[0] in ('wal', 'memory')
+
+
+class TestReplicaRouter:
+    router = ReplicaRouter()
+
+    def test_writes_go_to_default(self):
+        instance = Category(name='x')
+        instance._state.db = REPLICA
+
+        assert self.router.db_for_write(Category, instance=instance) == 'default'
+        assert self.router.db_for_write(Category) == 'default'
+
+    def test_reads_follow_the_instance(self):
+        instance = Category(name='x')
+        instance._state.db = REPLICA
+
+        assert self.router.db_for_read(Product, instance=instance) == REPLICA
+        assert self.router.db_for_read(Product) == 'default'
+
+    def test_only_default_is_migrated(self):
+        assert self.router.allow_migrate('default', 'Payment')
+        assert not self.router.allow_migrate(REPLICA, 'Payment')
+
+    def test_relations_between_default_and_replica(self):
+        a, b = Category(name='a'), Category(name='b')
+        a._state.db, b._state.db = 'default', REPLICA
+
+        assert self.router.allow_relation(a, b)
+        b._state.db = 'other'
+        assert not self.router.allow_relation(a, b)
+
+
+def test_read_database_without_replica():
+    assert REPLICA not in settings.DATABASES
+    assert read_database() == 'default'
+
+
+@pytest.fixture(scope='class')
+def replica(tmp_path_factory, django_db_blocker):
+    '''
+        'replica' database on a copy of the test database, as its own file
+        rather than a test mirror (which shares the default connection).
+        Class scoped, so it exists before the test case checks the databases
+        a test may use; each test rolls its replica writes back.
+    '''
+    snapshot = DatabaseSnapshot(tmp_path_factory.mktemp('replica'), 'replica')
+    with django_db_blocker.unblock():
+        snapshot.save(connection)
+    replica = replica_settings(connection.settings_dict, str(snapshot.path))
+    connections.settings[REPLICA] = connections.configure_settings({
+        'default': connection.settings_dict, REPLICA: {**replica, 'TEST': {}},
+    })[REPLICA]
+    try:
+        yield connections[REPLICA]
+    finally:
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+
+
+def only_on_replica(replica):
+    ''' a transaction and a product the default database does not have '''
+    with replica.cursor() as cursor:
+        cursor.execute('PRAGMA query_only=0')
+    currency = Currency.objects.using(REPLICA).create(code='RPL', name='Replica')
+    Transaction.objects.using(REPLICA).bulk_create([
+        Transaction(name='replica', email='replica@test.com', currency=currency),
+    ])
+    category = Category.objects.using(REPLICA).create(name='replica')
+    Product.objects.using(REPLICA).bulk_create([
+        Product(title='replica', slug='replica', category=category,
+                regular_price='1.00', discount_price='0.50'),
+    ])
+    with replica.cursor() as cursor:
+        cursor.execute('PRAGMA query_only=1')
+    return (Transaction.objects.using(REPLICA).get(name='replica'),
+            Product.objects.using(REPLICA).get(slug='replica'))
+
+
+@pytest.mark.django_db(databases=['default', REPLICA])
+class TestReplicaReads:
+
+    def test_replica_is_read_only(self, replica):
+        with pytest.raises(OperationalError):
+            Currency.objects.using(REPLICA).create(code='RPL', name='Replica')
+
+    def test_list_and_retrieve_read_the_replica(self, replica):
+        transaction, product = only_on_replica(replica)
+        client = APIClient()
+
+        response = client.get('/api/transaction/')
+        assert [row['name'] for row in response.data['results']] == ['replica']
+        response = client.get(f'/api/transaction/{transaction.id}/')
+        assert response.status_code == 200
+        assert response.data['currency'] == 'RPL'
+
+        response = client.get('/api/product/')
+        assert [row['slug'] for row in response.data['results']] == ['replica']
+        assert client.get(f'/api/product/{product.id}/').status_code == 200
+
+    def test_writes_and_lookups_use_default(self, replica):
+        transaction, product = only_on_replica(replica)
+        client = APIClient()
+
+        # lookups must see a row right after it was created
+        assert client.get(f'/api/transaction/by-uid/{transaction.uid}/').status_code == 404
+        assert client.patch(f'/api/product/{product.id}/', {'title': 'x'},
+                            format='json').status_code == 404
+
+        category = CategoryFactory.create()
+        response = client.post('/api/product/', {
+            'title': 'written', 'slug': 'written', 'category': category.id,
+            'regular_price': '2.00', 'discount_price': '1.00',
+        }, format='json')
+        assert response.status_code == 201
+        assert Product.objects.filter(slug='written').exists()
+        assert not Product.objects.using(REPLICA).filter(slug='written').exists()
@@ -0,0 +1,35 @@
+import sqlite3
+
+import pytest
+from django.db import connection
+
+from tests.db_snapshot import DatabaseSnapshot, schema_hash
+
+
+def test_schema_hash_is_stable():
+    assert schema_hash() == schema_hash()
+
+
+@pytest.mark.django_db
+def test_save_and_restore(tmp_path):
+    (tmp_path / 'db-stale.sqlite3').touch()
+    snapshot = DatabaseSnapshot(tmp_path, 'key', 'gw0')
+
+    snapshot.save(connection)
+    assert snapshot.restore()
+
+    tables = sqlite3.connect(snapshot.database).execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+    assert ('Payment_transaction',) in tables
+    # snapshots of an older schema are dropped
+    assert not (tmp_path / 'db-stale.sqlite3').exists()
+
+    snapshot.cleanup()
+    assert not snapshot.database.exists()
+
+
+def test_restore_without_snapshot(tmp_path):
+    snapshot = DatabaseSnapshot(tmp_path, 'key')
+
+    assert not snapshot.restore()
+    assert not snapshot.restored
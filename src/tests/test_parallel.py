@@ -0,0 +1,66 @@
+import pytest
+from faker import Faker
+
+from tests.parallel import _scheduling_class, seed_factories, session_seed, worker_index
+
+pytest.importorskip('xdist')
+
+
+class FakeConfig:
+    def __init__(self, workerinput=None):
+        if workerinput is not None:
+            self.workerinput = workerinput
+
+    def getoption(self, name):
+        return {'tx': ['popen'] * 2, 'numprocesses': 2, 'maxschedchunk': None}.get(name)
+
+    getvalue = getoption
+
+
+class FakeNode:
+    shutting_down = False
+
+    def __init__(self, worker_id):
+        self.gateway = type('Gateway', (), {'id': worker_id})
+        self.sent = []
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def test_worker_seeds(monkeypatch):
+    monkeypatch.setenv('PYTEST_FAKER_SEED', '42')
+
+    assert session_seed(FakeConfig()) == 42
+    assert session_seed(FakeConfig({'workerid': 'gw1', 'faker_seed': 7})) == 7
+    assert worker_index(FakeConfig()) == 0
+    assert worker_index(FakeConfig({'workerid': 'gw3'})) == 3
+
+
+def test_seed_factories_is_repeatable():
+    fake = Faker()
+
+    seed_factories(1)
+    first = fake.name()
+    seed_factories(1)
+
+    assert fake.name() == first
+
+
+def test_longest_tests_are_sent_first():
+    collection = ['fast', 'slow', 'new', 'slowest']
+    durations = {'fast': 0.1, 'slow': 2.0, 'slowest': 5.0}
+    scheduling = _scheduling_class()(FakeConfig(), durations=durations)
+    nodes = [FakeNode('gw0'), FakeNode('gw1')]
+    for node in nodes:
+        scheduling.add_node(node)
+        scheduling.add_node_collection(node, collection)
+
+    scheduling.schedule()
+
+    sent = [collection[i] for node in nodes for i in node.sent]
+    # 'new' has no recorded duration and counts as average (~2.37s)
+    assert sent == ['slowest', 'new', 'slow', 'fast']